@@ -1,24 +1,36 @@
 import sys
+import multiprocessing
 from pathlib import Path
 from tempfile import gettempdir
 
 from .logging import (
     log_info, Logger, log_func_call, DEBUGLOW2, set_trace_logging,
-    set_func_call_logging,
+    set_func_call_logging, get_tracelog, get_func_call_logging,
 )
 from .config import AppConfig
 from .config.keys import (
     BASE_LOG_PATH_KEY, APP_NAME_KEY, get_log_dir_keys, APP_PKG_DIR_KEY,
-    APP_ASSETS_DIR_KEY, APP_PKG_VERSION_KEY, TMP_DIR_KEY, LOCAL_CFG_KEY
+    APP_ASSETS_DIR_KEY, APP_PKG_VERSION_KEY, TMP_DIR_KEY, LOCAL_CFG_KEY,
+    LOCAL_CONFIG_FILE_KEY,
 )
 from .config.local import process_local_config
+from .config.cache import (
+    ConfigCache, get_config_cache_dir, get_inputs_digest,
+)
+from .config.shared import SharedConfig
+from .config.defaults import get_defaults
 
 from .utils.constants import DEFAULT_GROUP, DEFAULT_DIR_MODE
-from .utils.log import setup_logging, create_log_file
+from .utils.log import (
+    setup_logging, create_log_file, setup_worker_logging,
+)
+from .utils.expandvars import record_var_lookups
+from .utils.casesafe import casesafe_value_in_container
 from .utils.main import MainContext
 from .utils.system import mkdir_chgrp
 from .utils.stack import (
-    top_package_dir_path, top_module_and_name, set_show_traceback_locals
+    top_package_dir_path, top_module_and_name, set_show_traceback_locals,
+    get_show_traceback_locals,
 )
 from .utils.windows.funcs import set_windows_process_app_id
 
@@ -35,6 +47,12 @@ class PyRandyOSApp(AppConfig):
     APP_LOCAL_DEFAULTS = {}
     APP_ASSETS_DIR: str | Path = None
     "path to be resolved when config is processed; may use variable expansion"
+    APP_CONFIG_CACHE_DIR: str | Path = None
+    """
+    directory to cache the processed config in between runs (see
+    `ConfigCache`), or None to not cache it.  The `PYRANDYOS_CONFIG_CACHE`
+    environment variable overrides this.
+    """
 
     use_local_config: bool = None
 
@@ -51,7 +69,17 @@ class PyRandyOSApp(AppConfig):
         "returns True if a local config is present and loaded, else False"
         # log = logger or get_logger()
         cls.set_logger(logger)
-        cls.init_parse_config(config, kwargs)
+        cache = cls.get_config_cache(config, kwargs)
+        cached = cache.load() if cache else None
+        env_names: set[str] = set()
+        if cached:
+            cls.set_global_config(cached['config'])
+            cls.set_dependency_graph(cached['dependencies'])
+            log_config = cached['log_config']
+        else:
+            with record_var_lookups(env_names):
+                cls.init_parse_config(config, kwargs)
+                log_config = cls.expand_log_config()
 
         # setup logging first if necessary:
         (
@@ -63,31 +91,165 @@ class PyRandyOSApp(AppConfig):
             log_trace_enabled,
             tb_locals_enabled,
             log_func_call_enabled,
-        ) = cls.expand_log_config()
+            log_async,
+            log_async_policy,
+        ) = log_config
         set_trace_logging(log_trace_enabled)
         set_func_call_logging(log_func_call_enabled)
         set_show_traceback_locals(tb_locals_enabled)
         if setup_log:
             logfile = logfile or create_log_file(logdir, ts_name, append,
                                                  cls.APP_LOG_PREFIX)
-            setup_logging(logfile, cli_log_level, file_log_level)
+            setup_logging(logfile, cli_log_level, file_log_level,
+                          async_log=log_async, async_policy=log_async_policy)
 
         # start logging and process the rest of the configuration data
         cls.set(BASE_LOG_PATH_KEY, logfile)
-        cls.set(APP_PKG_VERSION_KEY, cls.get_package_version())
-        pkgdir = cls.get_package_dir()
-        cls.set(APP_PKG_DIR_KEY, pkgdir)
-        assets_dir = cls.get_assets_dir()
-        if assets_dir:
-            cls.set(APP_ASSETS_DIR_KEY, assets_dir)
+        appname = getattr(cls, 'APP_NAME', 'PyRandyOSApp')
+        if cached:
+            log_info(f"Starting {appname} (cached config)")
+            set_windows_process_app_id(appname)
+            use_local_config = cached['use_local_config']
+            if use_local_config:
+                log_info(f"Using local config: {cls[LOCAL_CONFIG_FILE_KEY]}")
+
+            cls.use_local_config = use_local_config
+            return use_local_config
+
+        with record_var_lookups(env_names):
+            cls.set(APP_PKG_VERSION_KEY, cls.get_package_version())
+            pkgdir = cls.get_package_dir()
+            cls.set(APP_PKG_DIR_KEY, pkgdir)
+            assets_dir = cls.get_assets_dir()
+            if assets_dir:
+                cls.set(APP_ASSETS_DIR_KEY, assets_dir)
+
+            cls.set(APP_NAME_KEY, appname)
+            log_info(f"Starting {appname}")
+            set_windows_process_app_id(appname)
+            cls.process_config()
+
+            use_local_config = process_local_config(app_path_keys=cls.APP_PATH_KEYS)  # noqa: E501
+
+        cls.use_local_config = use_local_config
+        if cache:
+            cls.save_config_cache(cache, config, log_config, use_local_config,
+                                  env_names)
+
+        return use_local_config
+
+    @classmethod
+    @log_func_call
+    def get_config_cache(cls, config: dict | str | Path = None,
+                         overrides: dict = None):
+        """
+        Returns the `ConfigCache` for the given `init_main()` inputs, or None
+        if caching is disabled or the inputs can't be cached.
+        """
+        cachedir = get_config_cache_dir(cls.APP_CONFIG_CACHE_DIR)
+        if not cachedir:
+            return None
+
+        # everything that init_main would otherwise feed into the config
+        # that is not a file or environment variable
+        appname = getattr(cls, 'APP_NAME', 'PyRandyOSApp')
+        defaults = get_defaults(cls, cls.APP_GLOBAL_DEFAULTS,
+                                cls.APP_LOCAL_DEFAULTS)
+        source = (str(Path(config).absolute())
+                  if isinstance(config, (str, Path)) else config)
+        try:
+            version = cls.get_package_version()
+        except AttributeError:
+            version = None
+
+        digest = get_inputs_digest(
+            f'{cls.__module__}.{cls.__qualname__}', appname, defaults, source,
+            overrides, cls.get_case(), cls.APP_PATH_KEYS, cls.APP_ASSETS_DIR,
+            version, cls.get_package_dir(),
+        )
+        if not digest:
+            return None
+
+        return ConfigCache(cachedir/f'{appname}.config.pickle', digest)
+
+    @classmethod
+    @log_func_call
+    def save_config_cache(cls, cache: ConfigCache,
+                          config: dict | str | Path, log_config: tuple,
+                          use_local_config: bool, env_names: set[str]):
+        # a config that uses the log file name can't be reused by a later run
+        if casesafe_value_in_container(env_names, BASE_LOG_PATH_KEY,
+                                       cls.get_case()):
+            return
+
+        files = [cls[LOCAL_CONFIG_FILE_KEY]]
+        if isinstance(config, (str, Path)):
+            files.append(config)
+
+        cache.save({'config': cls.get_global_config(),
+                    'dependencies': cls.get_dependency_graph(),
+                    'log_config': log_config,
+                    'use_local_config': use_local_config},
+                   files, env_names)
+
+    @classmethod
+    @log_func_call
+    def share_config(cls, forward_logs: bool = True, mp_context=None,
+                     dirpath: str | Path = None):
+        """
+        Publish the processed global config for worker processes, which can
+        then start up with `init_worker()` instead of `init_main()`.  Pass
+        the returned `SharedConfig`'s `initargs` with `cls.init_worker` as
+        the initializer of a `multiprocessing.Pool` or `ProcessPoolExecutor`,
+        and close it once the pool is done:
+
+            with App.share_config() as shared, ProcessPoolExecutor(
+                    initializer=App.init_worker, initargs=shared.initargs
+            ) as pool:
+                ...
+
+        If `forward_logs` is True, the workers' log records are written by
+        this process's handlers.  `mp_context` is the `multiprocessing`
+        context used to create the log queue, if not the default.
+        """
+        data = {
+            'config': cls.get_global_config(),
+            'dependencies': cls.get_dependency_graph(),
+            'use_local_config': cls.use_local_config,
+            'log_flags': (get_tracelog(), get_func_call_logging(),
+                          get_show_traceback_locals()),
+        }
+        log_queue = None
+        if forward_logs:
+            log_queue = (mp_context or multiprocessing).Queue()
 
         appname = getattr(cls, 'APP_NAME', 'PyRandyOSApp')
-        cls.set(APP_NAME_KEY, appname)
-        log_info(f"Starting {appname}")
-        set_windows_process_app_id(appname)
-        cls.process_config()
+        return SharedConfig(data, log_queue, dirpath, f'{appname}-config-')
 
-        use_local_config = process_local_config(app_path_keys=cls.APP_PATH_KEYS)  # noqa: E501
+    @classmethod
+    @log_func_call
+    def init_worker(cls, path: str | Path, log_queue=None,
+                    log_level: int | str = 0):
+        """
+        Worker process initializer for a config published by
+        `share_config()`.  Returns True if the parent loaded a local config,
+        else False, like `init_main()`.
+        """
+        data = SharedConfig.load(path)
+        if log_queue is not None:
+            setup_worker_logging(log_queue, log_level)
+
+        (
+            log_trace_enabled,
+            log_func_call_enabled,
+            tb_locals_enabled,
+        ) = data['log_flags']
+        set_trace_logging(log_trace_enabled)
+        set_func_call_logging(log_func_call_enabled)
+        set_show_traceback_locals(tb_locals_enabled)
+        cls.set_global_config(data['config'])
+        cls.set_dependency_graph(data['dependencies'])
+        use_local_config = data['use_local_config']
         cls.use_local_config = use_local_config
         return use_local_config
 
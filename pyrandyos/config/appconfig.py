@@ -1,22 +1,25 @@
 from logging import Logger
 from pathlib import Path
-from copy import deepcopy
+from threading import RLock
+from collections.abc import Callable, Iterable
 
 from ..logging import (
     DEBUGLOW2, log_func_call, set_trace_logging, set_func_call_logging,
-    set_global_logger, get_global_logger
+    set_global_logger, get_global_logger, log_debug,
 )
 from ..utils.classproperty import classproperty
-from ..utils.paths import (
-    get_expanded_pathobj, get_expanded_pureposixpath, pureposixpath_to_pathobj
-)
+from ..utils.paths import get_expanded_pathobj, invalidate_path_cache
 from ..utils.json import load_jsonc
 from ..utils.cfgdict import (
-    config_dict_get, config_dict_set, config_dict_update,
+    config_dict_get, config_dict_set, ConfigPathIndex, is_related_config_key,
 )
+from ..utils.cfglayers import ConfigLayers
+from ..utils.cfgsnapshot import ConfigSnapshot
 from ..utils.constants import NODEFAULT, IS_WIN32
 from ..utils.system import build_cmd_arg_list
-from ..utils.casesafe import casesafe_is_equal, casesafe_value_in_container
+from ..utils.casesafe import (
+    casesafe_is_equal, casesafe_value_in_container, casesafe_value,
+)
 from ..utils.stack import set_show_traceback_locals
 
 from .defaults import get_defaults
@@ -24,11 +27,104 @@ from .keys import (
     BASE_LOG_DIR_KEY, BASE_PATH_KEY, LOG_TIMESTAMP_KEY,
     APPEND_LOG_KEY, CLI_LOG_LEVEL_KEY, get_path_keys, BASE_LOG_PATH_KEY,
     FILE_LOG_LEVEL_KEY, ABS_BASE_PATH_KEY, LOG_TRACE_ENABLED_KEY,
-    SHOW_TRACEBACK_LOCALS_KEY, LOG_FUNC_CALL_ENABLED_KEY,
+    SHOW_TRACEBACK_LOCALS_KEY, LOG_FUNC_CALL_ENABLED_KEY, LOG_ASYNC_KEY,
+    LOG_ASYNC_POLICY_KEY, DEFAULTS_LAYER, CONFIG_FILE_LAYER, OVERRIDES_LAYER,
 )
-from .expandutils import expand_key_recursively
+from .expandutils import ConfigExpander, ConfigDependencyGraph
 
 _GLOBAL_CFG: dict = None
+_GLOBAL_CFG_INDEX: ConfigPathIndex = None
+"flat index of the dotted keys read from the global config"
+_GLOBAL_CFG_LAYERS: ConfigLayers = None
+"the unprocessed layers the global config was built from"
+_GLOBAL_CFG_SNAPSHOT: ConfigSnapshot = None
+"the latest published frozen version of the global config"
+_GLOBAL_CFG_WRITE_LOCK = RLock()
+"""
+Serializes changes made through `AppConfig` so each published snapshot builds
+on the one before it.  Readers of snapshots never need it.
+"""
+_GLOBAL_CFG_DEPS: ConfigDependencyGraph = None
+"""
+What each value of the global config was expanded from, so `AppConfig.set`
+can re-expand just the values that depend on the keys it changes.
+"""
+_GLOBAL_CFG_LISTENERS: list[tuple[Callable, tuple[str, ...] | None]] = list()
+"callbacks and the keys they are interested in (None for all)"
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _set_global_cfg(config: dict, case_insensitive: bool):
+    global _GLOBAL_CFG, _GLOBAL_CFG_INDEX, _GLOBAL_CFG_DEPS
+    with _GLOBAL_CFG_WRITE_LOCK:
+        _GLOBAL_CFG = config
+        _GLOBAL_CFG_DEPS = None
+        _GLOBAL_CFG_INDEX = ConfigPathIndex(config, case_insensitive)
+        _publish_global_cfg(case_insensitive)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _publish_global_cfg(case_insensitive: bool):
+    global _GLOBAL_CFG_SNAPSHOT
+    with _GLOBAL_CFG_WRITE_LOCK:
+        prev = _GLOBAL_CFG_SNAPSHOT
+        version = prev.version + 1 if prev else 0
+        # a single assignment, so readers get either version but never a mix
+        _GLOBAL_CFG_SNAPSHOT = (None if _GLOBAL_CFG is None else
+                                ConfigSnapshot(_GLOBAL_CFG, version,
+                                               case_insensitive))
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _set_global_cfg_value(key: str, value, case_insensitive: bool):
+    global _GLOBAL_CFG_SNAPSHOT
+    with _GLOBAL_CFG_WRITE_LOCK:
+        config_dict_set(_GLOBAL_CFG, key, value, case_insensitive)
+        prev = _GLOBAL_CFG_SNAPSHOT
+        if prev is None or prev.case_insensitive != case_insensitive:
+            _publish_global_cfg(case_insensitive)
+        else:
+            # only the path to the key is rebuilt, the rest is shared
+            _GLOBAL_CFG_SNAPSHOT = prev.set(key, value)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _track_global_cfg_expansion(expander: ConfigExpander):
+    global _GLOBAL_CFG_DEPS
+    case = expander.case_insensitive
+    graph = _GLOBAL_CFG_DEPS
+    if graph is None or graph.case_insensitive != case:
+        graph = _GLOBAL_CFG_DEPS = ConfigDependencyGraph(None, case)
+
+    # values are expanded again the way they were last expanded
+    graph.skip_expansion = expander.skip_expansion
+    graph.add(expander)
+    return graph
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _notify_global_cfg_listeners(changed: list[str], case_insensitive: bool):
+    nodes = [casesafe_value(k, case_insensitive) for k in changed]
+    for callback, keys in tuple(_GLOBAL_CFG_LISTENERS):
+        if keys is None:
+            callback(tuple(changed))
+            continue
+
+        relevant = tuple(k for k, node in zip(changed, nodes)
+                         if any(is_related_config_key(node, key)
+                                for key in keys))
+        if relevant:
+            callback(relevant)
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def _get_global_cfg_value(key: str, default, case_insensitive: bool):
+    index = _GLOBAL_CFG_INDEX
+    if index is not None and index.config is _GLOBAL_CFG \
+            and index.case_insensitive == case_insensitive:
+        return index.get(key, default)
+
+    return config_dict_get(_GLOBAL_CFG, key, default, case_insensitive)
 
 
 class AppConfigType(type):
@@ -71,28 +167,70 @@ class AppConfig(metaclass=AppConfigType):
     @classmethod
     @log_func_call
     def set(cls, key: str, value, case_insensitive: bool = None):
-        config_dict_set(_GLOBAL_CFG, key, value,
-                        cls.get_case(case_insensitive))
+        """
+        Set the value for the given (possibly dotted) key in the global config.
+        Values that were expanded from references to the key are expanded
+        again, and subscribers are notified of every key that changed.
+        """
+        cls.update({key: value}, case_insensitive)
 
     @classmethod
     @log_func_call(DEBUGLOW2, trace_only=True)
     def __class_getitem__(cls, key: str):
-        return config_dict_get(_GLOBAL_CFG, key,
-                               case_insensitive=cls.get_case())
+        return _get_global_cfg_value(key, NODEFAULT, cls.get_case())
 
     @classmethod
     @log_func_call
     def set_global_config(cls, config: dict):
-        log = get_global_logger()
-        log.debug('setting global config')
-        global _GLOBAL_CFG
-        _GLOBAL_CFG = config
+        global _GLOBAL_CFG_LAYERS
+        # the global logger may not be set yet when starting from a cached
+        # config, so use the fallback logic
+        log_debug('setting global config')
+        _GLOBAL_CFG_LAYERS = None
+        _set_global_cfg(config, cls.get_case())
 
     @classmethod
     @log_func_call(DEBUGLOW2)
     def get_global_config(cls):
         return _GLOBAL_CFG
 
+    @classmethod
+    @log_func_call(DEBUGLOW2)
+    def get_config_layers(cls):
+        """
+        Returns the `ConfigLayers` the global config was built from by
+        `init_parse_config`, or None if it was set some other way.  These are
+        the unprocessed inputs; the processed values are in the global config.
+        """
+        return _GLOBAL_CFG_LAYERS
+
+    @classmethod
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def get_config_snapshot(cls) -> ConfigSnapshot:
+        """
+        Returns the latest published `ConfigSnapshot` of the global config, a
+        frozen version that will never change, or None if no global config
+        is set.
+
+        Unlike the global config dict, a snapshot can be read from any number
+        of threads without locking while the config is being changed, and
+        gives a consistent view of it.  Threads that read the config in a
+        loop should get a snapshot once and read from it, and get a new one
+        when they want to see later changes.
+
+        Changes made through `set` and `update` are published right away, and
+        so is the result of processing the config.  Changes made to the
+        global config dict directly are not seen until
+        `publish_config_snapshot` is called.
+        """
+        return _GLOBAL_CFG_SNAPSHOT
+
+    @classmethod
+    @log_func_call
+    def publish_config_snapshot(cls, case_insensitive: bool = None):
+        "publish the current global config as a new snapshot"
+        _publish_global_cfg(cls.get_case(case_insensitive))
+
     @classproperty
     @log_func_call(DEBUGLOW2)
     def global_config(cls):
@@ -130,13 +268,157 @@ class AppConfig(metaclass=AppConfigType):
                 global app config is not set.
         """
         if _GLOBAL_CFG:
-            return config_dict_get(_GLOBAL_CFG, key, default,
-                                   cls.get_case(case_insensitive))
+            return _get_global_cfg_value(key, default,
+                                         cls.get_case(case_insensitive))
 
     @classmethod
     @log_func_call
     def update(cls, data: dict, case_insensitive: bool = None):
-        config_dict_update(_GLOBAL_CFG, data, cls.get_case(case_insensitive))
+        "same as `set` for each key and value in `data`, notifying once"
+        case = cls.get_case(case_insensitive)
+        with _GLOBAL_CFG_WRITE_LOCK:
+            graph = _GLOBAL_CFG_DEPS
+            for k, v in data.items():
+                _set_global_cfg_value(k, v, case)
+                if graph:
+                    # the value was set as is, so it no longer needs expanding
+                    graph.forget(k)
+
+            changed = list(data)
+            changed.extend(cls.reexpand(changed, case))
+
+        _notify_global_cfg_listeners(changed, case)
+
+    @classmethod
+    @log_func_call
+    def reexpand(cls, keys: Iterable[str], case_insensitive: bool = None):
+        """
+        Expand again every value of the global config that was expanded from
+        references to the given keys (directly or through other values), and
+        resolve again any of them that are paths.  If the base path is one of
+        the keys, every relative path is resolved against it again.  `set`
+        and `update` already do this, so it is only needed after modifying
+        the global config dict directly.
+
+        Only values expanded by `process_config` or `expand_log_config` are
+        tracked.
+
+        Returns:
+            list[str]: the keys whose values changed
+        """
+        case = cls.get_case(case_insensitive)
+        graph = _GLOBAL_CFG_DEPS
+        if graph is None:
+            return []
+
+        with _GLOBAL_CFG_WRITE_LOCK:
+            return cls._reexpand(graph, list(keys), case)
+
+    @classmethod
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def _reexpand(cls, graph: ConfigDependencyGraph, keys: list[str],
+                  case: bool):
+        config = _GLOBAL_CFG
+        changed: list[str] = list()
+        resolved = graph.resolved
+        new_base_path = any(casesafe_is_equal(k, BASE_PATH_KEY, case)
+                            for k in keys)
+        if new_base_path:
+            base_path = get_expanded_pathobj(config[BASE_PATH_KEY], config,
+                                             case)
+            _set_global_cfg_value(BASE_PATH_KEY, base_path, case)
+            abs_base_path = base_path.absolute()
+            if abs_base_path != config_dict_get(config, ABS_BASE_PATH_KEY,
+                                                None, case):
+                _set_global_cfg_value(ABS_BASE_PATH_KEY, abs_base_path, case)
+                keys.append(ABS_BASE_PATH_KEY)
+                changed.append(ABS_BASE_PATH_KEY)
+
+        dependents = graph.get_dependents(keys)
+        if not (dependents or new_base_path):
+            return changed
+
+        old = {node: config_dict_get(config, node, None, case)
+               for node in dependents}
+
+        # paths are resolved after everything is expanded, so values that
+        # reference them see them as they were before they were resolved
+        used = set().union(*(graph.dependencies[node] for node in dependents))
+        paths = {node: config_dict_get(config, node, None, case)
+                 for node in resolved if node in used and node not in old}
+        for node in paths:
+            config_dict_set(config, node, resolved[node], case)
+
+        graph.reexpand(config, dependents)
+        for node, value in paths.items():
+            config_dict_set(config, node, value, case)
+
+        base_path = config_dict_get(config, BASE_PATH_KEY,
+                                    case_insensitive=case)
+        for node, value in resolved.items():
+            if node in old:
+                value = resolved[node] = config_dict_get(config, node, None,
+                                                         case)
+
+            elif new_base_path and value:
+                old[node] = config_dict_get(config, node, None, case)
+
+            else:
+                continue
+
+            if value:
+                config_dict_set(config, node, cls.handle_path(value,
+                                                              base_path),
+                                case)
+
+        for node, value in old.items():
+            new = config_dict_get(config, node, None, case)
+            if new != value:
+                changed.append(node)
+                # publish the value as it ended up
+                _set_global_cfg_value(node, new, case)
+
+        return changed
+
+    @classmethod
+    @log_func_call
+    def subscribe(cls, callback: Callable[[tuple[str, ...]], None],
+                  keys: Iterable[str] = None):
+        """
+        Call `callback` after each change made through `set` or `update` with
+        the tuple of keys that changed, including any values that were
+        expanded again because of the change.
+
+        Args:
+            callback (Callable): called with the tuple of changed keys, from
+                whichever thread made the change
+            keys (Iterable[str], optional): only notify of changes to these
+                keys, keys nested in them, or keys they are nested in.
+                Defaults to None, which notifies of every change.
+        """
+        case = cls.get_case()
+        if keys is not None:
+            keys = tuple(casesafe_value(k, case) for k in keys)
+
+        _GLOBAL_CFG_LISTENERS.append((callback, keys))
+
+    @classmethod
+    @log_func_call
+    def unsubscribe(cls, callback: Callable):
+        _GLOBAL_CFG_LISTENERS[:] = [x for x in _GLOBAL_CFG_LISTENERS
+                                    if x[0] is not callback]
+
+    @classmethod
+    @log_func_call(DEBUGLOW2)
+    def get_dependency_graph(cls):
+        "what each value of the global config was expanded from, if known"
+        return _GLOBAL_CFG_DEPS
+
+    @classmethod
+    @log_func_call
+    def set_dependency_graph(cls, graph: ConfigDependencyGraph):
+        global _GLOBAL_CFG_DEPS
+        _GLOBAL_CFG_DEPS = graph
 
     @classmethod
     @log_func_call
@@ -154,10 +436,14 @@ class AppConfig(metaclass=AppConfigType):
         if isinstance(skip_expansion, str):
             skip_expansion = (skip_expansion,)
 
-        for k in config.keys():
-            # print(k)
-            expand_key_recursively(config, k, skip_expansion,
-                                   case_insensitive=case)
+        # every key shares one expander so common references are only
+        # expanded once
+        expander = ConfigExpander(config, skip_expansion,
+                                  case_insensitive=case)
+        expander.expand_all()
+        is_global = config is _GLOBAL_CFG
+        resolved = (_track_global_cfg_expansion(expander).resolved
+                    if is_global else {})
 
         base_path = get_expanded_pathobj(config[BASE_PATH_KEY], config, case)
         config_dict_set(config, BASE_PATH_KEY, base_path, case)
@@ -168,6 +454,7 @@ class AppConfig(metaclass=AppConfigType):
 
             v = config_dict_get(config, k, None, case)
             if v:
+                resolved[casesafe_value(k, case)] = v
                 config_dict_set(config, k, cls.handle_path(v, base_path))
 
         set_trace_logging(config_dict_get(config, LOG_TRACE_ENABLED_KEY,
@@ -178,6 +465,9 @@ class AppConfig(metaclass=AppConfigType):
         set_show_traceback_locals(config_dict_get(config,
                                                   SHOW_TRACEBACK_LOCALS_KEY,
                                                   case_insensitive=case))
+        if is_global:
+            _publish_global_cfg(case)
+
         return config
 
     @classmethod
@@ -193,19 +483,28 @@ class AppConfig(metaclass=AppConfigType):
                           app_global_defaults: dict = {},
                           app_local_defaults: dict = {},
                           case_insensitive: bool = None):
+        global _GLOBAL_CFG_LAYERS
+        # a new config may be processed against a changed filesystem
+        invalidate_path_cache()
         defaults = defaults or get_defaults(cls, app_global_defaults,
                                             app_local_defaults)
 
-        config = deepcopy(defaults)
+        # the layers are kept as given and merged into a new config, so
+        # nothing has to be deep copied to protect the defaults.  In
+        # case-insensitive mode, every dict in the config is a
+        # CaseInsensitiveDict so lookups don't have to scan all the keys.
+        case = cls.get_case(case_insensitive)
+        layers = ConfigLayers([(DEFAULTS_LAYER, defaults)], case)
         if indata:
-            config_dict_update(config, indata if isinstance(indata, dict)
-                               else load_jsonc(indata), case_insensitive)
+            layers.set_layer(CONFIG_FILE_LAYER,
+                             indata if isinstance(indata, dict)
+                             else load_jsonc(indata))
 
         if overrides:
-            config_dict_update(config, overrides, case_insensitive)
+            layers.set_layer(OVERRIDES_LAYER, overrides)
 
-        global _GLOBAL_CFG
-        _GLOBAL_CFG = config
+        _GLOBAL_CFG_LAYERS = layers
+        _set_global_cfg(layers.merged(), case)
 
     @classmethod
     @log_func_call
@@ -214,17 +513,14 @@ class AppConfig(metaclass=AppConfigType):
         # expansions so further error messages can be logged.
         # All of these keys are hardcoded, so we don't need to worry about case
         config = _GLOBAL_CFG
-        expand_key_recursively(config, BASE_PATH_KEY, skip_expansion)
-        expand_key_recursively(config, BASE_LOG_DIR_KEY, skip_expansion)
-        expand_key_recursively(config, LOG_TIMESTAMP_KEY, skip_expansion)
-        expand_key_recursively(config, APPEND_LOG_KEY, skip_expansion)
-        expand_key_recursively(config, CLI_LOG_LEVEL_KEY, skip_expansion)
-        expand_key_recursively(config, FILE_LOG_LEVEL_KEY, skip_expansion)
-        expand_key_recursively(config, LOG_TRACE_ENABLED_KEY, skip_expansion)
-        expand_key_recursively(config, LOG_FUNC_CALL_ENABLED_KEY,
-                               skip_expansion)
-        expand_key_recursively(config, SHOW_TRACEBACK_LOCALS_KEY,
-                               skip_expansion)
+        expander = ConfigExpander(config, skip_expansion)
+        expander.expand_all((
+            BASE_PATH_KEY, BASE_LOG_DIR_KEY, LOG_TIMESTAMP_KEY, APPEND_LOG_KEY,
+            CLI_LOG_LEVEL_KEY, FILE_LOG_LEVEL_KEY, LOG_TRACE_ENABLED_KEY,
+            LOG_FUNC_CALL_ENABLED_KEY, SHOW_TRACEBACK_LOCALS_KEY,
+            LOG_ASYNC_KEY, LOG_ASYNC_POLICY_KEY,
+        ))
+        _track_global_cfg_expansion(expander)
         base_path = get_expanded_pathobj(config[BASE_PATH_KEY], config)
         logdir = config_dict_get(config, BASE_LOG_DIR_KEY)
         timestamp_name = config_dict_get(config, LOG_TIMESTAMP_KEY)
@@ -235,16 +531,21 @@ class AppConfig(metaclass=AppConfigType):
         log_func_call_enabled = config_dict_get(config,
                                                 LOG_FUNC_CALL_ENABLED_KEY)
         tb_locals_enabled = config_dict_get(config, SHOW_TRACEBACK_LOCALS_KEY)
+        log_async = config_dict_get(config, LOG_ASYNC_KEY, False)
+        log_async_policy = config_dict_get(config, LOG_ASYNC_POLICY_KEY,
+                                           'block')
+        _publish_global_cfg(cls.get_case())
         return (cls.handle_path(logdir, base_path), timestamp_name,
                 append_log, cli_log_level, file_log_level, log_trace_enabled,
-                tb_locals_enabled, log_func_call_enabled)
+                tb_locals_enabled, log_func_call_enabled, log_async,
+                log_async_policy)
 
     @classmethod
     @log_func_call
     def handle_path(cls, x: str, base_path: Path,
                     case_insensitive: bool = None) -> Path:
-        newppp = get_expanded_pureposixpath(x, _GLOBAL_CFG, case_insensitive)
-        newpath = pureposixpath_to_pathobj(newppp)
+        newpath = get_expanded_pathobj(x, _GLOBAL_CFG, case_insensitive,
+                                       resolve=False)
 
         # any relative paths are assumed to be wrt base path for now
         newpathstr = str(newpath)
@@ -0,0 +1,136 @@
+import sys
+import pickle
+from os import environ, stat as osstat, replace as osreplace
+from pathlib import Path
+from hashlib import sha256
+
+from ..logging import log_func_call, log_debug
+from ..version import __version__
+from ..utils.paths import EXPANDUSER_ENV_VARS
+
+ENV_PYRANDYOS_CONFIG_CACHE = 'PYRANDYOS_CONFIG_CACHE'
+"""
+If set, names a directory where fully processed app configs are kept between
+runs, overriding the app's `APP_CONFIG_CACHE_DIR`.  Setting it to an empty
+string disables the cache.
+"""
+CONFIG_CACHE_FORMAT = 2
+"bumped whenever the layout of a cache record changes"
+
+
+def get_config_cache_dir(default: str | Path = None):
+    cachedir = environ.get(ENV_PYRANDYOS_CONFIG_CACHE, default)
+    return Path(cachedir) if cachedir else None
+
+
+def get_file_signature(fn: Path):
+    "returns the (mtime, size) of the file, or None if it does not exist"
+    try:
+        st = osstat(fn)
+    except OSError:
+        return None
+
+    return st.st_mtime_ns, st.st_size
+
+
+def get_file_digest(fn: Path):
+    try:
+        return sha256(Path(fn).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def get_inputs_digest(*inputs):
+    """
+    Returns a digest of the given values, or None if they can't be pickled
+    (in which case there is nothing to key a cache on).
+    """
+    try:
+        data = pickle.dumps((CONFIG_CACHE_FORMAT, __version__,
+                             sys.implementation.cache_tag, inputs),
+                            pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+    return sha256(data).hexdigest()
+
+
+class ConfigCache:
+    """
+    On-disk cache of a fully processed config, so that the JSONC parsing and
+    variable expansion can be skipped when nothing that went into them has
+    changed.
+
+    A cached record is only used if all of the following still match what
+    they were when it was saved:
+
+    - `inputs_digest`, a digest of everything passed in by the app (defaults,
+      overrides, the package versions, and so on; see `get_inputs_digest()`)
+    - each source file.  Files are first compared by mtime and size, and only
+      if those changed are they compared by content hash, so a warm start
+      never has to read them.  A file that did not exist must still not.
+    - the value (or absence) of each environment variable the config used
+
+    The records are pickles, so the cache directory should not be writable by
+    anyone the app should not trust.
+    """
+    def __init__(self, cachefile: Path, inputs_digest: str):
+        self.cachefile = Path(cachefile)
+        self.inputs_digest = inputs_digest
+
+    @log_func_call
+    def load(self) -> dict | None:
+        "returns the cached data, or None if the cache is missing or stale"
+        try:
+            record = pickle.loads(self.cachefile.read_bytes())
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError):
+            # a missing or damaged cache just means processing from scratch
+            return None
+
+        if not (isinstance(record, dict)
+                and record.get('format') == CONFIG_CACHE_FORMAT
+                and record.get('inputs') == self.inputs_digest):
+            return None
+
+        for name, value in record['env'].items():
+            if environ.get(name) != value:
+                log_debug(f'config cache stale: ${name} changed')
+                return None
+
+        for fn, (signature, digest) in record['files'].items():
+            if get_file_signature(fn) == signature:
+                continue
+
+            if signature is None or get_file_digest(fn) != digest:
+                log_debug(f'config cache stale: {fn} changed')
+                return None
+
+        return record['data']
+
+    @log_func_call
+    def save(self, data: dict, files: list[str | Path] = (),
+             env_names: set[str] = ()):
+        """
+        Saves `data` to the cache, to be returned by `load()` until any of the
+        given source files or environment variables change.  Failing to write
+        the cache is not an error.
+        """
+        env_names = set(env_names).union(EXPANDUSER_ENV_VARS)
+        record = {
+            'format': CONFIG_CACHE_FORMAT,
+            'inputs': self.inputs_digest,
+            'env': {name: environ.get(name) for name in sorted(env_names)},
+            'files': {str(fn): (get_file_signature(fn), get_file_digest(fn))
+                      for fn in files},
+            'data': data,
+        }
+        cachefile = self.cachefile
+        tmpfile = cachefile.with_name(f'{cachefile.name}.tmp')
+        try:
+            payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+            cachefile.parent.mkdir(parents=True, exist_ok=True)
+            tmpfile.write_bytes(payload)
+            osreplace(tmpfile, cachefile)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            log_debug(f'could not save config cache {cachefile}: {e}')
@@ -9,7 +9,7 @@ from .keys import (
     CONFIG_PACKAGE_DIR_KEY, CONFIG_PACKAGE_VERSION_KEY,
     SHOW_TRACEBACK_LOCALS_KEY, QRC_FILE_KEY, LOG_FUNC_CALL_ENABLED_KEY,
     STATUSBAR_LOG_LEVEL_KEY, PYTHON_VERSION_KEY, PYTHON_EXE_PATH_KEY,
-    MONOFONT_KEY,
+    MONOFONT_KEY, LOG_ASYNC_KEY, LOG_ASYNC_POLICY_KEY,
 )
 
 # defaults
@@ -25,6 +25,8 @@ DEFAULTS = {
     LOG_TRACE_ENABLED_KEY: False,
     LOG_FUNC_CALL_ENABLED_KEY: False,
     SHOW_TRACEBACK_LOCALS_KEY: False,
+    LOG_ASYNC_KEY: False,
+    LOG_ASYNC_POLICY_KEY: "block",  # or "drop_oldest", "drop_below_level"
     QRC_FILE_KEY: f'${{{CONFIG_PACKAGE_DIR_KEY}}}/gui/styles/assets/vibedark.qrc',  # noqa: E501
     PYTHON_VERSION_KEY: sys.version,
     PYTHON_EXE_PATH_KEY: sys.executable,
@@ -1,22 +1,275 @@
 from os import environ
 from pathlib import Path
+from collections.abc import Iterable
 
 from ..logging import log_func_call, DEBUGLOW2
-from ..utils.expandvars import substitute_key, get_unresolved_keys
-from ..utils.cfgdict import config_dict_get, config_dict_set
+from ..utils.expandvars import (
+    get_var_names, substitute_vars, record_var_lookup,
+)
+from ..utils.cfgdict import (
+    config_dict_get, config_dict_set, is_related_config_key,
+)
 from ..utils.constants import IS_WIN32
-from ..utils.casesafe import casesafe_value_in_container
+from ..utils.casesafe import casesafe_value, casesafe_value_in_container
 
 
-@log_func_call(DEBUGLOW2, trace_only=True)
-def _expand_nested(config: dict, key: str, value,
-                   skip_expansion: str | list[str] | tuple[str] = None,
-                   case_insensitive: bool = IS_WIN32):
-    case = case_insensitive
-    expand_key_recursively(config, key, skip_expansion, case_insensitive=case)
-    return substitute_key(value, key,
-                          config_dict_get(config, key,
-                                          case_insensitive=case), case)
+class ConfigExpansionCycleError(ValueError):
+    "raised when config values reference each other in a loop"
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__('config variables reference each other in a cycle: '
+                         + ' -> '.join(cycle))
+
+
+class ConfigExpander:
+    """
+    Expands the "$var"/"${a.b}" references in the values of a config dict.
+
+    Each value is parsed once for the names it references.  Names that are
+    config keys are expanded first (depth first, so the config is expanded in
+    dependency order), and each key is only ever expanded once per expander,
+    no matter how many other values reference it.  Names that are not config
+    keys are taken from the environment.  Reference cycles raise a
+    `ConfigExpansionCycleError` instead of recursing forever.
+
+    After expanding, `dependencies` and `env_dependencies` hold the config keys
+    and environment variables each expanded key used, `unresolved` holds the
+    names that could not be found for each key, and `sources` holds the value
+    each key had before it was expanded.
+    """
+    def __init__(self, config: dict,
+                 skip_expansion: str | list[str] | tuple[str] = None,
+                 fail: bool = False, case_insensitive: bool = IS_WIN32):
+        skip_expansion = skip_expansion or ()
+        if isinstance(skip_expansion, str):
+            skip_expansion = (skip_expansion,)
+
+        self.config = config
+        self.skip_expansion = skip_expansion
+        self.fail = fail
+        self.case_insensitive = case_insensitive
+        self.dependencies: dict[str, set[str]] = dict()
+        self.env_dependencies: dict[str, set[str]] = dict()
+        self.unresolved: dict[str, list[str]] = dict()
+        self.sources: dict[str, str] = dict()
+        self._expanded: dict[str, object] = dict()
+        self._active: dict[str, str] = dict()
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def expand(self, key: str, set_value: bool = True):
+        """
+        Returns the fully expanded value for the given (possibly dotted) key.
+        When `set_value` is True, the expanded value is stored back in the
+        config.  Referenced keys are always stored back.
+        """
+        return self._expand(key, set_value)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def expand_all(self, keys: Iterable[str] = None):
+        "expands the given keys, or every top-level key in the config"
+        for key in tuple(self.config.keys() if keys is None else keys):
+            self._expand(key, True)
+
+    def _node(self, key: str):
+        return casesafe_value(key, self.case_insensitive)
+
+    def _load(self, key: str):
+        value = config_dict_get(self.config, key,
+                                case_insensitive=self.case_insensitive)
+        return str(value) if isinstance(value, Path) else value
+
+    def _config_refs(self, value: str):
+        case = self.case_insensitive
+        config = self.config
+        return [name for name in get_var_names(value)
+                if not casesafe_value_in_container(self.skip_expansion, name,
+                                                   case)
+                and ('.' in name
+                     or casesafe_value_in_container(config, name, case))]
+
+    def _check_cycle(self, key: str):
+        active = self._active
+        node = self._node(key)
+        if node in active:
+            cycle = list(active.values())
+            raise ConfigExpansionCycleError(cycle[cycle.index(active[node]):]
+                                            + [key])
+
+    def _expand(self, key: str, set_value: bool):
+        node = self._node(key)
+        expanded = self._expanded
+        if node in expanded:
+            return expanded[node]
+
+        # depth first with an explicit stack rather than recursion so long
+        # chains of references can't run into the recursion limit.  A key is
+        # only finished once everything it references has been.
+        active = self._active
+        self._check_cycle(key)
+        loaded: dict[str, object] = dict()
+        stack = [key]
+        while stack:
+            k = stack[-1]
+            n = self._node(k)
+            if n in expanded:
+                stack.pop()
+                continue
+
+            if n not in active:
+                value = loaded[n] = self._load(k)
+                if isinstance(value, str) and '$' in value:
+                    active[n] = k
+                    pending = [name for name in self._config_refs(value)
+                               if self._node(name) not in expanded]
+                    for name in pending:
+                        self._check_cycle(name)
+
+                    if pending:
+                        stack.extend(reversed(pending))
+                        continue
+
+            value = loaded.pop(n)
+            if n in active:
+                self.sources[n] = value
+                value = self._expand_str(n, value)
+                del active[n]
+
+            expanded[n] = value
+            stack.pop()
+            if n != node or set_value:
+                config_dict_set(self.config, k, value, self.case_insensitive)
+
+        return expanded[node]
+
+    def _expand_str(self, node: str, value: str):
+        case = self.case_insensitive
+        config = self.config
+        deps = self.dependencies.setdefault(node, set())
+        envdeps = self.env_dependencies.setdefault(node, set())
+        unresolved: list[str] = list()
+        while True:
+            lookup: dict[str, str] = dict()
+            for name in get_var_names(value):
+                if name in lookup:
+                    continue
+
+                if casesafe_value_in_container(self.skip_expansion, name,
+                                               case):
+                    continue
+
+                record_var_lookup(name)
+                if '.' in name or casesafe_value_in_container(config, name,
+                                                              case):
+                    deps.add(self._node(name))
+                    lookup[name] = str(self._expand(name, True))
+
+                elif name in environ:
+                    envdeps.add(name)
+                    lookup[name] = environ[name]
+
+                elif self.fail:
+                    raise KeyError(f'unknown key: {name}')
+
+                elif name not in unresolved:
+                    unresolved.append(name)
+
+            newvalue = substitute_vars(value, lookup) if lookup else value
+            # substituted environment values may bring their own references,
+            # so keep going until nothing changes
+            if newvalue == value:
+                break
+
+            value = newvalue
+
+        if unresolved:
+            self.unresolved[node] = unresolved
+
+        return value
+
+
+class ConfigDependencyGraph:
+    """
+    Which config keys each expanded value referenced and what its unexpanded
+    value was, collected from `ConfigExpander`s.  This is what is needed to
+    re-expand only the values affected by a change to some keys, rather than
+    the whole config.
+
+    `resolved` is for the owner of the config to keep, for keys whose values
+    are processed further after being expanded (e.g. resolved to paths), the
+    expanded value from before that, so the processing can be redone.
+    """
+    def __init__(self, skip_expansion: str | list[str] | tuple[str] = None,
+                 case_insensitive: bool = IS_WIN32):
+        self.skip_expansion = skip_expansion
+        self.case_insensitive = case_insensitive
+        self.sources: dict[str, str] = dict()
+        self.dependencies: dict[str, set[str]] = dict()
+        self.dependents: dict[str, set[str]] = dict()
+        self.resolved: dict[str, object] = dict()
+
+    def add(self, expander: ConfigExpander):
+        "adds (or replaces) the records for the keys the expander expanded"
+        deps = expander.dependencies
+        for node, source in expander.sources.items():
+            self.set_source(node, source, deps.get(node, ()))
+
+    def set_source(self, key: str, source: str, dependencies: Iterable[str]):
+        node = casesafe_value(key, self.case_insensitive)
+        self._drop(node)
+        self.sources[node] = source
+        self.dependencies[node] = set(dependencies)
+        for dep in dependencies:
+            self.dependents.setdefault(dep, set()).add(node)
+
+    def _drop(self, node: str):
+        self.sources.pop(node, None)
+        for dep in self.dependencies.pop(node, ()):
+            self.dependents[dep].discard(node)
+
+    def forget(self, key: str):
+        "drops the records for a key that was set to a final value"
+        node = casesafe_value(key, self.case_insensitive)
+        self._drop(node)
+        self.resolved.pop(node, None)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def get_dependents(self, keys: Iterable[str]) -> list[str]:
+        """
+        Returns every key whose expanded value depends on any of the given
+        keys, directly or through other keys.  A reference to a key nested in
+        or containing a given key counts as depending on it.
+        """
+        case = self.case_insensitive
+        stack = [casesafe_value(k, case) for k in keys]
+        found: dict[str, None] = dict()
+        while stack:
+            key = stack.pop()
+            for dep, users in self.dependents.items():
+                if users and is_related_config_key(dep, key):
+                    for node in sorted(users):
+                        if node not in found:
+                            found[node] = None
+                            stack.append(node)
+
+        return list(found)
+
+    @log_func_call(DEBUGLOW2, trace_only=True)
+    def reexpand(self, config: dict, keys: Iterable[str]):
+        """
+        Puts the unexpanded value back for each of the given keys and expands
+        them again against the rest of `config`, updating the records to
+        match.  Returns the expander used.
+        """
+        case = self.case_insensitive
+        keys = [casesafe_value(k, case) for k in keys]
+        for node in keys:
+            config_dict_set(config, node, self.sources[node], case)
+
+        expander = ConfigExpander(config, self.skip_expansion,
+                                  case_insensitive=case)
+        expander.expand_all(keys)
+        self.add(expander)
+        return expander
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
@@ -24,36 +277,5 @@ def expand_key_recursively(config: dict, key: str,
                            skip_expansion: str | list[str] | tuple[str] = None,
                            fail: bool = False, set_value: bool = True,
                            case_insensitive: bool = IS_WIN32):
-    case = case_insensitive
-    skip_expansion = skip_expansion or ()
-    if isinstance(skip_expansion, str):
-        skip_expansion = (skip_expansion,)
-
-    value = config_dict_get(config, key, case_insensitive=case)
-    if isinstance(value, Path):
-        value = str(value)
-    while isinstance(value, str) and '$' in value:
-        needed_keys = get_unresolved_keys(value)
-        skipped = 0
-        for k in needed_keys:
-            if casesafe_value_in_container(skip_expansion, k, case):
-                skipped += 1
-                continue
-            if '.' in k or casesafe_value_in_container(config, k, case):
-                value = _expand_nested(config, k, value, skip_expansion,
-                                       case)
-            elif k in environ:
-                value = substitute_key(value, k, environ[k])
-            else:
-                if fail:
-                    raise KeyError(f'unknown key: {k}')
-                else:
-                    skipped += 1
-
-        if skipped and skipped == len(needed_keys):
-            break
-
-    if set_value:
-        config_dict_set(config, key, value, case)
-
-    return value
+    expander = ConfigExpander(config, skip_expansion, fail, case_insensitive)
+    return expander.expand(key, set_value)
@@ -18,6 +18,8 @@ LOCAL_CONFIG_FILE_KEY = 'local_config_file'
 LOG_TRACE_ENABLED_KEY = 'log_trace_enabled'
 LOG_FUNC_CALL_ENABLED_KEY = 'log_func_call_enabled'
 SHOW_TRACEBACK_LOCALS_KEY = 'show_traceback_locals'
+LOG_ASYNC_KEY = 'log_async'
+LOG_ASYNC_POLICY_KEY = 'log_async_policy'
 LOCAL_CFG_KEY = 'local'
 QRC_FILE_KEY = 'qrc_file'
 QRC_PYFILE_KEY = 'qrc_pyfile'
@@ -54,6 +56,12 @@ LOGDIRKEYS = (
 # END FIXED KEYS
 ################
 
+# names of the layers the global config is built from, lowest priority first
+DEFAULTS_LAYER = 'defaults'
+CONFIG_FILE_LAYER = 'config_file'
+OVERRIDES_LAYER = 'overrides'
+LOCAL_LAYER = 'local'
+
 
 def get_path_keys(app_path_keys: tuple[str] = ()):
     return PATH_KEYS + app_path_keys
@@ -1,17 +1,22 @@
 from pathlib import Path
-from copy import deepcopy
 
 from ..utils.json import load_jsonc, save_json, jsonify
 from ..utils.cfgdict import (
     config_dict_update, config_dict_get, config_dict_set,
 )
+from ..utils.cfglayers import copy_config_tree, ConfigLayers
 from ..utils.constants import IS_WIN32
-from ..utils.casesafe import casesafe_value_in_container, casesafe_is_equal
+from ..utils.casesafe import (
+    casesafe_value_in_container, casesafe_is_equal, casesafe_value,
+)
 
 from ..logging import log_func_call
 from .appconfig import AppConfig
-from .expandutils import expand_key_recursively
-from .keys import get_path_keys, LOCAL_CONFIG_FILE_KEY, LOCAL_CFG_KEY
+from .expandutils import ConfigExpander
+from .keys import (
+    get_path_keys, LOCAL_CONFIG_FILE_KEY, LOCAL_CFG_KEY, LOCAL_LAYER,
+    BASE_PATH_KEY,
+)
 
 
 @log_func_call
@@ -26,9 +31,11 @@ def load_local_config():
 def process_local_config(base: dict = None, app_path_keys: tuple[str] = (),
                          case_insensitive: bool = None):
     "returns True if a local config was found and loaded, else False"
+    layers = None
     if not base:
         base = AppConfig.get_global_config()
         case = AppConfig.get_case(case_insensitive)
+        layers = AppConfig.get_config_layers()
     else:
         case = IS_WIN32 if case_insensitive is None else case_insensitive
 
@@ -38,16 +45,57 @@ def process_local_config(base: dict = None, app_path_keys: tuple[str] = (),
         from ..logging import log_info
         log_info(f"Using local config: {AppConfig[LOCAL_CONFIG_FILE_KEY]}")
 
-    for k in local_cfg.keys():
-        expand_key_recursively(local_cfg, k, case_insensitive=case)
+    if layers:
+        set_local_layer(layers, local_cfg)
 
-    config_dict_update(get_local_config(base), local_cfg, case)
-    AppConfig.process_config(config=base, app_path_keys=app_path_keys,
-                             case_insensitive=case)
+    # the rest of the config has already been processed, so only the values
+    # from the local config need to be
+    config_dict_update(get_local_config(base, case),
+                       expand_local_config(local_cfg, base, app_path_keys,
+                                           case),
+                       case)
+    if base is AppConfig.get_global_config():
+        AppConfig.publish_config_snapshot(case)
 
     return use_local
 
 
+@log_func_call
+def set_local_layer(layers: ConfigLayers, local_cfg: dict):
+    # the local config is applied key by key on top of the local defaults
+    layers.set_layer(LOCAL_LAYER, {f'{LOCAL_CFG_KEY}.{k}': v
+                                   for k, v in local_cfg.items()})
+
+
+@log_func_call
+def expand_local_config(local_cfg: dict, base: dict,
+                        app_path_keys: tuple[str] = (),
+                        case_insensitive: bool = IS_WIN32):
+    """
+    Returns a processed copy of the given verbatim local config, with its
+    variables expanded and its path keys resolved against the base path of
+    the (already processed) config `base`, just as they are when the local
+    config is merged into `base`.  `local_cfg` itself is not modified.
+    """
+    case = case_insensitive
+    local_cfg = copy_config_tree(local_cfg, case)
+    ConfigExpander(local_cfg, case_insensitive=case).expand_all()
+
+    base_path = config_dict_get(base, BASE_PATH_KEY, case_insensitive=case)
+    prefix = casesafe_value(f'{LOCAL_CFG_KEY}.', case)
+    for k in get_path_keys(app_path_keys):
+        if not casesafe_value(k, case).startswith(prefix):
+            continue
+
+        k = k[len(prefix):]
+        v = config_dict_get(local_cfg, k, None, case)
+        if v:
+            config_dict_set(local_cfg, k, AppConfig.handle_path(v, base_path),
+                            case)
+
+    return local_cfg
+
+
 @log_func_call
 def get_local_config(base: dict = None, case_insensitive: bool = None):
     if not base:
@@ -68,13 +116,11 @@ def save_local_config(app_path_keys: tuple = (),
     # get the verbatim contents of "old" local config
     old_local_cfg = load_local_config()
 
-    # make a temp copy of current global config
-    cfgtmp = deepcopy(AppConfig.get_global_config())
-
-    # process the "old" local config with the temp global copy to get
-    # "old" expansions
-    process_local_config(cfgtmp, app_path_keys, case)
-    old_local_expanded = get_local_config(cfgtmp, case)
+    # process the "old" local config the same way it was when loaded to get
+    # the "old" expansions.  Only the local config itself needs processing.
+    old_local_expanded = expand_local_config(old_local_cfg,
+                                             AppConfig.get_global_config(),
+                                             app_path_keys, case)
 
     # check if each key is present in old config.
     # If not, add it to the output.
@@ -108,5 +154,9 @@ def save_local_config(app_path_keys: tuple = (),
     # save the new output local config
     local_cfg_path: Path = AppConfig[LOCAL_CONFIG_FILE_KEY]
     save_json(local_cfg_path, jsonify(out))
+    layers = AppConfig.get_config_layers()
+    if layers:
+        set_local_layer(layers, out)
+
     from ..logging import log_info
     log_info(f'local config saved to {local_cfg_path}')
@@ -0,0 +1,110 @@
+import pickle
+from os import fdopen, remove
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from tempfile import mkstemp
+from logging.handlers import QueueListener
+
+from ..logging import log_func_call, log_debug, get_log_level_gate
+from ..utils.log import create_worker_log_listener
+
+SHARED_CONFIG_FORMAT = 1
+"bumped whenever the layout of a shared config blob changes"
+SHARED_CONFIG_DIR = Path('/dev/shm')
+"""
+preferred directory for shared config blobs where it exists, since files there
+live in shared memory rather than on disk
+"""
+
+
+def get_shared_config_dir():
+    return SHARED_CONFIG_DIR if SHARED_CONFIG_DIR.is_dir() else None
+
+
+class SharedConfig:
+    """
+    Config data published once to a memory-mapped file, so that worker
+    processes can attach to it with `load()` instead of processing the config
+    themselves or each being sent their own pickled copy.  The blob is only
+    ever mapped read-only, and is unpickled straight out of the mapping.
+
+    If a `multiprocessing` queue is given as `log_queue`, the records that
+    workers send to it (see `setup_worker_logging()`) are written by this
+    process's log handlers until `close()`.
+
+    The publishing process owns the file and removes it in `close()`, which
+    must not be called before the workers have finished starting up.
+    """
+    def __init__(self, data: dict, log_queue=None,
+                 dirpath: str | Path = None,
+                 prefix: str = 'pyrandyos-config-'):
+        payload = pickle.dumps({'format': SHARED_CONFIG_FORMAT, 'data': data},
+                               pickle.HIGHEST_PROTOCOL)
+        fd, path = mkstemp('.pickle', prefix,
+                           dirpath or get_shared_config_dir())
+        try:
+            with fdopen(fd, 'wb') as f:
+                f.write(payload)
+        except BaseException:
+            remove(path)
+            raise
+
+        self.path = Path(path)
+        self.size = len(payload)
+        self.log_queue = log_queue
+        self.log_level = get_log_level_gate()
+        self.log_listener: QueueListener = None
+        if log_queue is not None:
+            self.log_listener = create_worker_log_listener(log_queue)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.path} ({self.size} bytes)>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def initargs(self):
+        """
+        the arguments for the worker initializer (see
+        `PyRandyOSApp.init_worker()`): the blob path, the log queue and the
+        lowest level worth sending to it
+        """
+        return str(self.path), self.log_queue, self.log_level
+
+    @log_func_call
+    def close(self):
+        listener = self.log_listener
+        if listener:
+            self.log_listener = None
+            listener.stop()
+
+        queue = self.log_queue
+        if queue is not None and hasattr(queue, 'join_thread'):
+            queue.close()
+            queue.join_thread()
+
+        path = self.path
+        if path:
+            self.path = None
+            try:
+                remove(path)
+            except OSError as e:
+                log_debug(f'could not remove shared config {path}: {e}')
+
+    @staticmethod
+    @log_func_call
+    def load(path: str | Path) -> dict:
+        "attach to a published config blob and return its data"
+        with open(path, 'rb') as f, mmap(f.fileno(), 0,
+                                         access=ACCESS_READ) as m:
+            record = pickle.loads(m)
+
+        if not (isinstance(record, dict)
+                and record.get('format') == SHARED_CONFIG_FORMAT):
+            raise ValueError(f'{path} is not a compatible shared config')
+
+        return record['data']
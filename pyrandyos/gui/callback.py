@@ -1,7 +1,8 @@
 from collections.abc import Callable
+from traceback import FrameSummary
 
 from ..logging import log_func_call
-from ..utils.stack import get_stack_frame, get_framesummary_for_frame
+from ..utils.stack import get_stack_frame
 
 
 class QtCallable:
@@ -10,14 +11,43 @@ class QtCallable:
         # stacklevel arg should account for this function at a minimum, hence 1
         # but then we need to add 1 for get_stack_frame.  This should end up
         # returning the frame that called the QtCallable ctor
-        fs = get_framesummary_for_frame(get_stack_frame(stacklevel + 1))
-        self.caller = fs
-        self.caller_line = fs.line
+        f = get_stack_frame(stacklevel + 1)
+        code = f.f_code
+        # only keep where we were created; the full FrameSummary is built on
+        # demand, which in practice means when a callback raises
+        self._caller_loc = (code.co_filename, f.f_lineno, code.co_name)
+        self._caller: FrameSummary = None
+        self._wrapped: Callable = None
+
+    @property
+    def caller(self):
+        if self._caller is None:
+            self._caller = FrameSummary(*self._caller_loc)
+
+        return self._caller
+
+    @property
+    def caller_line(self):
+        return self.caller.line
+
+    @property
+    def wrapped(self):
+        # build the instrumented callable once rather than on every signal
+        wrapped = self._wrapped
+        if wrapped is None:
+            wrapped = self._wrapped = log_func_call(self.func)
+
+        return wrapped
 
     def __call__(self, *args, **kwargs):
-        caller = self.caller  # noqa: F841
-        caller_line = self.caller_line  # noqa: F841
-        return log_func_call(self.func)(*args, **kwargs)
+        try:
+            return self.wrapped(*args, **kwargs)
+        except BaseException:
+            # these show up in the traceback locals to say where the callback
+            # was connected from
+            caller = self.caller  # noqa: F841
+            caller_line = self.caller_line  # noqa: F841
+            raise
 
 
 def qt_callback(f: Callable):
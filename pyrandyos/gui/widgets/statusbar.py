@@ -7,7 +7,7 @@ from ...app import PyRandyOSApp
 from ...logging import (
     INFO, LOGSTDERR, LOGSTDOUT, LOGTQDM, WARNING, ERROR, CRITICAL, DEBUG,
     log_func_call, get_logger, get_loglevel_num_name, make_log_record,
-    log_debuglow2, log_debug,
+    log_debuglow2, log_debug, update_log_level_gate,
 )
 from ...utils.log import (
     check_loglevel, MillisecondFormatter, LogMultiFormatter,
@@ -196,6 +196,7 @@ class LoggingStatusBarWidget(QtWidgetWrapper[QStatusBar]):
         msglog.setFormatter(fmt)
         msglog.addFilter(StatusMsgLogFilter())
         get_logger().root.addHandler(msglog)
+        update_log_level_gate()
         return msglog
 
     @log_func_call
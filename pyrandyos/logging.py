@@ -4,15 +4,18 @@ from os import environ as _environ
 from typing import (
     TypeVar as _TypeVar, overload as _overload, Any as _Any
 )
-from types import TracebackType as _TracebackType
+from types import TracebackType as _TracebackType, CodeType as _CodeType
 from collections.abc import Callable as _Callable, Mapping as _Mapping
 from traceback import format_exception_only
 from functools import partial as _partial
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
 # want to export these for convenience, so they are not hidden by default
 from logging import (  # noqa: F401
     getLogger as _getLogger, WARN, ERROR, DEBUG, INFO, CRITICAL, WARNING,
     Logger, getLevelName as _getLevelName, LogRecord as _LogRecord,
+    Handler as _Handler,
 )
+import logging as _logging
 try:
     from logging import getLevelNamesMapping as _getLevelNamesMapping
 except ImportError:
@@ -20,7 +23,8 @@ except ImportError:
     _getLevelNamesMapping = None
 
 from .utils.signature_wrapper import (
-    generate_signature_aware_wrapper as _sig_aware_wrapper
+    generate_signature_aware_wrapper as _sig_aware_wrapper,
+    set_signature_wrapper_passthrough as _set_wrapper_passthrough,
 )
 from ._testing.debug import is_debug_enabled
 from .utils.stack import (
@@ -53,6 +57,29 @@ APP_LOG_LEVEL_NAMES = {
 TRACELOG: bool = False
 FUNCCALLLOG: bool = False
 _GLOBAL_LOG: Logger = None
+_LOG_LEVEL_GATE: int = 0
+"""
+minimum level accepted by any attached handler.  Anything logged below this
+level is discarded before a record is built, unless `_below_log_gate()`
+finds that the handlers have changed since it was computed; see
+`update_log_level_gate()`.
+"""
+_LOG_LEVEL_GATE_KEY: list = None
+"handlers and levels the gate was last computed from; see `_log_gate_key()`"
+_FUNC_CALL_WRAPPERS: dict[_Callable, tuple[int, bool]] = _WeakKeyDictionary()
+"registry of log_func_call wrappers mapped to their (level, trace_only)"
+_CODE_LOGGER_CACHE: dict[int, tuple[_CodeType, str, Logger]] = dict()
+"""
+loggers resolved by `get_logger()`, keyed by the id of the calling code
+object.  The code object is kept in the entry to keep the id from being
+reused, and the module name to verify a hit, since the same code can be run
+with other globals.
+"""
+_CODE_LOGGER_CACHE_SIZE = 4096
+"""
+most entries kept in `_CODE_LOGGER_CACHE` before it is emptied, so that code
+compiled on the fly (e.g. by `exec`) can't grow it without bound
+"""
 
 
 def get_global_logger():
@@ -62,6 +89,77 @@ def get_global_logger():
 def set_global_logger(log: Logger):
     global _GLOBAL_LOG
     _GLOBAL_LOG = log
+    update_log_level_gate()
+
+
+def _handler_gate_level(h: _Handler) -> int:
+    # handlers that dispatch to other handlers (e.g. AsyncLogHandler) only
+    # pass on records that at least one of the inner handlers accepts
+    level = h.level
+    inner = getattr(h, 'handlers', None)
+    if inner:
+        level = max(level, min(_handler_gate_level(x) for x in inner))
+
+    return level
+
+
+def compute_log_level_gate() -> int:
+    """
+    Returns the minimum level accepted by any handler attached to any logger
+    (including the last resort handler), i.e. the lowest level for which a
+    record could possibly be emitted.
+    """
+    loggers = [Logger.root, _GLOBAL_LOG]
+    loggers.extend(tuple(Logger.manager.loggerDict.values()))
+    levels = [_handler_gate_level(h) for log in loggers
+              if isinstance(log, Logger) for h in tuple(log.handlers)]
+    last_resort = _logging.lastResort
+    if last_resort:
+        levels.append(last_resort.level)
+
+    return min(levels, default=0)
+
+
+def _log_gate_key():
+    # cheap enough to build on every call the gate rejects: the handlers of
+    # the root and global loggers (where handlers are normally attached, e.g.
+    # by basicConfig or assertLogs) with the levels they accept
+    root = Logger.root
+    key = [(h, _handler_gate_level(h)) for h in root.handlers]
+    log = _GLOBAL_LOG
+    if log is not None and log is not root:
+        key.extend([(h, _handler_gate_level(h)) for h in log.handlers])
+
+    return key
+
+
+def update_log_level_gate():
+    """
+    Recompute the global level gate.  This happens by itself the next time
+    the gate rejects a call after a handler of the root or global logger was
+    added, removed or had its level changed, but should be called manually
+    after adding a handler to any other logger.
+    """
+    global _LOG_LEVEL_GATE, _LOG_LEVEL_GATE_KEY
+    _LOG_LEVEL_GATE_KEY = _log_gate_key()
+    _LOG_LEVEL_GATE = compute_log_level_gate()
+
+
+def _below_log_gate(level: int):
+    """
+    Whether `level` is below the gate, first recomputing the gate if the
+    handlers have changed since it was computed.  Callers compare with
+    `_LOG_LEVEL_GATE` first and only call this if that rejects the level, so
+    that accepted calls stay a single comparison.
+    """
+    if _log_gate_key() != _LOG_LEVEL_GATE_KEY:
+        update_log_level_gate()
+
+    return level < _LOG_LEVEL_GATE
+
+
+def get_log_level_gate():
+    return _LOG_LEVEL_GATE
 
 
 def get_logger(modname: str = None, stacklevel: int = 2) -> Logger:
@@ -69,19 +167,131 @@ def get_logger(modname: str = None, stacklevel: int = 2) -> Logger:
     log = _GLOBAL_LOG
     if log:
         return log
+
+    if modname:
+        return _getLogger(modname)
+
     # default stack level here is 2 because we want to pop off both
-    # get_stack_frame and get_logger.
-    if not modname:
-        f = _get_stack_frame(stacklevel)
-        if f:
-            modname = f.f_globals['__name__']
+    # get_stack_frame and get_logger.  We don't call get_stack_frame here, so
+    # take one off for the sys._getframe equivalent.
+    try:
+        f = _sys._getframe(stacklevel - 1)
+    except ValueError:
+        f = None
+
+    if not f:
+        # if we exhausted the whole stack, it's probably because the issue
+        # is in the main script, so let's just assume it's '__main__'
+        return _getLogger('__main__')
+
+    # the module for a given call site never changes, so only look it up once
+    code = f.f_code
+    name = f.f_globals['__name__']
+    cache = _CODE_LOGGER_CACHE
+    entry = cache.get(id(code))
+    if entry and entry[0] is code and entry[1] == name:
+        return entry[2]
+
+    if len(cache) >= _CODE_LOGGER_CACHE_SIZE:
+        cache.clear()
+
+    log = _getLogger(name)
+    cache[id(code)] = (code, name, log)
+    return log
+
+
+class BoundLogger:
+    """
+    Logging facade bound to a single module, for code that logs often enough
+    that looking up the logger from the call stack matters.  Get one at
+    import time with `get_bound_logger(__name__)` and use its methods in place
+    of the module-level `log_*` functions.
+
+    Like the module-level functions, records go to the global logger instead
+    if one has been set, and anything below the level gate is dropped before
+    a record is built.
+    """
+    __slots__ = ('name', '_logger')
+
+    def __init__(self, name: str):
+        self.name = name
+        self._logger = _getLogger(name)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+    @property
+    def logger(self) -> Logger:
+        return _GLOBAL_LOG or self._logger
+
+    def log(self, level: int | str, msg: str, *args,
+            exc_info: _ExcInfoType | BaseException = None,
+            extra: _Mapping[str, object] = None, stack_info: bool = False,
+            stacklevel: int = 1):
+        __traceback_hide__ = True  # noqa: F841
+        # this function is hidden, so unlike log_message, the stacklevel is
+        # passed to _log as is
+        if not isinstance(level, int):
+            level, _ = get_loglevel_num_name(level)
+
+        if level < _LOG_LEVEL_GATE and _below_log_gate(level):
+            return
+
+        _log(_GLOBAL_LOG or self._logger, level, msg, *args,
+             exc_info=exc_info, extra=extra, stack_info=stack_info,
+             stacklevel=stacklevel)
+
+    def debuglow2(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if DEBUGLOW2 >= _LOG_LEVEL_GATE or not _below_log_gate(DEBUGLOW2):
+            self.log(DEBUGLOW2, msg, *args, **kwargs)
+
+    def debuglow(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if DEBUGLOW >= _LOG_LEVEL_GATE or not _below_log_gate(DEBUGLOW):
+            self.log(DEBUGLOW, msg, *args, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if DEBUG >= _LOG_LEVEL_GATE or not _below_log_gate(DEBUG):
+            self.log(DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if INFO >= _LOG_LEVEL_GATE or not _below_log_gate(INFO):
+            self.log(INFO, msg, *args, **kwargs)
+
+    def warning(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if WARNING >= _LOG_LEVEL_GATE or not _below_log_gate(WARNING):
+            self.log(WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if ERROR >= _LOG_LEVEL_GATE or not _below_log_gate(ERROR):
+            self.log(ERROR, msg, *args, **kwargs)
+
+    def critical(self, msg: str, *args, **kwargs):
+        __traceback_hide__ = True  # noqa: F841
+        if CRITICAL >= _LOG_LEVEL_GATE or not _below_log_gate(CRITICAL):
+            self.log(CRITICAL, msg, *args, **kwargs)
+
+    def exc(self, exc_or_type: type | BaseException = None,
+            exc: BaseException = None,
+            traceback: _TracebackType = None,
+            msg: str = 'Unhandled exception',
+            mark_handled: bool = True,
+            stacklevel: int = 1):
+        "same as `log_exc()`, but logging to this logger"
+        __traceback_hide__ = True  # noqa: F841
+        excnfo = _exc_info(exc_or_type, exc, traceback)
+        self.log(ERROR, msg, exc_info=excnfo, stacklevel=stacklevel)
+        if mark_handled:
+            excnfo[1]._pyrandyos_handled = True
 
-        else:
-            # if we exhausted the whole stack, it's probably because the issue
-            # is in the main script, so let's just assume it's '__main__'
-            modname = '__main__'
 
-    return _getLogger(modname)
+def get_bound_logger(modname: str) -> BoundLogger:
+    return BoundLogger(modname)
 
 
 def log_message(level: int | str, msg: str, *args,
@@ -109,6 +319,12 @@ def log_message(level: int | str, msg: str, *args,
     # THIS function is NOT hidden with __traceback_hide__, and therefore this
     # is the function it would return.  Since we assume we actually want the
     # caller of THIS function, we need to pop one additional level.
+    if not isinstance(level, int):
+        level, _ = get_loglevel_num_name(level)
+
+    if level < _LOG_LEVEL_GATE and _below_log_gate(level):
+        return
+
     _log(get_logger(stacklevel=stacklevel + 2), level, msg, *args,
          exc_info=exc_info, extra=extra, stack_info=stack_info,
          stacklevel=stacklevel + 1)
@@ -130,6 +346,11 @@ def _log_func_call_handler(handler_args: tuple, handler_kwargs: dict,
     level: str | int = handler_args[0]
     trace_only: bool = handler_kwargs.get('trace_only', False)
     stacklevel: int = handler_kwargs.get('stacklevel', 1)
+    levelno = (level if isinstance(level, int)
+               else get_loglevel_num_name(level)[0])
+    if levelno < _LOG_LEVEL_GATE and _below_log_gate(levelno):
+        return func_args, func_kwargs
+
     if get_func_call_logging() and (not trace_only or get_tracelog()):
         log = get_logger(func.__module__)
         try:
@@ -181,8 +402,11 @@ def log_func_call(arg, *,  # noqa: E302
         return arg if callable(arg) else lambda f: f
 
     def log_decorator(func: F) -> F:
-        return _sig_aware_wrapper(func, _log_func_call_handler, level,
-                                  trace_only=trace_only, stacklevel=stacklevel)
+        wrapper = _sig_aware_wrapper(func, _log_func_call_handler, level,
+                                     trace_only=trace_only,
+                                     stacklevel=stacklevel)
+        _register_func_call_wrapper(wrapper, level, trace_only)
+        return wrapper
 
     if callable(arg):
         # Used as @log_func_call
@@ -194,9 +418,41 @@ def log_func_call(arg, *,  # noqa: E302
         return log_decorator
 
 
+def _is_func_call_log_active(trace_only: bool = False):
+    return FUNCCALLLOG and (not trace_only or TRACELOG)
+
+
+def _register_func_call_wrapper(wrapper: _Callable, level: int | str,
+                                trace_only: bool = False):
+    # wrappers are registered so that they can be hot-swapped between the
+    # instrumented path and a plain passthrough whenever the call logging
+    # settings change.  While call logging is off, the passthrough skips the
+    # argument binding and handler entirely.  The level gate is checked in
+    # the handler instead, since it can change without notice.
+    if not isinstance(level, int):
+        try:
+            level, _ = get_loglevel_num_name(level)
+        except ValueError:
+            # level name not registered yet, so never bypass it
+            level = 0
+
+    _FUNC_CALL_WRAPPERS[wrapper] = level, trace_only
+    _set_wrapper_passthrough(wrapper,
+                             not _is_func_call_log_active(trace_only))
+
+
+def _update_func_call_wrappers():
+    for wrapper, args in tuple(_FUNC_CALL_WRAPPERS.items()):
+        _set_wrapper_passthrough(wrapper,
+                                 not _is_func_call_log_active(args[1]))
+
+
 def set_func_call_logging(enabled: bool = True):
     global FUNCCALLLOG
-    FUNCCALLLOG = bool(enabled)
+    enabled = bool(enabled)
+    if enabled != FUNCCALLLOG:
+        FUNCCALLLOG = enabled
+        _update_func_call_wrappers()
 
 
 def get_func_call_logging() -> bool:
@@ -206,7 +462,10 @@ def get_func_call_logging() -> bool:
 
 def set_trace_logging(enabled: bool = True):
     global TRACELOG
-    TRACELOG = bool(enabled)
+    enabled = bool(enabled)
+    if enabled != TRACELOG:
+        TRACELOG = enabled
+        _update_func_call_wrappers()
 
 
 def get_tracelog() -> bool:
@@ -341,6 +600,12 @@ def _log(log: Logger, level: int | str, msg: str, *args,
          extra: _Mapping[str, object] = None,
          stack_info: bool = False, stacklevel: int = 1):
     __traceback_hide__ = True  # noqa: F841
+    if not isinstance(level, int):
+        level, _ = get_loglevel_num_name(level)
+
+    if level < _LOG_LEVEL_GATE and _below_log_gate(level):
+        return
+
     # no need to adjust stacklevel because it excludes __traceback_hide__
     # functions in the stack automatically
     log.handle(make_log_record(level, msg, *args,
@@ -379,3 +644,6 @@ def get_loglevel_num_name(level: str | int):
         name = None
 
     return level, name
+
+
+update_log_level_gate()
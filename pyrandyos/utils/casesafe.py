@@ -1,10 +1,11 @@
 from typing import TypeVar
-from collections.abc import Container, Sequence, Mapping
+from collections.abc import Container, Sequence, Mapping, Iterable
 
 # from ..logging import DEBUGLOW2, log_func_call
 from .constants import NODEFAULT, IS_WIN32
 
 ContainerType = TypeVar('T', bound=Container)
+_MISSING = object()
 
 
 # @log_func_call(DEBUGLOW2, trace_only=True)
@@ -28,6 +29,152 @@ def casesafe_sequence_index(x: Sequence, value,
     return seq.index(casesafe_value(value, case_insensitive))
 
 
+class CaseInsensitiveDict(dict):
+    """
+    `dict` whose keys are matched case-insensitively (as by `casesafe_value`)
+    while keeping the case they were first stored with.
+
+    An index of folded keys is kept up to date as the dict changes, so lookups
+    are O(1) instead of having to fold every key in the dict.  Since it is a
+    real `dict`, it can be used anywhere a plain config dict is expected.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._folded: dict = dict()
+        # use the internal paths so subclasses that block mutation can still
+        # be constructed
+        self._update(*args, **kwargs)
+
+    def __reduce__(self):
+        # the index has to exist before any items are restored
+        return type(self), (list(self.items()),)
+
+    def actual_key(self, key, default=None):
+        "returns the key as stored in the dict that matches the given key"
+        if dict.__contains__(self, key):
+            return key
+
+        return self._folded.get(casesafe_value(key, True), default)
+
+    def _set(self, key, value):
+        actual = self._folded.setdefault(casesafe_value(key, True), key)
+        dict.__setitem__(self, actual, value)
+
+    def _update(self, *args, **kwargs):
+        if args:
+            other, = args
+            items = other.items() if hasattr(other, 'keys') else other
+            for k, v in items:
+                self._set(k, v)
+
+        for k, v in kwargs.items():
+            self._set(k, v)
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __getitem__(self, key):
+        actual = self.actual_key(key, _MISSING)
+        if actual is _MISSING:
+            raise KeyError(key)
+
+        return dict.__getitem__(self, actual)
+
+    def __delitem__(self, key):
+        actual = self._folded.pop(casesafe_value(key, True), _MISSING)
+        if actual is _MISSING:
+            raise KeyError(key)
+
+        dict.__delitem__(self, actual)
+
+    def __contains__(self, key):
+        return (dict.__contains__(self, key)
+                or casesafe_value(key, True) in self._folded)
+
+    def get(self, key, default=None):
+        actual = self.actual_key(key, _MISSING)
+        return default if actual is _MISSING else dict.__getitem__(self,
+                                                                   actual)
+
+    def setdefault(self, key, default=None):
+        actual = self.actual_key(key, _MISSING)
+        if actual is _MISSING:
+            self[key] = default
+            return default
+
+        return dict.__getitem__(self, actual)
+
+    def pop(self, key, default=_MISSING):
+        actual = self._folded.pop(casesafe_value(key, True), _MISSING)
+        if actual is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+
+            return default
+
+        return dict.pop(self, actual)
+
+    def popitem(self):
+        k, v = dict.popitem(self)
+        del self._folded[casesafe_value(k, True)]
+        return k, v
+
+    def update(self, *args, **kwargs):
+        self._update(*args, **kwargs)
+
+    def clear(self):
+        dict.clear(self)
+        self._folded.clear()
+
+    def copy(self):
+        return type(self)(self)
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        new = self.copy()
+        new.update(other)
+        return new
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+def make_case_insensitive(x, case_insensitive: bool = IS_WIN32):
+    """
+    Convert every dict in the given config data, including `x` itself, to a
+    `CaseInsensitiveDict`, recursing through dict values and list items.
+    Lists and existing `CaseInsensitiveDict`s are updated in place.  If
+    `case_insensitive` is False, `x` is returned unchanged.
+    """
+    if not case_insensitive:
+        return x
+
+    if isinstance(x, dict):
+        if not isinstance(x, CaseInsensitiveDict):
+            x = CaseInsensitiveDict(x)
+
+        for k, v in x.items():
+            newv = make_case_insensitive(v, True)
+            if newv is not v:
+                # same key, so this does not change the size of the dict
+                dict.__setitem__(x, k, newv)
+
+    elif isinstance(x, list):
+        for i, v in enumerate(x):
+            x[i] = make_case_insensitive(v, True)
+
+    return x
+
+
+def _casesafe_any_equal(values: Iterable, key):
+    # the same test as `key in casesafe_container(values)` without building
+    # the folded container
+    return any(casesafe_value(z, True) == key for z in values)
+
+
 # @log_func_call(DEBUGLOW2, trace_only=True)
 def casesafe_dict_key_map(d: Mapping, case_insensitive: bool = IS_WIN32):
     return {casesafe_value(x, case_insensitive): x for x in d}
@@ -36,6 +183,16 @@ def casesafe_dict_key_map(d: Mapping, case_insensitive: bool = IS_WIN32):
 # @log_func_call(DEBUGLOW2, trace_only=True)
 def casesafe_dict_get(d: Mapping, key, default=NODEFAULT,
                       case_insensitive: bool = IS_WIN32):
+    if isinstance(d, CaseInsensitiveDict):
+        if case_insensitive:
+            return d.get(key, default)
+
+        return (dict.__getitem__(d, key) if dict.__contains__(d, key)
+                else default)
+
+    if not case_insensitive and isinstance(d, dict):
+        return d[key] if key in d else default
+
     key = casesafe_value(key, case_insensitive)
     lookup = casesafe_dict_key_map(d, case_insensitive)
     return d[lookup[key]] if key in lookup else default
@@ -44,6 +201,20 @@ def casesafe_dict_get(d: Mapping, key, default=NODEFAULT,
 # @log_func_call(DEBUGLOW2, trace_only=True)
 def casesafe_dict_set(d: Mapping, key, value,
                       case_insensitive: bool = IS_WIN32):
+    if isinstance(d, CaseInsensitiveDict):
+        if not case_insensitive and not dict.__contains__(d, key) \
+                and d.actual_key(key) is not None:
+            # an exact-case set would replace the key stored with another
+            # case, which `casesafe_dict_get` would not have matched
+            raise KeyError(key)
+
+        d[key] = value
+        return
+
+    if not case_insensitive and isinstance(d, dict):
+        d[key] = value
+        return
+
     lookup = casesafe_dict_key_map(d, case_insensitive)
     key = casesafe_value(key, case_insensitive)
     key = lookup[key] if key in lookup else key
@@ -58,6 +229,23 @@ def casesafe_key_in_dict(d: Mapping, key, case_insensitive: bool = IS_WIN32):
 # @log_func_call(DEBUGLOW2, trace_only=True)
 def casesafe_value_in_container(c: Container, key,
                                 case_insensitive: bool = IS_WIN32):
+    if isinstance(c, CaseInsensitiveDict):
+        try:
+            return (key in c if case_insensitive
+                    else dict.__contains__(c, key))
+        except TypeError:
+            # unhashable keys just can't be in there
+            return False
+
+    if isinstance(c, (dict, list, tuple, set, frozenset)):
+        if not case_insensitive:
+            try:
+                return key in c
+            except TypeError:
+                return False
+
+        return _casesafe_any_equal(c, casesafe_value(key, True))
+
     # if isinstance(c, Mapping):
     if hasattr(c, 'keys'):
         c = tuple(casesafe_dict_key_map(c, case_insensitive).keys())
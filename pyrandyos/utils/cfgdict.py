@@ -1,9 +1,58 @@
+from functools import lru_cache
+
 # from ..logging import DEBUGLOW2, log_func_call
 from .constants import NODEFAULT, IS_WIN32
 from .casesafe import (
     casesafe_dict_get, casesafe_dict_set, casesafe_key_in_dict,
+    CaseInsensitiveDict,
 )
 
+_MISSING = object()
+
+
+class ConfigKey:
+    """
+    A dot-delimited config key that has been split into its parts once so it
+    can be reused for any number of lookups.  Parts that look like integers
+    also carry their index so lists can be indexed directly.
+
+    Use `compile_config_key` to get one rather than creating it directly, so
+    the same handle is shared by everything using that key.
+    """
+    __slots__ = ('key', 'parts', 'steps')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.parts: tuple[str, ...] = tuple(key.split('.'))
+        self.steps: tuple[tuple[str, int | None], ...] = tuple(
+            (part, _as_index(part)) for part in self.parts
+        )
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.key!r})'
+
+    def __str__(self):
+        return self.key
+
+
+def _as_index(part: str):
+    try:
+        return int(part)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def compile_config_key(key: str) -> ConfigKey:
+    "returns the shared, pre-parsed `ConfigKey` handle for the given key"
+    return ConfigKey(key)
+
+
+def is_related_config_key(a: str, b: str):
+    "whether the two dotted keys are the same or one is nested in the other"
+    return (a == b or (a.startswith(b) and a[len(b)] == '.')
+            or (b.startswith(a) and b[len(a)] == '.'))
+
 
 # @log_func_call(DEBUGLOW2, trace_only=True)
 def try_get_item(config: dict | list | tuple, key: str | int,
@@ -17,7 +66,7 @@ def try_get_item(config: dict | list | tuple, key: str | int,
 
 
 # @log_func_call(DEBUGLOW2, trace_only=True)
-def config_dict_get(config: dict[str] | list | tuple, key: str,
+def config_dict_get(config: dict[str] | list | tuple, key: str | ConfigKey,
                     default=NODEFAULT, case_insensitive: bool = IS_WIN32):
     """
     Get the value from a dict with given key.  If the key contains '.', it
@@ -27,7 +76,8 @@ def config_dict_get(config: dict[str] | list | tuple, key: str,
 
     Args:
         config (dict): dict (of nested dicts or lists) to search for key
-        key (str): key to get from dict or dot-delimited list of keys
+        key (str | ConfigKey): key to get from dict or dot-delimited list
+            of keys
         default (Any, optional): Value to return if key not found.
            Defaults to NODEFAULT, which raises a KeyError if key is not found.
 
@@ -37,25 +87,30 @@ def config_dict_get(config: dict[str] | list | tuple, key: str,
     Returns:
         Any: value for key or default value (if provided)
     """
-    parts = key.split('.', 1)
-    part0 = parts[0]
-    part1 = '.'.join(parts[1:])
-    if hasattr(config, 'get'):
-        value = casesafe_dict_get(config, part0, default, case_insensitive)
+    handle = key if isinstance(key, ConfigKey) else compile_config_key(key)
+    value = config
+    for part, index in handle.steps:
+        if hasattr(value, 'get'):
+            value = casesafe_dict_get(value, part, default, case_insensitive)
+
+        elif index is not None and isinstance(value, (list, tuple)):
+            value = (value[index] if -len(value) <= index < len(value)
+                     else default)
 
-    elif hasattr(config, '__getitem__'):
-        value = try_get_item(config, part0, default, case_insensitive)
+        elif hasattr(value, '__getitem__'):
+            value = try_get_item(value, part, default, case_insensitive)
 
-    if part1 and hasattr(value, '__getitem__'):
-        value = config_dict_get(value, part1, default, case_insensitive)
+        else:
+            # nothing left to drill down into
+            break
 
     if value is NODEFAULT:
-        raise KeyError(key)
+        raise KeyError(handle.key)
     return value
 
 
 # @log_func_call(DEBUGLOW2, trace_only=True)
-def config_dict_set(config: dict, key: str, value,
+def config_dict_set(config: dict, key: str | ConfigKey, value,
                     case_insensitive: bool = IS_WIN32):
     """
     Set the value in a dict with given key.  If the key contains '.', it
@@ -65,19 +120,23 @@ def config_dict_set(config: dict, key: str, value,
 
     Args:
         config (dict): dict (of nested dicts or lists) to search for key to set
-        key (str): key to set in dict or dot-delimited list of keys
+        key (str | ConfigKey): key to set in dict or dot-delimited list of
+            keys
         value (Any): Value to set
     """
-    parts = key.split('.', 1)
-    part0 = parts[0]
-    part1 = '.'.join(parts[1:])
-    if key == part0:
-        casesafe_dict_set(config, key, value, case_insensitive)
-    else:
-        if not casesafe_key_in_dict(config, part0, case_insensitive):
-            casesafe_dict_set(config, part0, dict(), case_insensitive)
+    handle = key if isinstance(key, ConfigKey) else compile_config_key(key)
+    *path, last = handle.parts
+    for part in path:
+        if not casesafe_key_in_dict(config, part, case_insensitive):
+            # keep new levels as fast to search as the one they're added to
+            child = (CaseInsensitiveDict()
+                     if isinstance(config, CaseInsensitiveDict) else dict())
+            casesafe_dict_set(config, part, child, case_insensitive)
+
+        config = casesafe_dict_get(config, part,
+                                   case_insensitive=case_insensitive)
 
-        config_dict_set(config[part0], part1, value)
+    casesafe_dict_set(config, last, value, case_insensitive)
 
 
 # @log_func_call(DEBUGLOW2, trace_only=True)
@@ -94,3 +153,106 @@ def config_dict_update(config: dict, data: dict,
     """
     for k, v in data.items():
         config_dict_set(config, k, v, case_insensitive)
+
+
+class ConfigPathIndex:
+    """
+    Flat index of dot-delimited keys to their values in a given config dict,
+    for code that reads the same keys over and over.
+
+    The index is filled in as keys are read.  For each key it keeps the
+    containers that were walked through to reach the value and the keys (as
+    stored) or list indexes that led from each one to the next.  A repeated
+    read only checks that each of those containers still holds the same next
+    one, which is a plain lookup per level instead of a case-safe search, and
+    walks the config again if anything along the way was changed or replaced.
+    This keeps the index coherent with the config however it is changed.
+    """
+    def __init__(self, config: dict, case_insensitive: bool = IS_WIN32):
+        self.config = config
+        self.case_insensitive = case_insensitive
+        self._index: dict[str, tuple] = dict()
+
+    def __len__(self):
+        return len(self._index)
+
+    def clear(self):
+        self._index.clear()
+
+    def _walk(self, handle: ConfigKey):
+        # the walk that config_dict_get makes, for as many steps as can be
+        # checked later by a plain lookup with the key they were found under.
+        # The rest (a missing key, or drilling into something other than a
+        # dict, list or tuple) is left to config_dict_get on every read.
+        case = self.case_insensitive
+        links: list[tuple] = list()
+        value = self.config
+        for i, (part, index) in enumerate(handle.steps):
+            if isinstance(value, dict):
+                if not case:
+                    key = part if dict.__contains__(value, part) else _MISSING
+                elif isinstance(value, CaseInsensitiveDict):
+                    key = value.actual_key(part, _MISSING)
+                else:
+                    key = _MISSING
+
+            elif (index is not None and isinstance(value, (list, tuple))
+                    and -len(value) <= index < len(value)):
+                key = index
+
+            else:
+                key = _MISSING
+
+            if key is _MISSING:
+                rest = compile_config_key('.'.join(handle.parts[i:]))
+                return links, value, rest, None
+
+            child = (dict.__getitem__(value, key) if isinstance(value, dict)
+                     else value[key])
+            links.append((value, key, child))
+            value = child
+
+        return links, None, None, value
+
+    def get(self, key: str | ConfigKey, default=NODEFAULT):
+        """
+        Same as `config_dict_get` on the indexed config, but answered from the
+        index when possible.  Keys that are not found are indexed as well.
+        """
+        index = self._index
+        entry = index.get(key)
+        if entry is not None:
+            try:
+                for container, k, child in entry[0]:
+                    if container[k] is not child:
+                        entry = None
+                        break
+
+            except (KeyError, IndexError, TypeError):
+                entry = None
+
+        if entry is None:
+            handle = (key if isinstance(key, ConfigKey)
+                      else compile_config_key(key))
+            entry = index[key] = self._walk(handle)
+
+        links, parent, rest, value = entry
+        if rest is not None:
+            value = config_dict_get(parent, rest, _MISSING,
+                                    self.case_insensitive)
+
+        if value is _MISSING:
+            if default is NODEFAULT:
+                raise KeyError(str(key))
+            return default
+
+        return value
+
+    def __getitem__(self, key: str | ConfigKey):
+        return self.get(key)
+
+    def set(self, key: str | ConfigKey, value):
+        config_dict_set(self.config, key, value, self.case_insensitive)
+
+    def update(self, data: dict):
+        config_dict_update(self.config, data, self.case_insensitive)
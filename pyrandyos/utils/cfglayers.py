@@ -0,0 +1,191 @@
+from collections.abc import Iterable, Mapping
+
+# from ..logging import DEBUGLOW2, log_func_call
+from .constants import NODEFAULT, IS_WIN32
+from .casesafe import (
+    CaseInsensitiveDict, casesafe_dict_get, casesafe_dict_set,
+    casesafe_key_in_dict,
+)
+from .cfgdict import ConfigKey, compile_config_key, config_dict_set
+
+
+# @log_func_call(DEBUGLOW2, trace_only=True)
+def copy_config_tree(x, case_insensitive: bool = IS_WIN32):
+    """
+    Copy the dicts and lists of the given config data, sharing everything else
+    (strings, numbers, paths and so on) with the original.  The copy can be
+    modified without affecting `x`, which is all a config needs from
+    `deepcopy` at a fraction of the cost.  In case-insensitive mode, the dicts
+    in the copy are `CaseInsensitiveDict`s.
+    """
+    if isinstance(x, dict):
+        newdict = CaseInsensitiveDict() if case_insensitive else dict()
+        for k, v in x.items():
+            newdict[k] = copy_config_tree(v, case_insensitive)
+
+        return newdict
+
+    if isinstance(x, list):
+        return [copy_config_tree(v, case_insensitive) for v in x]
+
+    return x
+
+
+def _copy_node(x):
+    if isinstance(x, CaseInsensitiveDict):
+        return x.copy()
+
+    if isinstance(x, dict):
+        return dict(x)
+
+    return list(x)
+
+
+# @log_func_call(DEBUGLOW2, trace_only=True)
+def cow_config_set(config: dict, key: str | ConfigKey, value,
+                   case_insensitive: bool = IS_WIN32):
+    """
+    Copy-on-write version of `config_dict_set`.  Instead of modifying
+    `config`, returns a new config with the value set, in which only the dicts
+    along the path to the key are copied.  Everything else is shared with
+    `config`, which is left as it was.
+    """
+    handle = key if isinstance(key, ConfigKey) else compile_config_key(key)
+    *path, last = handle.steps
+    root = node = _copy_node(config)
+    for part, index in path:
+        if isinstance(node, list) and index is not None:
+            child = _copy_node(node[index])
+            node[index] = child
+
+        else:
+            child = casesafe_dict_get(node, part, None, case_insensitive)
+            child = (_copy_node(child) if isinstance(child, (dict, list))
+                     else CaseInsensitiveDict()
+                     if isinstance(node, CaseInsensitiveDict) else dict())
+            casesafe_dict_set(node, part, child, case_insensitive)
+
+        node = child
+
+    part, index = last
+    if isinstance(node, list) and index is not None:
+        node[index] = value
+
+    else:
+        casesafe_dict_set(node, part, value, case_insensitive)
+
+    return root
+
+
+# @log_func_call(DEBUGLOW2, trace_only=True)
+def diff_config_trees(old: Mapping, new: Mapping,
+                      case_insensitive: bool = IS_WIN32, prefix: str = ''):
+    """
+    Returns the dot-delimited keys whose values differ between the two config
+    trees, mapped to their values in `new` (or `NODEFAULT` for keys that are
+    not in `new`).
+
+    Subtrees that are the same object in both are skipped without being
+    looked at, so diffing two versions of a config that share structure (such
+    as the ones made by `cow_config_set`) costs about as much as the number of
+    keys that changed.
+    """
+    out = dict()
+    if old is new:
+        return out
+
+    for k, v in new.items():
+        oldv = casesafe_dict_get(old, k, NODEFAULT, case_insensitive)
+        if oldv is v:
+            continue
+
+        path = f'{prefix}{k}'
+        if isinstance(oldv, Mapping) and isinstance(v, Mapping):
+            out.update(diff_config_trees(oldv, v, case_insensitive,
+                                         f'{path}.'))
+
+        elif oldv is NODEFAULT or oldv != v:
+            out[path] = v
+
+    for k in old.keys():
+        if not casesafe_key_in_dict(new, k, case_insensitive):
+            out[f'{prefix}{k}'] = NODEFAULT
+
+    return out
+
+
+class ConfigLayers:
+    """
+    Named stack of config layers, lowest priority first (e.g. the defaults,
+    the config file, overrides and the local config).  `merged()` flattens
+    them into a single config the same way as applying each layer to the ones
+    below it with `config_dict_update`.
+
+    Layers are never modified in place.  `set()` and `update()` copy on write
+    with `cow_config_set`, so every earlier version of a layer is left intact
+    and shares most of its structure with the current one.  That makes
+    `snapshot()` cost only as much as the number of layers, and `diff()`
+    between two snapshots only as much as the number of keys that changed.
+    """
+    def __init__(self, layers: Iterable[tuple[str, Mapping]] = (),
+                 case_insensitive: bool = IS_WIN32):
+        self.case_insensitive = case_insensitive
+        self._layers: dict[str, Mapping] = dict(layers)
+
+    def __contains__(self, name: str):
+        return name in self._layers
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self._layers)!r})'
+
+    @property
+    def names(self):
+        return tuple(self._layers)
+
+    def layer(self, name: str) -> Mapping:
+        "returns the named layer, which must be treated as read-only"
+        return self._layers[name]
+
+    def set_layer(self, name: str, data: Mapping):
+        """
+        Replace the named layer with `data`, or add it as the new top layer.
+        `data` becomes part of the layers and must not be modified after.
+        """
+        self._layers[name] = data
+
+    def set(self, layer: str, key: str | ConfigKey, value):
+        self._layers[layer] = cow_config_set(self._layers[layer], key, value,
+                                             self.case_insensitive)
+
+    def update(self, layer: str, data: Mapping):
+        for k, v in data.items():
+            self.set(layer, k, v)
+
+    def snapshot(self):
+        "returns a copy of the layers as they are now"
+        return type(self)(self._layers.items(), self.case_insensitive)
+
+    def diff(self, other: 'ConfigLayers', layer: str):
+        """
+        Returns the keys of the named layer that differ in this version from
+        `other`, as `diff_config_trees` does.
+        """
+        return diff_config_trees(other._layers.get(layer, {}),
+                                 self._layers.get(layer, {}),
+                                 self.case_insensitive)
+
+    def merged(self) -> dict:
+        """
+        Returns a new config with all of the layers applied in order.  Its
+        dicts and lists are its own, so it can be modified freely, but every
+        other value is shared with the layers rather than copied.
+        """
+        case = self.case_insensitive
+        layers = iter(self._layers.values())
+        # the bottom layer is taken as is, like the defaults always have been
+        config = copy_config_tree(next(layers, {}), case)
+        for data in layers:
+            for k, v in data.items():
+                config_dict_set(config, k, copy_config_tree(v, case), case)
+
+        return config
@@ -0,0 +1,155 @@
+from collections.abc import Mapping
+
+# from ..logging import DEBUGLOW2, log_func_call
+from .constants import NODEFAULT, IS_WIN32
+from .casesafe import (
+    CaseInsensitiveDict, casesafe_dict_get, casesafe_dict_set,
+)
+from .cfgdict import ConfigKey, compile_config_key, config_dict_get
+
+_MISSING = object()
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f'{type(self).__name__} is read-only')
+
+
+class FrozenConfigDict(dict):
+    """
+    Read-only `dict` for frozen config trees.  Since it is a real `dict`, it
+    can be read anywhere a plain config dict is expected.
+    """
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def copy(self):
+        "returns a mutable copy"
+        return dict(self)
+
+
+class FrozenCaseInsensitiveDict(CaseInsensitiveDict):
+    "read-only `CaseInsensitiveDict` for frozen config trees"
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self):
+        "returns a mutable copy"
+        return CaseInsensitiveDict(self)
+
+    def __or__(self, other):
+        return self.copy() | other
+
+
+# @log_func_call(DEBUGLOW2, trace_only=True)
+def freeze_config(x, case_insensitive: bool = IS_WIN32):
+    """
+    Returns a frozen copy of the given config data, in which every dict is a
+    `FrozenConfigDict` (or `FrozenCaseInsensitiveDict`) and every list a
+    tuple.  Everything else is shared with `x`.  Parts of `x` that are already
+    frozen are reused rather than copied.
+    """
+    frozen = (FrozenCaseInsensitiveDict if case_insensitive
+              else FrozenConfigDict)
+    if isinstance(x, dict):
+        if type(x) is frozen:
+            return x
+
+        return frozen((k, freeze_config(v, case_insensitive))
+                      for k, v in x.items())
+
+    if isinstance(x, (list, tuple)):
+        return tuple(freeze_config(v, case_insensitive) for v in x)
+
+    return x
+
+
+def _frozen_set(node, steps: tuple, value, case_insensitive: bool):
+    (part, index), rest = steps[0], steps[1:]
+    if isinstance(node, tuple) and index is not None:
+        items = list(node)
+        items[index] = (_frozen_set(items[index], rest, value,
+                                    case_insensitive) if rest else value)
+        return tuple(items)
+
+    if not isinstance(node, Mapping):
+        node = ()
+
+    items = CaseInsensitiveDict(node) if case_insensitive else dict(node)
+    if rest:
+        child = casesafe_dict_get(items, part, None, case_insensitive)
+        value = _frozen_set(child if isinstance(child, (Mapping, tuple))
+                            else {}, rest, value, case_insensitive)
+
+    # every other value is already frozen, so this only freezes the one level
+    casesafe_dict_set(items, part, value, case_insensitive)
+    return (FrozenCaseInsensitiveDict(items) if case_insensitive
+            else FrozenConfigDict(items))
+
+
+# @log_func_call(DEBUGLOW2, trace_only=True)
+def frozen_config_set(config: Mapping, key: str | ConfigKey, value,
+                      case_insensitive: bool = IS_WIN32):
+    """
+    Returns a new frozen config with the given key set, as `config_dict_set`
+    would set it.  Only the dicts along the path to the key are rebuilt; all
+    others are shared with `config`, which is not changed.
+    """
+    handle = key if isinstance(key, ConfigKey) else compile_config_key(key)
+    return _frozen_set(config, handle.steps,
+                       freeze_config(value, case_insensitive),
+                       case_insensitive)
+
+
+class ConfigSnapshot:
+    """
+    One frozen version of a config.  Nothing in it can change, so any number
+    of threads can read it at once without locking, and each one sees every
+    value as of the same moment.
+
+    Reads of dotted keys are indexed as they are made, the same as with
+    `ConfigPathIndex`, except that the index never has to be invalidated.
+    """
+    __slots__ = ('config', 'version', 'case_insensitive', '_index')
+
+    def __init__(self, config: Mapping, version: int = 0,
+                 case_insensitive: bool = IS_WIN32):
+        self.config = freeze_config(config, case_insensitive)
+        self.version = version
+        self.case_insensitive = case_insensitive
+        self._index: dict[str | ConfigKey, object] = dict()
+
+    def __repr__(self):
+        return f'<{type(self).__name__} version {self.version}>'
+
+    def get(self, key: str | ConfigKey, default=NODEFAULT):
+        "same as `config_dict_get` on the snapshot's config"
+        index = self._index
+        value = index.get(key, _MISSING)
+        if value is _MISSING:
+            value = index[key] = config_dict_get(self.config, key, _MISSING,
+                                                 self.case_insensitive)
+
+        if value is _MISSING:
+            if default is NODEFAULT:
+                raise KeyError(str(key))
+            return default
+
+        return value
+
+    def __getitem__(self, key: str | ConfigKey):
+        return self.get(key)
+
+    def __contains__(self, key: str | ConfigKey):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: str | ConfigKey, value):
+        """
+        Returns the next version of the snapshot with the given key set.  This
+        snapshot is not changed.
+        """
+        case = self.case_insensitive
+        return type(self)(frozen_config_set(self.config, key, value, case),
+                          self.version + 1, case)
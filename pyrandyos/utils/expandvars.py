@@ -1,8 +1,9 @@
 # adapted from code in Python stdlib posixpath.py
 from typing import Any
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from re import compile, ASCII
-from functools import partial
+from functools import lru_cache
+from contextlib import contextmanager
 from os import environ
 
 from ..logging import log_func_call, DEBUGLOW2
@@ -14,6 +15,85 @@ _VARPROG = compile(r'\$(\w+|\{[^}]*\})', ASCII)
 _STARTBRAK = '{'
 _ENDBRAK = '}'
 _NOTFOUND = object()
+_LOOKUP_RECORDERS: list[set[str]] = list()
+"sets collecting variable names for each active `record_var_lookups()`"
+
+
+def _var_name(m):
+    name: str = m.group(1)
+    if name.startswith(_STARTBRAK) and name.endswith(_ENDBRAK):
+        name = name[1:-1]
+
+    return name
+
+
+class ExpandTemplate:
+    """
+    A string parsed once into the literal text between its "$var"/"${var}"
+    variables and the variables themselves, so that substituting values is a
+    single join instead of a search and re-slice of the string per variable.
+
+    Use `compile_template()` to get one, since templates are cached per
+    string.  `names` holds the variable names (braces removed) in the order
+    they appear, and `raw` holds the text of each variable as it appears in
+    the source string.
+    """
+    __slots__ = ('source', 'literals', 'names', 'raw', 'spans')
+
+    def __init__(self, source: str):
+        self.source = source
+        literals: list[str] = list()
+        names: list[str] = list()
+        raw: list[str] = list()
+        spans: list[tuple[int, int]] = list()
+        last = 0
+        for m in _VARPROG.finditer(source):
+            i, j = m.span(0)
+            literals.append(source[last:i])
+            names.append(_var_name(m))
+            raw.append(m.group(0))
+            spans.append((i, j))
+            last = j
+
+        literals.append(source[last:])
+        self.literals: tuple[str, ...] = tuple(literals)
+        self.names: tuple[str, ...] = tuple(names)
+        self.raw: tuple[str, ...] = tuple(raw)
+        self.spans: tuple[tuple[int, int], ...] = tuple(spans)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.source!r})'
+
+    def render(self, lookup: Mapping[str, Any]):
+        """
+        Returns the source string with every variable whose name is in
+        `lookup` replaced by `str()` of its value.  Variables that are not in
+        `lookup`, or whose value is None, are left as they are.
+        """
+        if not self.names:
+            return self.source
+
+        literals = self.literals
+        out = [literals[0]]
+        get = lookup.get
+        for name, raw, literal in zip(self.names, self.raw, literals[1:]):
+            value = get(name)
+            out.append(raw if value is None else str(value))
+            out.append(literal)
+
+        return ''.join(out)
+
+    def render_one(self, index: int, value):
+        "returns the source string with only the given variable replaced"
+        i, j = self.spans[index]
+        source = self.source
+        return source[:i] + str(value) + source[j:]
+
+
+@lru_cache(maxsize=4096)
+def compile_template(x: str) -> ExpandTemplate:
+    "returns the cached `ExpandTemplate` for the given string"
+    return ExpandTemplate(x)
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
@@ -55,20 +135,41 @@ def expandvars_base(x: str, callback: Callable) -> str:
     Returns:
         str: value of `x` after performing callbacks
     """
-    search = _VARPROG.search
+    # the variables are located from the compiled template of `x` for as
+    # long as the callbacks only touch the text up to the end of the current
+    # variable (as substitutions do).  If a callback changes anything after
+    # that, the rest of the string is searched for variables as it is now.
+    template = compile_template(x)
     data = {'x': x, 'i': 0}
     ok_to_continue = True
+    for (i, j), name in zip(template.spans, template.names):
+        # the untouched tail of the string follows the current variable, so
+        # the template offsets only need to be shifted by the change in length
+        shift = len(data['x']) - len(x)
+        data['i'], data['j'] = i + shift, j + shift
+        data['name'] = name
+        ok_to_continue = callback(data)
+        if ok_to_continue is None:
+            ok_to_continue = True
+
+        if not ok_to_continue:
+            return data['x']
+
+        newx: str = data['x']
+        if newx[data['i']:] != x[j:]:
+            break
+
+    else:
+        return data['x']
+
+    search = _VARPROG.search
     while ok_to_continue:
         m = search(data['x'], data['i'])
         if not m:
             break
 
         data['i'], data['j'] = m.span(0)
-        name = m.group(1)
-        if name.startswith(_STARTBRAK) and name.endswith(_ENDBRAK):
-            name = name[1:-1]
-
-        data['name'] = name
+        data['name'] = _var_name(m)
         ok_to_continue = callback(data)
         if ok_to_continue is None:
             ok_to_continue = True
@@ -93,8 +194,13 @@ def substitute_callback(key: str, subst: str, case_insensitive: bool,
 @log_func_call(DEBUGLOW2, trace_only=True)
 def substitute_key(value: str, key: str, subst: str,
                    case_insensitive: bool = IS_WIN32):
-    return expandvars_base(value, partial(substitute_callback, key, subst,
-                                          case_insensitive))
+    "substitutes the first variable in `value` named `key` with `subst`"
+    template = compile_template(value)
+    for index, name in enumerate(template.names):
+        if casesafe_is_equal(name, key, case_insensitive):
+            return template.render_one(index, subst)
+
+    return value
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
@@ -106,30 +212,78 @@ def unresolved_keys_callback(keylist: list, data: dict):
 
 @log_func_call(DEBUGLOW2, trace_only=True)
 def get_unresolved_keys(x: str):
-    keys: list[str] = list()
-    expandvars_base(x, partial(unresolved_keys_callback, keys))
-    return keys
+    return list(compile_template(x).names)
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
-def expandvars_callback(addl_expand_vars: dict, case_insensitive: bool,
-                        data: dict):
+def get_var_names(x: str) -> tuple[str, ...]:
+    """
+    Same as `get_unresolved_keys()`, but returns the tuple of names from the
+    compiled template for `x`.
+    """
+    return compile_template(x).names
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def substitute_vars(x: str, lookup: Mapping[str, Any]):
+    """
+    Substitutes every variable in `x` whose name is in `lookup` with its value
+    in a single pass.  Variables not in `lookup` are left unchanged.
+    """
+    return compile_template(x).render(lookup)
+
+
+@contextmanager
+def record_var_lookups(names: set[str] = None):
+    """
+    Context manager that collects the name of every variable looked up while
+    it is active, whether or not the variable was found.  This covers both
+    `expandvars()` and `ConfigExpander`, so it tells what a processed config
+    depends on (e.g. which environment variables).
+
+    Args:
+        names (set[str], optional): set to add the names to, so that several
+            sections can be recorded into one set.  Defaults to a new set.
+
+    Yields:
+        set[str]: the set the names are collected in
+    """
+    names = set() if names is None else names
+    _LOOKUP_RECORDERS.append(names)
+    try:
+        yield names
+    finally:
+        _LOOKUP_RECORDERS.remove(names)
+
+
+def record_var_lookup(name: str):
+    "adds `name` to every set being collected by `record_var_lookups()`"
+    for names in _LOOKUP_RECORDERS:
+        names.add(name)
+
+
+def _lookup_var(name: str, addl_expand_vars: dict, case_insensitive: bool):
     value = _NOTFOUND
-    name: str = casesafe_value(data['name'], case_insensitive)
+    name = casesafe_value(name, case_insensitive)
+    if _LOOKUP_RECORDERS:
+        record_var_lookup(name)
+
     if '.' in name or casesafe_key_in_dict(addl_expand_vars, name,
                                            case_insensitive):
         value = config_dict_get(addl_expand_vars, name, _NOTFOUND,
                                 case_insensitive)
 
     if value is _NOTFOUND:
-        try:
-            value = environ[name]
-        except KeyError:
-            pass
+        value = environ.get(name)
 
-    if value is _NOTFOUND:
-        value = None
+    return value
 
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def expandvars_callback(addl_expand_vars: dict, case_insensitive: bool,
+                        data: dict):
+    name: str = casesafe_value(data['name'], case_insensitive)
+    value = _lookup_var(name, addl_expand_vars, case_insensitive)
     if value is None:
         data['i'] = data['j']
 
@@ -157,8 +311,11 @@ def expandvars(x: str, addl_expand_vars: dict[str, Any] = {},
 
     if '$' not in x:
         return x
-    return expandvars_base(x, partial(expandvars_callback, addl_expand_vars,
-                                      case_insensitive))
+
+    template = compile_template(x)
+    lookup = {name: _lookup_var(name, addl_expand_vars, case_insensitive)
+              for name in template.names}
+    return template.render(lookup)
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
@@ -1,21 +1,134 @@
 from json import loads as jloads, JSONDecodeError, dumps as jdumps
 from pathlib import Path
 from types import NoneType
-from re import sub
+from re import compile
+from functools import partial
+from collections.abc import Iterable, Iterator
 
 from ..logging import log_func_call
 
 JSONTYPES = (str, float, int, bool, list, dict, NoneType)
 JsonDataType = str | float | int | bool | list | dict | NoneType
 
+JSONC_STREAM_CHUNK_SIZE = 1 << 20
+"number of characters read at a time by `load_jsonc()` in streaming mode"
+
+# comments that can't be shortened or lengthened by backtracking: line
+# comments always run to the end of the line and block comments always end
+# at the first "*/" (or at the end of the text when they aren't closed)
+_JSONC_LINE_COMMENT = r'//[^\n]*(?![^\n])'
+_JSONC_BLOCK_COMMENT = r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
+_JSONC_OPEN_COMMENT = r'/\*[^*]*(?:\*+[^/*][^*]*)*\**\Z'
+
+# whitespace and comments, which is all that may come between a trailing
+# comma and the end of its object or array.  The streaming version also
+# accepts a block comment that is still open at the end of the text.
+_JSONC_GAP = rf'\s*(?:(?:{_JSONC_LINE_COMMENT}|{_JSONC_BLOCK_COMMENT})\s*)*'
+_JSONC_OPEN_GAP = (rf'\s*(?:(?:{_JSONC_LINE_COMMENT}|{_JSONC_BLOCK_COMMENT}'
+                   rf'|{_JSONC_OPEN_COMMENT})\s*)*')
+# what follows a comma that is trailing, or (in streaming mode) one that
+# can't be known to be trailing or not until more text is read
+_JSONC_TRAILING = rf'{_JSONC_GAP}[}}\]]'
+_JSONC_UNDECIDED = rf'{_JSONC_OPEN_GAP}\Z'
+
+# quick scans for where a comment or trailing comma might start (which may
+# also be inside a string), to skip over the text that doesn't need to be
+# looked at more closely.  These are kept as separate simple patterns because
+# the regex engine can scan for those much faster than for an alternation.
+_JSONC_SLASHES = compile(r'/[/*]')
+_JSONC_COMMAS = compile(r',(?=\s*[}\]/])')
+_JSONC_STREAM_COMMAS = compile(r',(?=\s*[}\]/]|\s*\Z)')
+_JSONC_TRAILING_AFTER = compile(_JSONC_TRAILING)
+_JSONC_UNDECIDED_AFTER = compile(_JSONC_UNDECIDED)
+# closing quote in group 1 so an unterminated string can be told apart
+_JSONC_STRINGS = compile(r'"[^"\\\n]*(?:\\.[^"\\\n]*)*(")?')
+
+
+def _jsonc_in_string(text: str, start: int, pos: int):
+    """
+    Returns whether `pos` is inside of a string, given that `start` is on the
+    same line and not inside of a string (JSON strings can't span lines).
+    """
+    m = None
+    for m in _JSONC_STRINGS.finditer(text, start, pos):
+        pass
+
+    return m is not None and m.group(1) is None
+
+
+def _strip_jsonc_window(text: str, end: int, stream: bool = False):
+    """
+    Strips `text[:end]`, returning the stripped pieces and the position up to
+    which the text was processed.  In streaming mode, processing stops short
+    at a comment or comma that can't be resolved without more text.
+    """
+    slashes = _JSONC_SLASHES.search
+    commas = (_JSONC_STREAM_COMMAS if stream else _JSONC_COMMAS).search
+    out: list[str] = list()
+    # everything before `pos` has been stripped, and `pos` is never inside of
+    # a string or comment.  Candidates are looked for from `scan` onwards.
+    pos = scan = 0
+    slash = comma = -1
+    while True:
+        if slash < scan:
+            m = slashes(text, scan, end)
+            slash = m.start() if m else end
+
+        if comma < scan:
+            m = commas(text, scan, end)
+            comma = m.start() if m else end
+
+        i = slash if slash < comma else comma
+        if i >= end:
+            break
+
+        scan = i + 1
+        linestart = text.rfind('\n', pos, i) + 1 or pos
+        if text.find('\\', linestart, i) < 0:
+            if text.count('"', linestart, i) % 2:
+                continue
+
+        elif _jsonc_in_string(text, linestart, i):
+            continue
+
+        out.append(text[pos:i])
+        if i == comma:
+            if _JSONC_TRAILING_AFTER.match(text, i + 1, end):
+                pos = i + 1
+            elif stream and _JSONC_UNDECIDED_AFTER.match(text, i + 1, end):
+                return out, i
+            else:
+                out.append(',')
+                pos = i + 1
+
+        elif text[i + 1] == '/':
+            eol = text.find('\n', i, end)
+            pos = end if eol < 0 else eol
+
+        else:
+            close = text.find('*/', i + 2, end)
+            if close < 0 and stream:
+                return out, i
+
+            pos = end if close < 0 else close + 2
+
+        scan = pos
+
+    out.append(text[pos:end])
+    return out, end
+
 
 @log_func_call
-def load_jsonc(fn: str | Path) -> dict | list:
+def load_jsonc(fn: str | Path, stream: bool = False) -> dict | list:
     """
     Open a JSON file and return its parsed contents as a dict or list.
 
     Args:
         fn (str | Path): file path to open
+        stream (bool, optional): read and strip the file in chunks of
+            `JSONC_STREAM_CHUNK_SIZE` characters rather than all at once, so
+            the raw file contents never have to be held in memory in full.
+            Defaults to False.
 
     Raises:
         JSONDecodeError: provides details on what file it failed to parse and
@@ -25,7 +138,13 @@ def load_jsonc(fn: str | Path) -> dict | list:
         dict | list: parsed contents of the file `fn`
     """
     try:
-        return parse_jsonc(Path(fn).read_text())
+        if not stream:
+            return parse_jsonc(Path(fn).read_text())
+
+        with open(fn) as f:
+            chunks = iter(partial(f.read, JSONC_STREAM_CHUNK_SIZE), '')
+            return jloads(''.join(iter_strip_jsonc(chunks)))
+
     except JSONDecodeError as e:
         raise JSONDecodeError(f'error reading {fn}: {e.msg}', e.doc, e.pos)
 
@@ -44,32 +163,47 @@ def parse_jsonc(jsonstr: str) -> dict | list:
     Returns:
         dict | list: parsed contents of the string `jsonstr`
     """
-    buf = ""
-    for line in jsonstr.splitlines():
-        curline = ''
-        inquote = False
-        escape = False
-        lastc = ''
-        for c in line:
-            if escape:
-                escape = False
-            elif c == '"':
-                inquote = not inquote
-            elif inquote:
-                if c == '\\':
-                    escape = True
-            elif c == '/' and lastc == '/':
-                lastc = ''
-                break
-            curline += lastc
-            lastc = c
-        curline += lastc
-        buf += curline
-
-    # Remove trailing commas in objects and arrays
-    buf = sub(r',([ \t\r\n]*[}}\]])', r'\1', buf)
-
-    return jloads(buf)
+    return jloads(strip_jsonc(jsonstr))
+
+
+@log_func_call
+def strip_jsonc(jsonstr: str) -> str:
+    """
+    Returns the given JSONC string as plain JSON, with all `//` and `/* */`
+    comments and trailing commas in objects and arrays removed.
+
+    Args:
+        jsonstr (str): JSONC-formatted string
+
+    Returns:
+        str: JSON-formatted string
+    """
+    return ''.join(_strip_jsonc_window(jsonstr, len(jsonstr))[0])
+
+
+@log_func_call
+def iter_strip_jsonc(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming version of `strip_jsonc()`.  Takes JSONC text in arbitrary
+    pieces (such as the chunks read from a file) and yields the equivalent
+    plain JSON in pieces.  Only whole lines are processed at a time, and any
+    comment or comma that can't be resolved until more text is read is held
+    back until it can be.
+
+    Args:
+        chunks (Iterable[str]): consecutive pieces of a JSONC string
+
+    Yields:
+        str: consecutive pieces of the equivalent JSON string
+    """
+    pending = ''
+    for chunk in chunks:
+        text = pending + chunk
+        out, end = _strip_jsonc_window(text, text.rfind('\n') + 1, True)
+        pending = text[end:]
+        yield ''.join(out)
+
+    yield strip_jsonc(pending)
 
 
 @log_func_call
@@ -2,24 +2,31 @@
 This module is intended for internal use only.  No user documentation is
 provided at this time.  Use at your own discretion.
 """
+from copy import copy
 from pathlib import Path
 from shutil import chown
 from datetime import datetime
+from enum import Enum
+from queue import Queue, Full, Empty
+from threading import Thread, current_thread
+from collections.abc import Iterable
 from logging import (
     LogRecord, basicConfig, DEBUG, INFO, StreamHandler, Formatter, getLogger,
     CRITICAL, ERROR, WARNING, FileHandler, Logger, addLevelName,
     Handler,
 )
-from logging.handlers import MemoryHandler
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 
 from ..logging import (
     DEBUGLOW2, log_func_call, LOGSTDOUT, LOGSTDERR, LOGTQDM,
-    APP_LOG_LEVEL_NAMES, get_loglevel_num_name
+    APP_LOG_LEVEL_NAMES, get_loglevel_num_name, update_log_level_gate,
 )
 from .constants import DEFAULT_GROUP, DEFAULT_DIR_MODE
 from .constants.cli import ConsoleText
 
 _LOGCACHE: MemoryHandler = None
+_LOG_QUEUE_STOP = object()
+_EXC_FORMATTER = Formatter()
 
 
 class MillisecondFormatter(Formatter):
@@ -44,6 +51,296 @@ class LevelFilter:
         return record.levelno >= self.__level
 
 
+class LogQueuePolicy(Enum):
+    "what an `AsyncLogHandler` does with a new record when its queue is full"
+    BLOCK = 'block'
+    "wait for the writer thread to make room"
+    DROP_OLDEST = 'drop_oldest'
+    "discard the oldest queued record to make room"
+    DROP_BELOW_LEVEL = 'drop_below_level'
+    "discard the new record if below the drop level, otherwise wait"
+
+
+class AsyncLogHandler(Handler):
+    """
+    Handler that queues records for a background writer thread, which then
+    formats and writes them to the wrapped handlers in batches.  This keeps
+    formatting and file I/O off of the calling thread (e.g. the GUI thread).
+
+    Stream handlers (including file handlers) receive each batch as a single
+    write followed by a single flush.  Any other handler is simply given each
+    record in turn.
+
+    The queue is bounded by `maxsize`, and `policy` determines what happens to
+    new records when it is full.  Use `flush()` to wait for all queued records
+    to be written.  `close()` stops the writer thread once everything queued
+    before it has been written and closes the wrapped handlers.  Records
+    emitted after that are dropped.
+    """
+    def __init__(self, handlers: Iterable[Handler], maxsize: int = 10000,
+                 policy: LogQueuePolicy | str = LogQueuePolicy.BLOCK,
+                 drop_level: int | str = WARNING, batch_size: int = 256):
+        super().__init__(0)
+        self.handlers = list(handlers)
+        self.queue: Queue[LogRecord] = Queue(maxsize)
+        self.policy = LogQueuePolicy(policy)
+        check_loglevel(drop_level)
+        self.drop_level, _ = get_loglevel_num_name(drop_level)
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._closed = False
+        self._thread = Thread(target=self._writer_loop, daemon=True,
+                              name='pyrandyos-log-writer')
+        self._thread.start()
+
+    def prepare(self, record: LogRecord):
+        # the writer thread formats a copy, as QueueHandler does, since other
+        # handlers of the same record may be formatting it at the same time.
+        # The args are merged into the message now since they may be mutated
+        # by the time the writer thread gets to it.  The same goes for the
+        # exception and its traceback, so they are rendered to exc_text now
+        # (pyrandyos records already have it) along with the stack info,
+        # which the formatters then append just as they would have.
+        record = copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+
+        fmt = self.formatter or _EXC_FORMATTER
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = fmt.formatException(record.exc_info)
+
+        if record.stack_info:
+            sinfo = fmt.formatStack(record.stack_info)
+            exc_text = f'{exc_text}\n{sinfo}' if exc_text else sinfo
+
+        record.exc_text = exc_text
+        record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def emit(self, record: LogRecord):
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: LogRecord):
+        if self._closed:
+            self.dropped += 1
+            return
+
+        q = self.queue
+        policy = self.policy
+        if policy is LogQueuePolicy.BLOCK:
+            self._put_wait(record)
+            return
+
+        try:
+            q.put_nowait(record)
+            return
+        except Full:
+            pass
+
+        if policy is LogQueuePolicy.DROP_OLDEST:
+            while True:
+                try:
+                    old = q.get_nowait()
+                    if old is _LOG_QUEUE_STOP:
+                        # closing, so the stop is kept and the record dropped
+                        self._put_stop()
+                        q.task_done()
+                        self.dropped += 1
+                        return
+
+                    q.task_done()
+                    self.dropped += 1
+                except Empty:
+                    pass
+
+                try:
+                    q.put_nowait(record)
+                    return
+                except Full:
+                    pass
+
+        elif record.levelno < self.drop_level:
+            self.dropped += 1
+
+        else:
+            self._put_wait(record)
+
+    def _put_wait(self, record: LogRecord):
+        # wait for room, but give up if the handler is closed in the meantime
+        # since the writer thread may already be gone
+        q = self.queue
+        while not self._closed:
+            try:
+                q.put(record, timeout=0.1)
+                return
+            except Full:
+                pass
+
+        self.dropped += 1
+
+    def _put_stop(self):
+        # bypass the bound on the queue, so that the stop is never waiting for
+        # (or dropped for lack of) room
+        q = self.queue
+        with q.mutex:
+            q.queue.append(_LOG_QUEUE_STOP)
+            q.unfinished_tasks += 1
+            q.not_empty.notify()
+
+    def _writer_loop(self):
+        q = self.queue
+        stop = False
+        while not stop:
+            batch = [q.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(q.get_nowait())
+            except Empty:
+                pass
+
+            stop = _LOG_QUEUE_STOP in batch
+            records = [r for r in batch if r is not _LOG_QUEUE_STOP]
+            try:
+                self.write_batch(records)
+            except Exception:
+                # a failing handler must not stop the writer thread, or
+                # everything waiting on the queue would wait forever
+                if records:
+                    self.handleError(records[-1])
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def write_batch(self, records: list[LogRecord]):
+        for h in self.handlers:
+            level = h.level
+            recs = [r for r in records if r.levelno >= level]
+            if not recs:
+                continue
+
+            if isinstance(h, StreamHandler):
+                self._write_stream_batch(h, recs)
+            else:
+                for r in recs:
+                    h.handle(r)
+
+    @staticmethod
+    def _write_stream_batch(h: StreamHandler, records: list[LogRecord]):
+        term = h.terminator
+        chunks: list[str] = list()
+        for r in records:
+            if not h.filter(r):
+                continue
+            try:
+                chunks.append(h.format(r) + term)
+            except Exception:
+                h.handleError(r)
+
+        if not chunks:
+            return
+
+        h.acquire()
+        try:
+            if h.stream is None and isinstance(h, FileHandler):
+                # FileHandler opened with delay=True
+                h.stream = h._open()
+
+            h.stream.write(''.join(chunks))
+            h.flush()
+        except Exception:
+            h.handleError(records[-1])
+        finally:
+            h.release()
+
+    def flush(self):
+        "wait for the writer thread to write all queued records"
+        thread = self._thread
+        if thread.is_alive() and thread is not current_thread():
+            self.queue.join()
+
+        for h in self.handlers:
+            h.flush()
+
+    def close(self):
+        self._closed = True
+        thread = self._thread
+        if thread.is_alive() and thread is not current_thread():
+            self._put_stop()
+            thread.join()
+
+        for h in self.handlers:
+            h.close()
+
+        super().close()
+
+
+def iter_log_handlers(handlers: Iterable[Handler]):
+    "iterate over handlers, including those wrapped by `AsyncLogHandler`"
+    for h in handlers:
+        yield h
+        if isinstance(h, AsyncLogHandler):
+            yield from iter_log_handlers(h.handlers)
+
+
+def flush_async_logging(logger: Logger = None):
+    """
+    Wait for all records queued by any `AsyncLogHandler` attached to the given
+    logger (or the root logger) to be written.
+    """
+    log = logger or getLogger()
+    for h in log.handlers:
+        if isinstance(h, AsyncLogHandler):
+            h.flush()
+
+
+@log_func_call
+def setup_worker_logging(queue: Queue, level: int | str = 0):
+    """
+    Send every log record in this (worker) process to `queue`, replacing any
+    other handlers, so that the parent process can write them with
+    `create_worker_log_listener()`.  `level` should be the parent's log level
+    gate, so that workers don't build and send records that nothing would
+    write.
+    """
+    if isinstance(level, str):
+        level = level.upper()
+
+    handler = QueueHandler(queue)
+    check_loglevel(level)
+    handler.setLevel(level)
+    # attach the handler directly rather than with basicConfig(), which would
+    # give it the BASIC_FORMAT formatter and so bake the level and logger name
+    # into each message before the parent formats it again
+    root = getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+
+    root.addHandler(handler)
+    root.setLevel(0)
+    update_log_level_gate()
+
+
+@log_func_call
+def create_worker_log_listener(queue: Queue, logger: Logger = None):
+    """
+    Returns a started `QueueListener` that writes the records sent to `queue`
+    by `setup_worker_logging()` in other processes using the handlers of the
+    given logger (or the root logger).  Call `stop()` on it once the workers
+    are done.
+    """
+    log = logger or getLogger()
+    listener = QueueListener(queue, *log.handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 # debugfmtstr = '%(asctime)s::%(name)s::%(pathname)s::%(funcName)s(%(lineno)d)::%(levelname)s::%(message)s'  # noqa: E501
 debugfmtstr = '%(asctime)s | %(levelname)s | %(pathname)s(%(lineno)d) | %(funcName)s | %(message)s'  # noqa: E501
 debug_ms_fmt = MillisecondFormatter(debugfmtstr)
@@ -123,6 +420,7 @@ def setup_memory_logging(cli_log_level: int | str = INFO,
     if cli:
         handlers.append(create_cli_log_handler(cli_log_level))
     basicConfig(force=force, level=0, handlers=handlers)
+    update_log_level_gate()
     log = logger or getLogger(__name__)
     log.debug('setup_memory_logging complete')
 
@@ -131,17 +429,21 @@ def setup_memory_logging(cli_log_level: int | str = INFO,
 def setup_logging(logfile: Path = None, cli_log_level: int | str = INFO,
                   file_log_level: int | str = DEBUG,
                   force: bool = True, cli: bool = True,
-                  logger: Logger = None):
+                  logger: Logger = None, async_log: bool = False,
+                  async_policy: LogQueuePolicy | str = LogQueuePolicy.BLOCK,
+                  async_queue_size: int = 10000):
     global _LOGCACHE
     handlers: list[Handler] = list()
     filt = None
+    filtered: Handler = None
     if logger:
         if _LOGCACHE:
-            for h in logger.handlers:
+            for h in iter_log_handlers(logger.handlers):
                 if isinstance(h, FileHandler):
                     _LOGCACHE.setTarget(h)
                     filt = LevelFilter(h.level)
                     h.addFilter(filt)
+                    filtered = h
                     _LOGCACHE.flush()
                     # h.removeFilter(filt)
                     break
@@ -152,23 +454,29 @@ def setup_logging(logfile: Path = None, cli_log_level: int | str = INFO,
             _LOGCACHE.setTarget(filelog)
             filt = LevelFilter(filelog.level)
             filelog.addFilter(filt)
+            filtered = filelog
             _LOGCACHE.flush()
             # filelog.removeFilter(filt)
 
     if cli:
         handlers.append(create_cli_log_handler(cli_log_level))
 
+    if handlers and async_log:
+        # the memory cache has already been handed off to the file log above,
+        # so the cached records are written before anything that gets queued.
+        handlers = [AsyncLogHandler(handlers, async_queue_size, async_policy)]
+
     if handlers:
         basicConfig(force=force, level=0, handlers=handlers)
 
     if _LOGCACHE:
         _LOGCACHE.flush()
-        if filt:
-            for h in handlers:
-                h.removeFilter(filt)
+        if filtered:
+            filtered.removeFilter(filt)
 
         _LOGCACHE = None
 
+    update_log_level_gate()
     log = logger or getLogger(__name__)
     log.debug('setup_logging complete')
 
@@ -3,7 +3,7 @@ from types import TracebackType
 
 from ..logging import log_func_call, log_exc, log_debug, log_info
 from .._testing.debug import is_debug_enabled
-from .log import setup_memory_logging
+from .log import setup_memory_logging, flush_async_logging
 from .stack import exc_info
 
 
@@ -63,6 +63,9 @@ class MainContext:
             else:
                 pass
 
+            # make sure everything queued for the background log writer is
+            # on disk before we exit
+            flush_async_logging()
             if not is_debug_enabled():
                 # if running in the debugger, we don't want to catch the
                 # SystemExit so we can see the traceback in the console more
@@ -1,10 +1,16 @@
 import sys
+from os import environ, getcwd
+from os.path import islink
+from functools import lru_cache
 from pathlib import Path, PurePosixPath, PureWindowsPath, PurePath, WindowsPath
 
 from ..logging import log_func_call, DEBUGLOW2
 from .expandvars import expandvars, is_key_resolved
 from .constants import IS_WIN32
 
+EXPANDUSER_ENV_VARS = ('HOME', 'USERPROFILE', 'HOMEDRIVE', 'HOMEPATH')
+"environment variables used to expand \"~\" in paths"
+
 
 @log_func_call(DEBUGLOW2, trace_only=True)
 def get_equiv_pureposixpath(x: str | Path):
@@ -78,7 +84,65 @@ def pureposixpath_to_resolved_pathobj(ppp: PurePosixPath):
     # resolve it any further.
     if pathobj.as_posix()[0] == '$':
         return pathobj
-    return pathobj.resolve()
+    return resolve_pathobj(pathobj)
+
+
+@lru_cache(maxsize=1024)
+def _resolve_dir(d: Path) -> Path:
+    return d.resolve()
+
+
+@log_func_call(DEBUGLOW2, trace_only=True)
+def resolve_pathobj(p: Path):
+    """
+    Same as `p.resolve()`, except that the parent directory is resolved
+    through a cache shared by every path in that directory, so resolving many
+    paths in one directory only has to look at each path's own name rather
+    than every component of its parent again.  This matters on network
+    filesystems, where each of those lookups can be slow.
+
+    The cached directories are not rechecked, so call
+    `invalidate_path_cache()` if symlinks along the way may have changed.
+
+    Args:
+        p (Path): path to resolve
+
+    Returns:
+        Path: absolute path to `p` with all symlinks resolved
+    """
+    # Windows also normalizes the case of each name when resolving, so only
+    # the full path cache is used there
+    if IS_WIN32:
+        return p.resolve()
+
+    if not p.is_absolute():
+        p = Path(getcwd())/p
+
+    name = p.name
+    if not name or name == '..' or islink(p):
+        return p.resolve()
+
+    return _resolve_dir(p.parent)/name
+
+
+@lru_cache(maxsize=4096)
+def _expanded_str_to_pathobj(x: str, resolve: bool, context: tuple):
+    # `context` is not used here, but it is part of the cache key
+    ppp = get_equiv_pureposixpath(x)
+    if resolve:
+        return pureposixpath_to_resolved_pathobj(ppp)
+    return pureposixpath_to_pathobj(ppp)
+
+
+def invalidate_path_cache():
+    """
+    Drop the cached results of `get_expanded_pathobj()` and
+    `resolve_pathobj()`.  Changes to the variables used to expand a path are
+    picked up without this, but call it if the filesystem (e.g. symlinks) or
+    the environment variables used for "~" may have changed.
+    """
+    _expanded_str_to_pathobj.cache_clear()
+    _resolve_dir.cache_clear()
 
 
 @log_func_call(DEBUGLOW2, trace_only=True)
@@ -122,21 +186,29 @@ def get_expanded_pathobj(x: str | Path, addl_expand_vars: dict = {},
 
     See `expandvars()` for details on how variables are expanded.
 
+    The results are cached on the expanded string (i.e. on the input and the
+    values of the variables in it), the working directory when resolving,
+    and the environment variables for "~" when the path starts with one.
+    See `invalidate_path_cache()`.
+
     Args:
         x (str  |  Path): input path
         addl_expand_vars (dict, optional): additional variables to override or
             supplement OS environment variables.  See `expandvars()` for
             details. Defaults to {}.
+        resolve (bool, optional): if False, the path is not made absolute.
+            Defaults to True.
 
     Returns:
         Path: fully-expanded absolute path to `x`, or None if `x` is None
             or empty
     """
     if x:
-        ppp = get_expanded_pureposixpath(x, addl_expand_vars, case_insensitive)
-        if resolve:
-            return pureposixpath_to_resolved_pathobj(ppp)
-        return pureposixpath_to_pathobj(ppp)
+        expanded = expandvars(str(x), addl_expand_vars, case_insensitive)
+        context = (getcwd() if resolve else None,
+                   tuple(environ.get(k) for k in EXPANDUSER_ENV_VARS)
+                   if expanded[:1] == '~' else None)
+        return _expanded_str_to_pathobj(expanded, resolve, context)
 
 
 DLL_EXTS = ('.dll', '.so', '.dylib')
@@ -1,14 +1,254 @@
 import sys
-from inspect import signature
-from collections.abc import Callable
+import marshal
+from os import environ, replace as osreplace
+from atexit import register as atexit_register
+from pathlib import Path
+from types import CodeType
+from inspect import signature, currentframe, Parameter
+from keyword import iskeyword
+from collections.abc import Callable, Mapping
 from functools import partial, update_wrapper
 from textwrap import dedent
 
 from .stack import (
-    safe_exec, get_framesummary_for_frame, get_stack_frame,
-    mark_next_tb_reraise_to_skip,
+    safe_exec, mark_next_tb_reraise_to_skip, AnnotatedFrameSummary,
 )
 
+ENV_PYRANDYOS_WRAPPER_CACHE = 'PYRANDYOS_WRAPPER_CACHE'
+"""
+If set, names a directory where compiled wrapper code is kept between runs.
+"""
+WRAPPER_CACHE_FILENAME = f'signature_wrappers.{sys.implementation.cache_tag}'
+"""
+File name of the disk cache.  The cache tag keeps different Python versions
+from trying to load each other's marshalled code.
+"""
+
+_WRAPPER_TEMPLATE_LINENO = currentframe().f_lineno + 2
+_WRAPPER_TEMPLATE = dedent("""
+def signature_aware_wrapper({params}):
+    __traceback_hide__ = True  # noqa: F841
+    try:
+        # the parameters are already bound exactly as Signature.bind and
+        # apply_defaults would bind them, so just pass them along
+        __func_args, __func_kwargs = __handler_partial({bindparams})
+        return __func(*__func_args, **__func_kwargs)
+    except BaseException as __e:
+        __e._pyrandyos_exec_source = __src
+        __e._pyrandyos_exec_source_frame = __src_frame
+        __mark_next_tb_reraise_to_skip(__e)
+        raise __e
+
+def signature_passthrough_wrapper({params}):
+    __traceback_hide__ = True  # noqa: F841
+    return __func({bindparams})
+""")
+
+_BIND_WRAPPER_TEMPLATE_LINENO = currentframe().f_lineno + 2
+_BIND_WRAPPER_TEMPLATE = dedent("""
+def signature_aware_wrapper(*__args, **__kwargs):
+    __traceback_hide__ = True  # noqa: F841
+    try:
+        __bound = __sig.bind(*__args, **__kwargs)
+        __bound.apply_defaults()
+        __func_args, __func_kwargs = __handler_partial(*__bound.args,
+                                                       **__bound.kwargs)
+        return __func(*__func_args, **__func_kwargs)
+    except BaseException as __e:
+        __e._pyrandyos_exec_source = __src
+        __e._pyrandyos_exec_source_frame = __src_frame
+        __mark_next_tb_reraise_to_skip(__e)
+        raise __e
+
+def signature_passthrough_wrapper(*__args, **__kwargs):
+    __traceback_hide__ = True  # noqa: F841
+    return __func(*__args, **__kwargs)
+""")
+"""
+Fallback for signatures that cannot be spelled out as a parameter list in
+`_WRAPPER_TEMPLATE`, binding the arguments at call time instead.
+"""
+_WRAPPER_RESERVED_NAMES = frozenset((
+    '__func', '__sig', '__handler_partial', '__src', '__src_frame',
+    '__defaults', '__mark_next_tb_reraise_to_skip', '__func_args',
+    '__func_kwargs', '__e', '__traceback_hide__',
+))
+"""
+Names used by `_WRAPPER_TEMPLATE` that a parameter would shadow.
+"""
+
+_WRAPPER_SHAPE_CACHE: dict[tuple, tuple[str, CodeType, int]] = dict()
+"""
+Wrapper source, compiled code and template line number for each signature
+shape, i.e. the kind, name and presence of a default for each parameter.
+"""
+_WRAPPER_CODE_CACHE: dict[str, CodeType] | None = None
+"""
+Compiled code keyed by wrapper source.  This is what goes to the disk cache;
+`None` until first use.
+"""
+_WRAPPER_CODE_CACHE_DIRTY = False
+_WRAPPER_SRC_FRAMES: dict[int, AnnotatedFrameSummary] = dict()
+
+
+def get_wrapper_cache_path():
+    cachedir = environ.get(ENV_PYRANDYOS_WRAPPER_CACHE)
+    return Path(cachedir)/WRAPPER_CACHE_FILENAME if cachedir else None
+
+
+def _load_wrapper_code_cache():
+    global _WRAPPER_CODE_CACHE
+    _WRAPPER_CODE_CACHE = cache = dict()
+    cachefile = get_wrapper_cache_path()
+    if cachefile:
+        atexit_register(save_wrapper_code_cache)
+        try:
+            loaded = marshal.loads(cachefile.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            # a missing or damaged cache just means compiling from scratch
+            return cache
+
+        if isinstance(loaded, dict):
+            cache.update((k, v) for k, v in loaded.items()
+                         if isinstance(k, str) and isinstance(v, CodeType))
+
+    return cache
+
+
+def save_wrapper_code_cache():
+    """
+    Write any newly compiled wrapper code to the disk cache named by the
+    `PYRANDYOS_WRAPPER_CACHE` environment variable.  This is registered to
+    run at exit when the cache is enabled, so it rarely needs to be called
+    directly.
+    """
+    global _WRAPPER_CODE_CACHE_DIRTY
+    cachefile = get_wrapper_cache_path()
+    if not (cachefile and _WRAPPER_CODE_CACHE_DIRTY):
+        return
+
+    tmpfile = cachefile.with_name(f'{cachefile.name}.tmp')
+    try:
+        cachefile.parent.mkdir(parents=True, exist_ok=True)
+        tmpfile.write_bytes(marshal.dumps(_WRAPPER_CODE_CACHE))
+        osreplace(tmpfile, cachefile)
+    except OSError:
+        return
+
+    _WRAPPER_CODE_CACHE_DIRTY = False
+
+
+def get_wrapper_src_frame(lineno: int = _WRAPPER_TEMPLATE_LINENO):
+    """
+    Return the frame summary attached to exceptions raised through a
+    signature-aware wrapper, pointing at the wrapper template in this module.
+    It is the same for every wrapper using that template, so it is only built
+    once.
+    """
+    fs = _WRAPPER_SRC_FRAMES.get(lineno)
+    if fs is None:
+        fs = AnnotatedFrameSummary(__file__, lineno,
+                                   generate_signature_aware_wrapper.__name__,
+                                   lookup_line=False)
+        fs._pyrandyos_hide_locals = True
+        _WRAPPER_SRC_FRAMES[lineno] = fs
+
+    return fs
+
+
+def get_signature_shape(sigparams: Mapping[str, Parameter]):
+    return tuple((p.kind, p.name, p.default is not p.empty)
+                 for p in sigparams.values())
+
+
+def needs_bind_wrapper(shape: tuple):
+    """
+    Return True if the signature shape cannot be written out as the
+    parameter list of a generated wrapper, either because a name is not a
+    usable identifier or because it would shadow one of the wrapper's own
+    names.
+    """
+    return any(not name.isidentifier() or iskeyword(name)
+               or name in _WRAPPER_RESERVED_NAMES for _, name, _ in shape)
+
+
+def build_wrapper_source(shape: tuple):
+    if needs_bind_wrapper(shape):
+        return _BIND_WRAPPER_TEMPLATE
+
+    # Build code to collect args and kwargs from the named parameters
+    args_list = list()
+    kwargs_list = list()
+    param_list = list()
+    positional = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+    posonly = False
+    for kind, name, has_default in shape:
+        if posonly and kind != Parameter.POSITIONAL_ONLY:
+            param_list.append('/')
+            posonly = False
+
+        if kind in positional:
+            posonly = kind == Parameter.POSITIONAL_ONLY
+            args_list.append(name)
+            param_list.append(f'{name}=__defaults[{name!r}]' if has_default
+                              else name)
+        elif kind == Parameter.VAR_POSITIONAL:
+            s = f'*{name}'
+            args_list.append(s)
+            param_list.append(s)
+        elif kind == Parameter.KEYWORD_ONLY:
+            if not any(p.startswith('*') for p in param_list):
+                # keyword-only parameters without *args need a bare *
+                param_list.append('*')
+
+            kwargs_list.append(f'{name}={name}')
+            param_list.append(f'{name}=__defaults[{name!r}]' if has_default
+                              else name)
+        elif kind == Parameter.VAR_KEYWORD:
+            s = f'**{name}'
+            kwargs_list.append(s)
+            param_list.append(s)
+
+    if posonly:
+        param_list.append('/')
+
+    params = ', '.join(param_list)
+    bindparams = ', '.join(args_list + kwargs_list)
+    return _WRAPPER_TEMPLATE.format(params=params, bindparams=bindparams)
+
+
+def get_wrapper_code(shape: tuple):
+    """
+    Return the wrapper source, compiled code and template line number for the
+    given signature shape, compiling it only if neither the in-memory nor the
+    disk cache has it already.
+    """
+    global _WRAPPER_CODE_CACHE_DIRTY
+    cached = _WRAPPER_SHAPE_CACHE.get(shape)
+    if cached:
+        return cached
+
+    src = build_wrapper_source(shape)
+    lineno = (_BIND_WRAPPER_TEMPLATE_LINENO if src is _BIND_WRAPPER_TEMPLATE
+              else _WRAPPER_TEMPLATE_LINENO)
+    codecache = _WRAPPER_CODE_CACHE
+    if codecache is None:
+        codecache = _load_wrapper_code_cache()
+
+    code = codecache.get(src)
+    if code is None:
+        try:
+            code = compile(src, '<string>', 'exec')
+        except SyntaxError:
+            # let safe_exec raise and annotate it like any other bad source
+            return src, src, lineno
+
+        codecache[src] = code
+        _WRAPPER_CODE_CACHE_DIRTY = True
+
+    cached = _WRAPPER_SHAPE_CACHE[shape] = (src, code, lineno)
+    return cached
+
 
 def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
                                      *handler_args, **handler_kwargs):
@@ -25,59 +265,13 @@ def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
     handler_partial = partial(arg_handler, handler_args, handler_kwargs, func)
     sig = signature(func)
     sigparams = sig.parameters
+    defaults = {p.name: p.default for p in sigparams.values()
+                if p.default is not p.empty}
 
-    # Build code to collect args and kwargs from the named parameters
-    args_list = list()
-    kwargs_list = list()
-    param_list = list()
-    defaults = dict()
-    for p in sigparams.values():
-        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
-            args_list.append(p.name)
-            if p.default is not p.empty:
-                param_list.append(f'{p.name}=__defaults[{p.name!r}]')
-                defaults[p.name] = p.default
-            else:
-                param_list.append(p.name)
-        elif p.kind == p.VAR_POSITIONAL:
-            s = f'*{p.name}'
-            args_list.append(s)
-            param_list.append(s)
-        elif p.kind == p.KEYWORD_ONLY:
-            kwargs_list.append(f'{p.name}={p.name}')
-            if p.default is not p.empty:
-                param_list.append(f'{p.name}=__defaults[{p.name!r}]')
-                defaults[p.name] = p.default
-            else:
-                param_list.append(p.name)
-        elif p.kind == p.VAR_KEYWORD:
-            s = f'**{p.name}'
-            kwargs_list.append(s)
-            param_list.append(s)
-
-    args_str = ', '.join(args_list)
-    kwargs_str = ', '.join(kwargs_list)
-    params = ', '.join(param_list)
-    bindparams = f'{args_str}{", " if kwargs_str else ""}{kwargs_str}'
-
-    # Create the wrapper source code with the same signature
-    f = get_stack_frame()
-    src_frame = get_framesummary_for_frame(f, lineno=f.f_lineno + 1)
-    src = dedent(f"""
-    def signature_aware_wrapper({params}):
-        __traceback_hide__ = True  # noqa: F841
-        try:
-            __bound = __sig.bind({bindparams})
-            __bound.apply_defaults()
-            __func_args, __func_kwargs = __handler_partial(*__bound.args,
-                                                           **__bound.kwargs)
-            return __func(*__func_args, **__func_kwargs)
-        except BaseException as __e:
-            __e._pyrandyos_exec_source = __src
-            __e._pyrandyos_exec_source_frame = __src_frame
-            __mark_next_tb_reraise_to_skip(__e)
-            raise __e
-    """)
+    # The wrapper code only depends on the shape of the signature, so it is
+    # compiled once per shape and executed in a fresh namespace per target.
+    src, code, lineno = get_wrapper_code(get_signature_shape(sigparams))
+    src_frame = get_wrapper_src_frame(lineno)
 
     # Create wrapper in a safe namespace
     env = {'__func': func, '__sig': sig, '__handler_partial': handler_partial,
@@ -90,7 +284,7 @@ def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
     while tryagain:
         tryagain = False
         try:
-            safe_exec(src, env, loc, log_errors=False, src_frame=src_frame)
+            safe_exec(code, env, loc, log_errors=False, src_frame=src_frame)
         except NameError as e:
             name = e.name
             if name in modules:
@@ -109,6 +303,8 @@ def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
             e_to_raise = e
 
     if e_to_raise:
+        # safe_exec records whatever it ran; report the source, not the code
+        e_to_raise._pyrandyos_exec_source = src
         try:
             from ..logging import log_exc
         except ImportError:
@@ -120,6 +316,13 @@ def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
 
     signature_aware_wrapper = env['signature_aware_wrapper']
     update_wrapper(signature_aware_wrapper, func)
+    # keep both code objects around so the wrapper can be hot-swapped between
+    # the instrumented path and a plain passthrough to func.  This has to be
+    # set after update_wrapper in case func is itself a wrapper.
+    signature_aware_wrapper._pyrandyos_wrapper_codes = (
+        signature_aware_wrapper.__code__,
+        env['signature_passthrough_wrapper'].__code__,
+    )
 
     # Copy metadata (from the original function if it's a partial)
     signature_aware_wrapper.__name__ = original_func.__name__
@@ -129,6 +332,31 @@ def generate_signature_aware_wrapper(func: Callable, arg_handler: Callable,
     return signature_aware_wrapper
 
 
+def set_signature_wrapper_passthrough(wrapper: Callable,
+                                      passthrough: bool = True):
+    """
+    Swap the code of a wrapper created by `generate_signature_aware_wrapper()`
+    between the instrumented path and a passthrough that calls the wrapped
+    function directly without invoking the argument handler.
+
+    The function object itself is unchanged, so every existing reference to
+    the wrapper picks up the change immediately.
+
+    Args:
+        wrapper (Callable): wrapper returned by
+            `generate_signature_aware_wrapper()`
+        passthrough (bool, optional): if True, bypass the argument handler.
+            Defaults to True.
+    """
+    aware_code, passthrough_code = wrapper._pyrandyos_wrapper_codes
+    wrapper.__code__ = passthrough_code if passthrough else aware_code
+
+
+def is_signature_wrapper_passthrough(wrapper: Callable):
+    codes = getattr(wrapper, '_pyrandyos_wrapper_codes', None)
+    return bool(codes) and wrapper.__code__ is codes[1]
+
+
 def example_decorator_arg_handler(handler_args: tuple, handler_kwargs: dict,
                                   func: Callable, *func_args, **func_kwargs):
     """
@@ -7,7 +7,8 @@ from inspect import getfile, getmodule, currentframe
 from importlib import import_module
 from logging import _srcfile
 from traceback import StackSummary, FrameSummary, TracebackException
-from itertools import islice
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 from linecache import (
     lazycache as lazylinecache, checkcache as checklinecache,
     getline as getcachedline
@@ -22,6 +23,26 @@ STDLIB_LOGGING_SRCFILE = Path(_srcfile)
 RUNPY_SRCFILE = (Path(sys.modules['runpy'].__file__) if 'runpy' in sys.modules
                  else None)
 SHOW_TRACEBACK_LOCALS = None
+_TB_HIDE = '__traceback_hide__'
+_INTERNAL_FILENAME_CACHE: dict[str, bool] = dict()
+_INTERNAL_CODE_CACHE: dict[int, tuple[CodeType, bool]] = dict()
+"""
+`is_internal_code()` verdicts keyed by `id()` of the code object, since equal
+code objects may still come from different files.  Each entry keeps its code
+object so that a reused id can be detected.
+"""
+_INTERNAL_CODE_CACHE_SIZE = 4096
+_NO_POSITION = (None, None, None, None)
+_CODE_POSITIONS_CACHE: 'WeakKeyDictionary[CodeType, tuple]' = (
+    WeakKeyDictionary()
+)
+"""
+Decoded `co_positions()` tables, keyed by code object.  A code object's
+positions are immutable, so entries never go stale and are dropped along with
+the code object itself.
+"""
+_FRAME_FORMAT_CACHE_SIZE = 4096
+_FRAME_FORMAT_CACHE: dict[tuple, str] = dict()
 
 ModAndName = tuple[ModuleType, str]
 ExcInfoType = tuple[type, BaseException, TracebackType]
@@ -31,6 +52,52 @@ class AnnotatedFrameSummary(FrameSummary):
     pass
 
 
+class CachedStackSummary(StackSummary):
+    """
+    `StackSummary` that remembers how each frame position was formatted.
+
+    Formatting the source line and caret underlines for a frame means
+    compiling the line segment to find the anchors, which dominates the cost
+    of formatting a deep traceback.  That part of the output depends only on
+    the position and line text, so it is cached on those and only the locals
+    are formatted each time.
+    """
+    @classmethod
+    def from_list(cls, a_list):
+        # the stdlib version always returns a plain StackSummary
+        result = cls()
+        result.extend(StackSummary.from_list(a_list))
+        return result
+
+    def format_frame_summary(self, frame_summary: FrameSummary, **kwargs):
+        key = (frame_summary.filename, frame_summary.lineno,
+               frame_summary.name, frame_summary.line,
+               getattr(frame_summary, 'end_lineno', None),
+               getattr(frame_summary, 'colno', None),
+               getattr(frame_summary, 'end_colno', None),
+               tuple(kwargs.items()))
+        text = _FRAME_FORMAT_CACHE.get(key)
+        if text is None:
+            f_locals = frame_summary.locals
+            frame_summary.locals = None
+            try:
+                text = super().format_frame_summary(frame_summary, **kwargs)
+            finally:
+                frame_summary.locals = f_locals
+
+            if len(_FRAME_FORMAT_CACHE) >= _FRAME_FORMAT_CACHE_SIZE:
+                _FRAME_FORMAT_CACHE.clear()
+
+            _FRAME_FORMAT_CACHE[key] = text
+
+        if not frame_summary.locals:
+            return text
+
+        # this matches the stdlib formatting of locals
+        return text + ''.join(f'    {name} = {value}\n' for name, value
+                              in sorted(frame_summary.locals.items()))
+
+
 def set_show_traceback_locals(enabled: bool = True):
     global SHOW_TRACEBACK_LOCALS
     SHOW_TRACEBACK_LOCALS = bool(enabled)
@@ -114,12 +181,14 @@ def top_package_dir_path(arg=None):  # noqa: E302
                                                    or get_stack_frame(2))[0])
 
 
-def is_internal_frame(frame: FrameSummary):
+def is_internal_filename(filename: str):
     __traceback_hide__ = True  # noqa: F841
     # adapted from stdlib logging._is_internal_frame
-    filename = frame.filename
+    internal = _INTERNAL_FILENAME_CACHE.get(filename)
+    if internal is not None:
+        return internal
+
     p = Path(filename).resolve()
-    loc = frame.locals or {}
 
     # tests broken out for debugging purposes
     testdict = dict(
@@ -132,15 +201,82 @@ def is_internal_frame(frame: FrameSummary):
         is_shiboken2='shiboken2' in p.parts,
         is_importlib_bootstrap=('importlib' == p.parent
                                 and '_bootstrap' in p.name),
-        is_traceback_hide=loc.get('__traceback_hide__')
     )
     internal = any(testdict.values())
     which = [k for k, v in testdict.items() if v] if internal else None  # noqa: E501, F841
+    _INTERNAL_FILENAME_CACHE[filename] = internal
     return internal
 
 
+def is_internal_code(code: CodeType):
+    """
+    Cached verdict on whether frames running the given code object should be
+    hidden from caller lookups and tracebacks.
+
+    A code object is internal if its file is internal (see
+    `is_internal_filename()`) or if it declares a `__traceback_hide__` local.
+    Since the local is always assigned at the top of the function, its
+    presence in the code object is enough to decide without having to inspect
+    the locals of a live frame.
+    """
+    __traceback_hide__ = True  # noqa: F841
+    cache = _INTERNAL_CODE_CACHE
+    entry = cache.get(id(code))
+    if entry and entry[0] is code:
+        return entry[1]
+
+    internal = (_TB_HIDE in code.co_varnames
+                or _TB_HIDE in code.co_cellvars
+                or is_internal_filename(code.co_filename))
+    if len(cache) >= _INTERNAL_CODE_CACHE_SIZE:
+        cache.clear()
+
+    cache[id(code)] = (code, internal)
+    return internal
+
+
+def is_internal_frame(frame: FrameSummary):
+    __traceback_hide__ = True  # noqa: F841
+    loc = frame.locals or {}
+    return bool(loc.get(_TB_HIDE)) or is_internal_filename(frame.filename)
+
+
+def find_caller_frame(stacklevel: int = 1, f: FrameType | None = None):
+    """
+    Walk the raw frames of the stack starting at `f` and return the frame of
+    the `stacklevel`-th caller that is not internal.  This is equivalent to
+    `filter_stack()[-stacklevel]` but never builds a `StackSummary`.
+
+    Args:
+        stacklevel (int, optional): which non-internal frame to return,
+            counting from the most recent.  Defaults to 1.
+        f (FrameType, optional): frame to start from.  Defaults to the caller
+            of this function.
+
+    Returns:
+        FrameType | None: the matching frame, or None if the stack is
+            exhausted first
+    """
+    __traceback_hide__ = True  # noqa: F841
+    f = f or get_stack_frame(2)
+    cache = _INTERNAL_CODE_CACHE
+    while f is not None:
+        code = f.f_code
+        entry = cache.get(id(code))
+        internal = (entry[1] if entry and entry[0] is code
+                    else is_internal_code(code))
+
+        if not internal:
+            stacklevel -= 1
+            if stacklevel < 1:
+                return f
+
+        f = f.f_back
+
+
 def get_framesummary_for_frame(f: FrameType, tb: TracebackType = None,
-                               src: str = None, lineno: int = None):
+                               src: str = None, lineno: int = None,
+                               checked: set[str] = None):
     # adapted from stdlib traceback._walk_tb_with_full_positions
     # and from stdlib traceback.StackSummary._extract_from_extended_frame_gen
     __traceback_hide__ = True  # noqa: F841
@@ -149,8 +285,14 @@ def get_framesummary_for_frame(f: FrameType, tb: TracebackType = None,
     code = f.f_code
     name = code.co_name
     filename = code.co_filename
-    lazylinecache(filename, f.f_globals)
-    checklinecache(filename)
+    if checked is None or filename not in checked:
+        # the stat() in checkcache is the expensive part of this function, so
+        # callers building a whole stack pass a set to do it once per file
+        lazylinecache(filename, f.f_globals)
+        checklinecache(filename)
+        if checked is not None:
+            checked.add(filename)
+
     fixed_lineno = lineno
     end_lineno = None
     colno = None
@@ -159,18 +301,15 @@ def get_framesummary_for_frame(f: FrameType, tb: TracebackType = None,
         lineno = (None if not isinstance(lasti, int) or lasti < 0
                   else (tb.tb_lineno if tb else f.f_lineno))
 
-    posgen: Callable = (getattr(code, 'co_positions', None)
-                        if fixed_lineno is None else None)
-    underlines = bool(posgen)
-    if posgen:
-        lineno2, end_lineno, colno, end_colno = next(islice(posgen(),
-                                                            lasti // 2, None))
+    underlines = fixed_lineno is None and hasattr(code, 'co_positions')
+    if underlines:
+        lineno2, end_lineno, colno, end_colno = get_instruction_position(code,
+                                                                         lasti)
         if lineno2 is not None:
             lineno = lineno2
 
     line = None if lineno is None else (
-        (src.splitlines()[lineno - 1] if src else '<unknown source>')
-        if filename == '<string>' else
+        get_source_line(src, lineno) if filename == '<string>' else
         getcachedline(filename, lineno)
     )
     if line and underlines:
@@ -205,7 +344,7 @@ def get_framesummary_for_frame(f: FrameType, tb: TracebackType = None,
         'end_lineno': end_lineno,
         'colno': colno,
         'end_colno': end_colno
-    } if posgen else {}
+    } if underlines else {}
 
     summary = AnnotatedFrameSummary(filename, lineno, name, lookup_line=False,
                                     locals=f_locals, line=line, **kwargs)
@@ -222,10 +361,11 @@ def build_stacksummary_for_frame(f: FrameType | None = None,
 
     # If you want to limit the stack, you'll have to just slice the output
     # because I am removing the limits here to reduce complexity.
-    result = StackSummary()
+    result = CachedStackSummary()
+    checked = set()
     f = f or get_stack_frame(2)
     while f is not None:
-        result.append(get_framesummary_for_frame(f))
+        result.append(get_framesummary_for_frame(f, checked=checked))
         f = f.f_back
 
     if reverse:
@@ -241,13 +381,14 @@ def build_stacksummary_for_tb(tb: TracebackType, exc: BaseException = None):
 
     # If you want to limit the stack, you'll have to just slice the output
     # because I am removing the limits here to reduce complexity.
-    result = StackSummary()
+    result = CachedStackSummary()
     tb: TracebackType | None
     src: str = getattr(exc, '_pyrandyos_exec_source', '<unknown source>')
     src_f: FrameSummary = getattr(exc, '_pyrandyos_exec_source_frame', None)
     skipset = getattr(exc, '_pyrandyos_skip_next_reraise', None) or set()
+    checked = set()
     while tb is not None:
-        fs = get_framesummary_for_frame(tb.tb_frame, tb, src)
+        fs = get_framesummary_for_frame(tb.tb_frame, tb, src, checked=checked)
         fs._pyrandyos_skip_next_reraise = id(tb) in skipset
         result.append(fs)
         tb = tb.tb_next
@@ -286,13 +427,88 @@ def filter_stack(stk: StackSummary = None, stacklevel: int = 2):
         if last:
             yield last
 
-    return StackSummary.from_list(list(stackgen()))
+    return CachedStackSummary.from_list(list(stackgen()))
+
+
+def get_code_positions(code: CodeType) -> tuple:
+    __traceback_hide__ = True  # noqa: F841
+    positions = _CODE_POSITIONS_CACHE.get(code)
+    if positions is None:
+        posgen: Callable = getattr(code, 'co_positions', None)
+        positions = tuple(posgen()) if posgen else ()
+        _CODE_POSITIONS_CACHE[code] = positions
+
+    return positions
+
+
+def get_instruction_position(code: CodeType, lasti: int):
+    __traceback_hide__ = True  # noqa: F841
+    positions = get_code_positions(code)
+    i = lasti // 2 if isinstance(lasti, int) and lasti >= 0 else -1
+    return positions[i] if 0 <= i < len(positions) else _NO_POSITION
+
+
+@lru_cache(maxsize=32)
+def _split_source_lines(src: str):
+    return tuple(src.splitlines())
+
+
+def get_source_line(src: str, lineno: int):
+    __traceback_hide__ = True  # noqa: F841
+    lines = _split_source_lines(src) if src else ()
+    # exceptions that did not come through safe_exec have no source attached
+    return (lines[lineno - 1] if 0 < lineno <= len(lines)
+            else '<unknown source>')
+
+
+@lru_cache(maxsize=1024)
+def get_character_offset_map(s: str) -> tuple[int, ...] | None:
+    """
+    Return a table mapping each UTF-8 byte offset into `s` to the number of
+    characters that `byte_offset_to_character_offset` would report for it, or
+    `None` if `s` is pure ASCII and the two offsets are the same.
+
+    The table is keyed on the line text itself, so it can never disagree with
+    what `linecache` returns; `clear_position_caches` drops it along with the
+    other position caches.
+    """
+    if s.isascii():
+        return None
+
+    offsets = list()
+    for i, c in enumerate(s):
+        offsets.append(i)
+        # a partial multibyte sequence decodes to one replacement character
+        offsets.extend((i + 1,)*(len(c.encode('utf-8')) - 1))
+
+    offsets.append(len(s))
+    return tuple(offsets)
 
 
 def byte_offset_to_character_offset(s: str, offset: int):
     __traceback_hide__ = True  # noqa: F841
-    as_utf8 = s.encode('utf-8')
-    return len(as_utf8[:offset].decode("utf-8", errors="replace"))
+    if offset < 0:
+        as_utf8 = s.encode('utf-8')
+        return len(as_utf8[:offset].decode("utf-8", errors="replace"))
+
+    offsets = get_character_offset_map(s)
+    if offsets is None:
+        return min(offset, len(s))
+
+    return offsets[min(offset, len(offsets) - 1)]
+
+
+def clear_position_caches():
+    """
+    Drop the cached position tables, line offset maps and formatted frame
+    positions used when formatting tracebacks.  Call this alongside
+    `linecache.clearcache()` if source files are being rewritten in place by a
+    long-running process.
+    """
+    _CODE_POSITIONS_CACHE.clear()
+    _FRAME_FORMAT_CACHE.clear()
+    _split_source_lines.cache_clear()
+    get_character_offset_map.cache_clear()
 
 
 def get_real_caller_stack(stacklevel: int = 1):
@@ -323,6 +539,15 @@ def log_find_caller(stack_info: bool = False, stacklevel: int = 1,
     # need to apply an offset to the stack; the only reason for the default
     # stacklevel 1 is because it's actually a negative value and NOT because
     # it implies the need to pop more entries off of the stack.
+    if not exc_info and not stack_info and stacklevel > 0:
+        # fast path: only the caller itself is needed, so skip building the
+        # frame summaries for the entire stack.
+        f = find_caller_frame(stacklevel, currentframe())
+        if f is None:
+            return "(unknown file)", 0, "(unknown function)", None
+        code = f.f_code
+        return code.co_filename, f.f_lineno, code.co_name, None
+
     if exc_info:
         stk = filter_tb_stacksummary_if_not_internal(exc_info[2], exc_info[1])
         stacklevel = 0
@@ -344,11 +569,11 @@ def filter_traceback_fullstack(tb: TracebackType, exc: BaseException):
     __traceback_hide__ = True  # noqa: F841
     tbstack = filter_tb_stacksummary_if_not_internal(tb, exc)
     stk = filter_stack(build_stacksummary_for_frame(tb.tb_frame))
-    fullstack = StackSummary.from_list(stk[:-1] + tbstack)
+    fullstack = CachedStackSummary.from_list(stk[:-1] + tbstack)
     for f in fullstack:
         if SHOW_TRACEBACK_LOCALS or SHOW_TRACEBACK_LOCALS is None:
             # make a copy so we don't actually modify the frame
-            loc = dict(f.locals)
+            loc = dict(f.locals) if f.locals else None
             if loc:
                 hide = f._pyrandyos_hide_locals
                 if hide is True:
@@ -410,7 +635,8 @@ def build_traceback_exception(exc: BaseException | TracebackException,
 
     tb = tb or exc.__traceback__
     te = (exc if isinstance(exc, TracebackException)
-          else TracebackException(type(exc), exc, tb, compact=compact))
+          else TracebackException(type(exc), exc, tb, compact=compact,
+                                  lookup_lines=False))
     te.stack = filter_traceback_fullstack(tb, exc)
     add_src_note_to_traceback_exception(te, exc)
     top_te = te
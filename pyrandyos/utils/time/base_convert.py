@@ -47,18 +47,20 @@ EMB_E = 1.671e-2
 EMB_M0 = 6.239996e0
 EMB_N = 1.99096871e-7
 
+# Since K*M1*(1+EB) is quite small (on the order of 10**-9)
+# 3 iterations should get us as close as we can get to the
+# solution for TDT
+ET_TO_TT_ITERATIONS = 3
+
 
 def emb_kepler(tt: float):
     m = EMB_M0 + EMB_N*tt
     return MOYER_K*sin(m + EMB_E*sin(m))
 
 
-def et_to_tt(et: float):
-    # Since K*M1*(1+EB) is quite small (on the order of 10**-9)
-    # 3 iterations should get us as close as we can get to the
-    # solution for TDT
+def et_to_tt(et: float, iterations: int = ET_TO_TT_ITERATIONS):
     tt = et
-    for i in range(3):
+    for i in range(iterations):
         tt = et - emb_kepler(tt)
     return tt
 
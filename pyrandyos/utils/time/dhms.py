@@ -9,12 +9,14 @@ def sec_to_dhms(x: float, sec_digits: int = None):
     "returns d, h, m, s, sign"
     sign = 1 - 2*(x < 0)
     x *= sign
-    d, tmp = divmod(x, DAY2SEC)
-    h, tmp = divmod(tmp, 3600)
     scalar = pow(10, sec_digits or 0)
     if sec_digits is not None:
-        tmp = round(tmp*scalar)
+        # round before splitting so that rounding up carries into the minutes,
+        # hours and days rather than giving 60 minutes
+        x = round(x*scalar)
 
+    d, tmp = divmod(x, DAY2SEC*scalar)
+    h, tmp = divmod(tmp, 3600*scalar)
     m, tmp = divmod(tmp, 60*scalar)
     s = tmp/scalar
     return int(d), int(h), int(m), s, sign
@@ -87,3 +87,27 @@ class TimeFormatter:
     def sec_as_fmt_str(self, t: float):
         return sec_as_fmt_str(t, self.time_format, self.digits,
                               self.zeropad)
+
+    def sec_as_fmt_str_array(self, t):
+        """
+        Same as `sec_as_fmt_str()` for every element of an array or `Series`
+        of times.  See `string_array` for details.
+        """
+        # imported here so that NumPy is only loaded when it is needed
+        from .string_array import sec_as_fmt_str_array
+        return sec_as_fmt_str_array(t, self.time_format, self.digits,
+                                    self.zeropad)
+
+    def fmt_str_to_sec(self, s: str, strict: bool = True):
+        "the inverse of `sec_as_fmt_str()`; see `parse` for details"
+        from .parse import fmt_str_to_sec
+        return fmt_str_to_sec(s, self.time_format, strict)
+
+    def fmt_str_to_sec_array(self, strings, strict: bool = True):
+        """
+        Same as `fmt_str_to_sec()` for every element of an array or `Series`
+        of strings.  See `parse_array` for details.
+        """
+        # imported here so that NumPy is only loaded when it is needed
+        from .parse_array import fmt_str_to_sec_array
+        return fmt_str_to_sec_array(strings, self.time_format, strict)
@@ -0,0 +1,177 @@
+"""
+Array versions of the calendar conversions in `gregorian`, for converting
+many epochs at once.  Each function accepts NumPy arrays or pandas `Series`
+(or anything else `numpy.asarray` accepts) and does the whole conversion in
+a fixed number of array operations, using lookup tables where the scalar
+versions loop over the months.
+
+Decomposed dates are returned in columns: a NumPy structured array with one
+field per component, or a pandas `DataFrame` with the same index if the input
+was a `Series`.
+"""
+import numpy as np
+from pandas import DataFrame, Series
+
+from .julian import DAY2SEC
+from .gregorian import (
+    DAYSINMONTH, _J2K_MINUS_J1, _NOINK, _DWIFFLE, _SHWIEL,
+)
+
+YMDHMS_DTYPE = np.dtype([('year', np.int64), ('month', np.int64),
+                         ('day', np.int64), ('hour', np.int64),
+                         ('minute', np.int64), ('second', np.float64)])
+"fields of the output of `sec_to_ymdhms_array()`"
+Y_DOY_HMS_DTYPE = np.dtype([('year', np.int64), ('doy', np.int64),
+                            ('hour', np.int64), ('minute', np.int64),
+                            ('second', np.float64)])
+"fields of the output of `sec_to_y_doy_hms_array()`"
+
+
+def _build_doy_tables():
+    # days before the start of each month, for common and leap years
+    cumdays = np.zeros((2, 13), np.int64)
+    cumdays[0, 1:] = np.cumsum(DAYSINMONTH)
+    cumdays[1, 1:] = cumdays[0, 1:] + (np.arange(1, 13) >= 2)
+
+    # month and day of month for each day of the year (index 0 is unused)
+    doy = np.arange(367)
+    months = np.ones((2, 367), np.int64)
+    for isleap in (0, 1):
+        months[isleap] = np.searchsorted(cumdays[isleap], doy, 'left')
+
+    months[:, 0] = 1
+    days = doy - np.take_along_axis(cumdays, months - 1, 1)
+    return cumdays, months, days
+
+
+_CUMDAYS, _DOY_MONTH, _DOY_DAY = _build_doy_tables()
+
+
+def _columns(template, dtype: np.dtype, values: tuple):
+    "returns `values` as the columns of a structured array or DataFrame"
+    if isinstance(template, Series):
+        return DataFrame(dict(zip(dtype.names, values)), index=template.index)
+
+    out = np.empty(np.shape(values[0]), dtype)
+    for name, value in zip(dtype.names, values):
+        out[name] = value
+
+    return out
+
+
+def _like(template, values: np.ndarray):
+    "returns `values` as a `Series` like `template` if it is one"
+    if isinstance(template, Series):
+        return Series(values, index=template.index, name=template.name)
+
+    if isinstance(template, DataFrame):
+        return Series(values, index=template.index)
+
+    return values
+
+
+def is_leap_year_array(year):
+    "same as `is_leap_year`, as a boolean array"
+    year = np.asarray(year)
+    # is_leap_year is never true for negative years
+    return ((year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+            & (year >= 0))
+
+
+def day_of_year_array(year, month, day):
+    "same as `day_of_year`, by table lookup"
+    isleap = is_leap_year_array(year).astype(np.int64)
+    month = np.asarray(month, np.int64)
+    doy = _CUMDAYS[isleap, month - 1] + np.asarray(day, np.int64)
+    return _like(year, doy)
+
+
+def doy2md_array(year, doy):
+    "same as `doy2md`, by table lookup; returns (month, day) arrays"
+    isleap = is_leap_year_array(year).astype(np.int64)
+    doy = np.asarray(doy, np.int64)
+    return _DOY_MONTH[isleap, doy], _DOY_DAY[isleap, doy]
+
+
+def ymdhms_to_sec_array(y, mo=None, d=None, h=0, m=0, s=0.0):
+    """
+    Same as `ymdhms_to_sec`.  If only `y` is given, it is taken to be the
+    columns returned by `sec_to_ymdhms_array()`.
+    """
+    template = y
+    if mo is None:
+        y, mo, d, h, m, s = (y[name] for name in YMDHMS_DTYPE.names)
+
+    year = np.rint(np.asarray(y)).astype(np.int64)
+    month = np.rint(np.asarray(mo)).astype(np.int64)
+    day = np.rint(np.asarray(d)).astype(np.int64)
+
+    # Apply the Muller-Wimberly formula and then tack on the seconds.
+    day = (367*year - (7*(year + ((month + 9)//12))//4)
+           - (3*(((year + ((month - 9)//7))//100) + 1)//4)
+           + (275*month//9) + day - 730516)
+
+    spj2k = (day - 0.5)*DAY2SEC
+    spj2k += 3600.0*np.asarray(h)
+    spj2k += 60.0*np.asarray(m)
+    spj2k += np.asarray(s)
+    return _like(template, spj2k)
+
+
+def _split_formal(formal, sec_digits: int = None):
+    """
+    Splits J2000 seconds into (days past J2000, hours, minutes, scaled
+    seconds), where the seconds are in units of 10**-`sec_digits` and are
+    whole numbers if `sec_digits` is given.  Raises `ValueError` if any epoch
+    is NaN or infinite, as `sec_to_ymdhms` does.
+    """
+    # the same steps as sec_to_ymdhms, on whole arrays
+    tmp = np.asarray(formal, np.float64)
+    if not np.isfinite(tmp).all():
+        raise ValueError('cannot convert a NaN or infinite epoch to a date')
+
+    scalar = pow(10, sec_digits or 0)
+    if sec_digits is not None:
+        tmp = np.rint(tmp*scalar)
+
+    tmp, stmp = np.divmod(tmp + 43200*scalar, 60*scalar)
+    tmp, m = np.divmod(tmp, 60)
+    days_past_j2k, h = np.divmod(tmp, 24)
+    return (days_past_j2k.astype(np.int64), h.astype(np.int64),
+            m.astype(np.int64), stmp)
+
+
+def _days_to_year_doy(days_past_j2k: np.ndarray):
+    days_since_jan1_1ad = days_past_j2k + _J2K_MINUS_J1
+
+    noinks, days_since_last_noink = np.divmod(days_since_jan1_1ad, _NOINK)
+    dwiffles = np.minimum(3, days_since_last_noink//_DWIFFLE)
+
+    days_since_last_dwiffle = days_since_last_noink - dwiffles*_DWIFFLE
+    shwiels = np.minimum(24, days_since_last_dwiffle//_SHWIEL)
+
+    days_since_last_shwiel = days_since_last_dwiffle - shwiels*_SHWIEL
+    net_years = np.minimum(3, days_since_last_shwiel//365)
+
+    doy = days_since_last_shwiel - net_years*365 + 1
+    year = noinks*400 + dwiffles*100 + shwiels*4 + net_years + 1
+    return year, doy
+
+
+def _sec_to_ymdhms(formal, sec_digits: int = None):
+    days_past_j2k, h, m, stmp = _split_formal(formal, sec_digits)
+    year, doy = _days_to_year_doy(days_past_j2k)
+    return year, doy, h, m, stmp/pow(10, sec_digits or 0)
+
+
+def sec_to_ymdhms_array(formal, sec_digits: int = None):
+    "same as `sec_to_ymdhms`; see `YMDHMS_DTYPE` for the output columns"
+    year, doy, h, m, s = _sec_to_ymdhms(formal, sec_digits)
+    month, day = doy2md_array(year, doy)
+    return _columns(formal, YMDHMS_DTYPE, (year, month, day, h, m, s))
+
+
+def sec_to_y_doy_hms_array(formal, sec_digits: int = None):
+    "same as `sec_to_y_doy_hms`; see `Y_DOY_HMS_DTYPE` for the output columns"
+    return _columns(formal, Y_DOY_HMS_DTYPE,
+                    _sec_to_ymdhms(formal, sec_digits))
@@ -1,3 +1,6 @@
+from bisect import bisect_right
+from math import isfinite, nan
+
 from .gregorian import ymdhms_to_sec
 
 _JAN = 1
@@ -36,6 +39,85 @@ LEAPS_TABLE = [
 ]
 
 
+class CompiledLeaps:
+    """
+    `LEAPS_TABLE` compiled for lookups by bisection rather than by checking
+    every entry.  `offsets[i]` is TAI - UTC after `i` of the leap seconds, so
+    the offset at a given epoch is `offsets[n]`, where `n` is the number of
+    leap seconds at or before it (the insertion point in `utc_epochs` or
+    `tai_epochs`).  Before the first leap second, the offset is the first
+    entry of the table minus one second.
+
+    The NumPy versions of the arrays are only built the first time an array is
+    looked up, so that scalar lookups never need to import NumPy.
+    """
+    def __init__(self, table: list = LEAPS_TABLE):
+        leaps, epochs = table[::2], table[1::2]
+        self.offsets: list[float] = [leaps[0] - 1.0]
+        self.offsets.extend(float(x) for x in leaps)
+        self.utc_epochs: list[float] = [float(x) for x in epochs]
+        # tai = utc + leap, so each leap takes effect at this TAI
+        self.tai_epochs: list[float] = [float(e + x)
+                                        for e, x in zip(epochs, leaps)]
+        self._arrays = None
+
+    def get_arrays(self):
+        "returns the (offsets, utc_epochs, tai_epochs) as NumPy arrays"
+        arrays = self._arrays
+        if arrays is None:
+            from numpy import array
+            arrays = self._arrays = (array(self.offsets),
+                                     array(self.utc_epochs),
+                                     array(self.tai_epochs))
+
+        return arrays
+
+    def lookup(self, t, tai: bool = False):
+        """
+        Returns the TAI - UTC offset at the given UTC (or TAI) epoch(s), which
+        may be a scalar, a NumPy array or a pandas `Series`.  Non-finite
+        epochs give NaN.
+        """
+        if type(t) in (float, int):
+            if not isfinite(t):
+                return nan
+
+            epochs = self.tai_epochs if tai else self.utc_epochs
+            return self.offsets[bisect_right(epochs, t)]
+
+        from numpy import asarray, isfinite as npisfinite, ndim, float64
+        if not ndim(t):
+            return float64(self.lookup(float(t), tai))
+
+        offsets, utc_epochs, tai_epochs = self.get_arrays()
+        values = asarray(t)
+        leap = offsets[(tai_epochs if tai else utc_epochs).searchsorted(
+            values, 'right'
+        )]
+        if values.dtype.kind in 'fc':
+            finite = npisfinite(values)
+            if not finite.all():
+                leap[~finite] = nan
+
+        if values is not t and hasattr(t, 'index'):
+            # same as the result of arithmetic on a pandas Series
+            return type(t)(leap, index=t.index, name=getattr(t, 'name', None))
+
+        return leap
+
+
+_COMPILED_LEAPS = CompiledLeaps(LEAPS_TABLE)
+
+
+def compile_leaps_table():
+    """
+    Recompile the lookup tables from `LEAPS_TABLE`.  Call this after changing
+    `LEAPS_TABLE` (e.g. after loading a newer leap second kernel).
+    """
+    global _COMPILED_LEAPS
+    _COMPILED_LEAPS = CompiledLeaps(LEAPS_TABLE)
+
+
 def get_leaps_at_utc(utc: float):
     # if the current time equals the timestamp, it means
     # our current "seconds" are ambiguous.  If we had additional information
@@ -45,28 +127,10 @@ def get_leaps_at_utc(utc: float):
 
     # for epochs before the first leap second, return delta et at
     # the epoch of the leap second minus one second.
-    lastleap = LEAPS_TABLE[0] - 1
-    leap = utc*0.0 + lastleap
-
-    for newleap, epoch in zip(LEAPS_TABLE[::2], LEAPS_TABLE[1::2]):
-        # tai = utc + leap
-        dleap = newleap - lastleap
-        leap += (utc >= epoch)*dleap
-        lastleap = newleap
-
-    return leap
+    return _COMPILED_LEAPS.lookup(utc)
 
 
 def get_leaps_at_tai(tai: float):
     # for epochs before the first leap second, return delta et at
     # the epoch of the leap second minus one second.
-    lastleap = LEAPS_TABLE[0] - 1
-    leap = tai*0.0 + lastleap
-
-    for newleap, epoch in zip(LEAPS_TABLE[::2], LEAPS_TABLE[1::2]):
-        # tai = utc + leap
-        dleap = newleap - lastleap
-        leap += ((tai - newleap) >= epoch)*dleap
-        lastleap = newleap
-
-    return leap
+    return _COMPILED_LEAPS.lookup(tai, True)
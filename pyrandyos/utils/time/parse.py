@@ -0,0 +1,170 @@
+"""
+Parsers for the time strings made by `string` (and `sec_as_fmt_str()`), back
+into J2000 seconds.
+
+With `strict=True` (the default), a string must have exactly the layout the
+formatter makes and every field must be in range (seconds may reach 60 to
+allow for leap seconds), or a `ValueError` is raised.  The ISO date/time
+separator may be either a space or a `T`, dates may end with a `Z`, and
+numbers must be plain decimal literals (see `NUMBER_PATTERN`).
+
+With `strict=False`, surrounding whitespace, unpadded fields and missing
+seconds (or, for dates, a missing time of day) are accepted, fields are not
+range checked (so they roll over like they do in `ymdhms_to_sec()`), and
+strings that still can't be parsed give NaN rather than an error.
+"""
+import re
+from math import nan
+
+from .julian import DAY2SEC
+from .gregorian import ymdhms_to_sec, is_leap_year, DAYSINMONTH
+from .dhms import dhms_to_sec
+from .fmt import TimeFormat
+
+_SEC = r'(\d{2}(?:\.\d+)?)'
+_LENIENT_SEC = r'(\d{1,2}(?:\.\d*)?)'
+_LENIENT_HMS = rf'(\d{{1,2}}):(\d{{1,2}})(?::{_LENIENT_SEC})?'
+
+YMDHMS_PATTERN = re.compile(
+    rf'(\d{{4}})-(\d{{2}})-(\d{{2}})[ T](\d{{2}}):(\d{{2}}):{_SEC}Z?', re.ASCII
+)
+"strict pattern for `TimeFormat.YMDHMS` (and ISO) strings"
+Y_DOY_HMS_PATTERN = re.compile(
+    rf'(\d{{4}}):(\d{{3}}):(\d{{2}}):(\d{{2}}):{_SEC}', re.ASCII
+)
+"strict pattern for `TimeFormat.Y_DOY_HMS` strings"
+DHMS_PATTERN = re.compile(rf'(-?)(\d{{2,}})/(\d{{2}}):(\d{{2}}):{_SEC}',
+                          re.ASCII)
+"strict pattern for `TimeFormat.DHMS` strings"
+NUMBER_PATTERN = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?',
+                            re.ASCII)
+"""
+strict pattern for numbers in the units of the `FLOAT_FMTS`: a plain decimal
+literal, without the whitespace, underscores, NaN or infinity `float()` allows
+"""
+
+LENIENT_YMDHMS_PATTERN = re.compile(
+    rf'\s*(\d{{1,4}})-(\d{{1,2}})-(\d{{1,2}})'
+    rf'(?:(?:\s*T\s*|\s+){_LENIENT_HMS})?\s*Z?\s*', re.ASCII
+)
+"lenient pattern for `TimeFormat.YMDHMS` (and ISO) strings"
+LENIENT_Y_DOY_HMS_PATTERN = re.compile(
+    rf'\s*(\d{{1,4}})[:-](\d{{1,3}})(?:(?:[:T]|\s+){_LENIENT_HMS})?\s*Z?\s*',
+    re.ASCII
+)
+"lenient pattern for `TimeFormat.Y_DOY_HMS` (and ISO ordinal) strings"
+LENIENT_DHMS_PATTERN = re.compile(
+    rf'\s*([-+]?)\s*(?:(\d+)/)?{_LENIENT_HMS}\s*', re.ASCII
+)
+"lenient pattern for `TimeFormat.DHMS` strings (the days are optional)"
+
+FLOAT_FMT_SCALES = {
+    TimeFormat.S: 1,
+    TimeFormat.M: 60,
+    TimeFormat.H: 3600,
+    TimeFormat.D: DAY2SEC,
+}
+"seconds per unit of each of the `FLOAT_FMTS`"
+
+
+def _invalid(s: str, fmt: TimeFormat):
+    return ValueError(f'invalid {fmt.name} time string: {s!r}')
+
+
+def _hms_in_range(h: int, m: int, s: float, max_sec: float = 61):
+    return h < 24 and m < 60 and s < max_sec
+
+
+def _match_fields(s: str, fmt: TimeFormat, strict: bool, pattern: re.Pattern,
+                  lenient_pattern: re.Pattern):
+    match = (pattern if strict else lenient_pattern).fullmatch(s)
+    if match is None:
+        if strict:
+            raise _invalid(s, fmt)
+
+        return
+
+    return match.groups()
+
+
+def ymdhms_str_to_sec(s: str, strict: bool = True):
+    "parses a `TimeFormat.YMDHMS` (or ISO) string into J2000 seconds"
+    fields = _match_fields(s, TimeFormat.YMDHMS, strict, YMDHMS_PATTERN,
+                           LENIENT_YMDHMS_PATTERN)
+    if fields is None:
+        return nan
+
+    y, mo, d, h, m, sec = fields
+    y, mo, d, h, m = int(y), int(mo), int(d), int(h or 0), int(m or 0)
+    sec = float(sec or 0)
+    if strict and not (
+        1 <= mo <= 12
+        and 1 <= d <= DAYSINMONTH[mo - 1] + (mo == 2)*is_leap_year(y)
+        and _hms_in_range(h, m, sec)
+    ):
+        raise _invalid(s, TimeFormat.YMDHMS)
+
+    return ymdhms_to_sec(y, mo, d, h, m, sec)
+
+
+def y_doy_hms_str_to_sec(s: str, strict: bool = True):
+    "parses a `TimeFormat.Y_DOY_HMS` string into J2000 seconds"
+    fields = _match_fields(s, TimeFormat.Y_DOY_HMS, strict, Y_DOY_HMS_PATTERN,
+                           LENIENT_Y_DOY_HMS_PATTERN)
+    if fields is None:
+        return nan
+
+    y, doy, h, m, sec = fields
+    y, doy, h, m = int(y), int(doy), int(h or 0), int(m or 0)
+    sec = float(sec or 0)
+    if strict and not (1 <= doy <= 365 + is_leap_year(y)
+                       and _hms_in_range(h, m, sec)):
+        raise _invalid(s, TimeFormat.Y_DOY_HMS)
+
+    # the day of year is the day of January, as far as ymdhms_to_sec cares
+    return ymdhms_to_sec(y, 1, doy, h, m, sec)
+
+
+def dhms_str_to_sec(s: str, strict: bool = True):
+    "parses a `TimeFormat.DHMS` string into seconds"
+    fields = _match_fields(s, TimeFormat.DHMS, strict, DHMS_PATTERN,
+                           LENIENT_DHMS_PATTERN)
+    if fields is None:
+        return nan
+
+    sign, d, h, m, sec = fields
+    d, h, m, sec = int(d or 0), int(h), int(m), float(sec or 0)
+    if strict and not _hms_in_range(h, m, sec, 60):
+        raise _invalid(s, TimeFormat.DHMS)
+
+    return dhms_to_sec(d, h, m, sec, -1 if sign == '-' else 1)
+
+
+def number_str_to_sec(s: str, fmt: TimeFormat = TimeFormat.S,
+                      strict: bool = True):
+    "parses a number of the units of one of the `FLOAT_FMTS` into seconds"
+    try:
+        if strict and not NUMBER_PATTERN.fullmatch(s):
+            raise ValueError
+
+        x = float(s)
+    except ValueError:
+        if strict:
+            raise _invalid(s, fmt) from None
+
+        return nan
+
+    return x*FLOAT_FMT_SCALES[fmt]
+
+
+def fmt_str_to_sec(s: str, fmt: TimeFormat, strict: bool = True):
+    "the inverse of `sec_as_fmt_str()`"
+    if fmt in FLOAT_FMT_SCALES:
+        return number_str_to_sec(s, fmt, strict)
+
+    if fmt is TimeFormat.DHMS:
+        return dhms_str_to_sec(s, strict)
+    elif fmt is TimeFormat.Y_DOY_HMS:
+        return y_doy_hms_str_to_sec(s, strict)
+    elif fmt is TimeFormat.YMDHMS:
+        return ymdhms_str_to_sec(s, strict)
@@ -0,0 +1,288 @@
+"""
+Array versions of the time string parsers in `parse`, for parsing many
+strings at once (e.g. every timestamp in a log or schedule file).
+
+Strings with the same layout as the first one (the same width, with digits
+and separators in the same places, as is usual for machine-written files)
+have their fields read straight from the character codes with whole-array
+arithmetic.  Any others are matched with the same precompiled patterns the
+scalar versions use, and their fields are converted to numbers in one go.
+
+Each function accepts NumPy arrays, pandas `Series` or lists of strings and
+returns a float array, or a `Series` with the same index if given one.  The
+results are the same as the scalar versions give for each element, and the
+strings that they would reject raise the same `ValueError` (if `strict`) or
+give NaN.
+"""
+import re
+from collections.abc import Callable
+
+import numpy as np
+from pandas import Series
+
+from .julian import DAY2SEC
+from .gregorian_array import ymdhms_to_sec_array, is_leap_year_array, _CUMDAYS
+from .fmt import TimeFormat
+from .parse import (
+    YMDHMS_PATTERN, Y_DOY_HMS_PATTERN, DHMS_PATTERN, LENIENT_YMDHMS_PATTERN,
+    LENIENT_Y_DOY_HMS_PATTERN, LENIENT_DHMS_PATTERN, FLOAT_FMT_SCALES,
+    _invalid, number_str_to_sec,
+)
+
+_MAX_SEC_DIGITS = 14
+"most fractional second digits that the fixed-width path can scale exactly"
+_NUMBER_CHARS = np.zeros(128, bool)
+_NUMBER_CHARS[np.frombuffer(b'0123456789+-.eE', np.uint8)] = True
+"""
+the characters of the strings that `parse.NUMBER_PATTERN` matches, which are
+also the strings made of only these characters that `float()` accepts
+"""
+
+
+def _like(template, values: np.ndarray):
+    if isinstance(template, Series):
+        return Series(values, index=template.index, name=template.name)
+
+    return values
+
+
+def _layout_of(s: str):
+    """
+    Returns the layout of `s` for `_fixed_width_fields()`, in which '#' is a
+    digit, '?' is a space or 'T' and anything else stands for itself.
+    """
+    return re.sub(r'[ T]', '?', re.sub(r'\d', '#', s, flags=re.ASCII))
+
+
+def _fixed_width_fields(strings: np.ndarray, layout: str, signed: bool):
+    """
+    Reads the fields of each of `strings` that has exactly the given layout
+    straight from its character codes.  Returns the fields (as for
+    `_parse_array()`) and a mask of the strings that fit the layout, or None
+    if the layout can't be used.
+    """
+    width = len(layout)
+    ndigits = len(layout) - layout.rindex('.') - 1 if '.' in layout else 0
+    if ndigits > _MAX_SEC_DIGITS:
+        return
+
+    strings = strings.astype(str)
+    try:
+        # longer strings are cut off here and shorter ones padded with nulls
+        codes = strings.astype(f'S{width}')
+    except UnicodeEncodeError:
+        return
+
+    codes = codes.view(np.uint8).reshape(-1, width)
+    layout_codes = np.frombuffer(layout.encode(), np.uint8)
+    isdigit = layout_codes == ord('#')
+    either = layout_codes == ord('?')
+    literal = ~(isdigit | either)
+    digits = codes[:, isdigit] - np.uint8(ord('0'))
+    sep = codes[:, either]
+    fits = ((np.char.str_len(strings) == width)
+            & (digits <= 9).all(1)
+            & (codes[:, literal] == layout_codes[literal]).all(1)
+            & ((sep == ord(' ')) | (sep == ord('T'))).all(1))
+
+    fields = []
+    col = 0
+    for run in re.finditer('#+', layout):
+        field = np.zeros(len(codes), np.int64)
+        for _ in range(run.end() - run.start()):
+            field = field*10 + digits[:, col]
+            col += 1
+
+        fields.append(field)
+
+    if ndigits:
+        # both parts are exact, so one division rounds them the same way
+        # that float() does
+        scalar = pow(10, ndigits)
+        sec = fields.pop()
+        fields.append((fields.pop()*scalar + sec)/scalar)
+
+    else:
+        fields.append(fields.pop().astype(np.float64))
+
+    if signed:
+        # the sign is part of the layout
+        fields.insert(0, np.full(len(codes), layout.startswith('-')))
+
+    return fields, fits
+
+
+def _regex_fields(strings: np.ndarray, pattern: re.Pattern, fmt: TimeFormat,
+                  strict: bool, signed: bool):
+    """
+    Matches each of `strings` with `pattern`, returning its fields (as for
+    `_parse_array()`) and a mask of the strings that matched.
+    """
+    matches = [pattern.fullmatch(s) if isinstance(s, str) else None
+               for s in strings.tolist()]
+    matched = np.array([match is not None for match in matches], bool)
+    if strict and not matched.all():
+        raise _invalid(str(strings[np.flatnonzero(~matched)[0]]), fmt)
+
+    # all of the numbers are parsed in one go, with the missing ones as 0
+    first = 1 if signed else 0
+    ngroups = pattern.groups - first
+    unmatched = ' '.join('0'*ngroups)
+    text = ' '.join([' '.join(match.groups('0')[first:]) if match
+                     else unmatched for match in matches])
+    numbers = np.fromstring(text, sep=' ').reshape(len(matches), ngroups)
+    fields = [x.astype(np.int64) for x in numbers[:, :-1].T]
+    fields.append(numbers[:, -1])
+    if signed:
+        fields.insert(0, np.array([match is not None and match[1] == '-'
+                                   for match in matches], bool))
+
+    return fields, matched
+
+
+def _parse_array(strings, fmt: TimeFormat, strict: bool,
+                 pattern: re.Pattern, lenient_pattern: re.Pattern,
+                 convert: Callable, check: Callable, signed: bool = False):
+    """
+    Parses each of `strings` into its fields (int64 arrays, except that the
+    last one, the seconds, is float64), then range checks them with
+    `check(*fields)` if `strict` and returns `convert(*fields)`.  If `signed`,
+    the first group of the patterns is an optional sign, which is passed on
+    as a boolean array (True if negative) before the other fields.
+
+    The strings that have the same layout as the first one are read by
+    `_fixed_width_fields()` and the rest are matched with the pattern.
+    """
+    values = np.asarray(strings.to_numpy() if isinstance(strings, Series)
+                        else strings)
+    flat = values.ravel()
+    fixed = None
+    if flat.size and isinstance(flat[0], str) and pattern.fullmatch(flat[0]):
+        fixed = _fixed_width_fields(flat, _layout_of(flat[0]), signed)
+
+    if fixed is None:
+        fields, matched = _regex_fields(
+            flat, pattern if strict else lenient_pattern, fmt, strict, signed
+        )
+
+    else:
+        fields, matched = fixed
+        rest = np.flatnonzero(~matched)
+        if rest.size:
+            rest_fields, matched[rest] = _regex_fields(
+                flat[rest], pattern if strict else lenient_pattern, fmt,
+                strict, signed
+            )
+            for field, rest_field in zip(fields, rest_fields):
+                field[rest] = rest_field
+
+    if strict:
+        ok = check(*fields)
+        if not ok.all():
+            raise _invalid(str(flat[np.flatnonzero(~ok)[0]]), fmt)
+
+    out = np.asarray(convert(*fields), np.float64)
+    if not matched.all():
+        out[~matched] = np.nan
+
+    return _like(strings, out.reshape(values.shape))
+
+
+def _hms_in_range(h: np.ndarray, m: np.ndarray, s: np.ndarray,
+                  max_sec: float = 61):
+    return (h < 24) & (m < 60) & (s < max_sec)
+
+
+def _check_ymdhms(y, mo, d, h, m, s):
+    isleap = is_leap_year_array(y).astype(np.int64)
+    valid_month = (mo >= 1) & (mo <= 12)
+    month = np.where(valid_month, mo, 1)
+    days_in_month = _CUMDAYS[isleap, month] - _CUMDAYS[isleap, month - 1]
+    return (valid_month & (d >= 1) & (d <= days_in_month)
+            & _hms_in_range(h, m, s))
+
+
+def _check_y_doy_hms(y, doy, h, m, s):
+    isleap = is_leap_year_array(y).astype(np.int64)
+    return (doy >= 1) & (doy <= 365 + isleap) & _hms_in_range(h, m, s)
+
+
+def _check_dhms(negative, d, h, m, s):
+    return _hms_in_range(h, m, s, 60)
+
+
+def _y_doy_hms_to_sec(y, doy, h, m, s):
+    # the day of year is the day of January, as far as ymdhms_to_sec cares
+    return ymdhms_to_sec_array(y, 1, doy, h, m, s)
+
+
+def _dhms_to_sec(negative, d, h, m, s):
+    # the same steps as dhms_to_sec
+    x = s + 60*m + 3600*h + DAY2SEC*d
+    return np.where(negative, -x, x)
+
+
+def ymdhms_str_to_sec_array(strings, strict: bool = True):
+    "same as `ymdhms_str_to_sec` for every element of `strings`"
+    return _parse_array(strings, TimeFormat.YMDHMS, strict, YMDHMS_PATTERN,
+                        LENIENT_YMDHMS_PATTERN, ymdhms_to_sec_array,
+                        _check_ymdhms)
+
+
+def y_doy_hms_str_to_sec_array(strings, strict: bool = True):
+    "same as `y_doy_hms_str_to_sec` for every element of `strings`"
+    return _parse_array(strings, TimeFormat.Y_DOY_HMS, strict,
+                        Y_DOY_HMS_PATTERN, LENIENT_Y_DOY_HMS_PATTERN,
+                        _y_doy_hms_to_sec, _check_y_doy_hms)
+
+
+def dhms_str_to_sec_array(strings, strict: bool = True):
+    """
+    Same as `dhms_str_to_sec` for every element of `strings`.  Since the sign
+    changes the width, the fixed-width path is only taken if the strings are
+    all negative or all positive.
+    """
+    return _parse_array(strings, TimeFormat.DHMS, strict, DHMS_PATTERN,
+                        LENIENT_DHMS_PATTERN, _dhms_to_sec, _check_dhms,
+                        True)
+
+
+def _all_number_literals(values: np.ndarray):
+    "whether every string is made of only the `_NUMBER_CHARS`"
+    strings = values.astype(str).ravel()
+    # shorter strings are padded with nulls
+    codes = strings.view(np.uint32).reshape(strings.size, -1)
+    return bool(((codes < 128) & (_NUMBER_CHARS[codes & 127]
+                                  | (codes == 0))).all())
+
+
+def number_str_to_sec_array(strings, fmt: TimeFormat = TimeFormat.S,
+                            strict: bool = True):
+    "same as `number_str_to_sec` for every element of `strings`"
+    values = np.asarray(strings.to_numpy() if isinstance(strings, Series)
+                        else strings)
+    try:
+        x = values.astype(np.float64)*FLOAT_FMT_SCALES[fmt]
+        if strict and not _all_number_literals(values):
+            raise ValueError
+
+    except (ValueError, TypeError):
+        # one at a time, for the NaNs or the error
+        x = np.array([number_str_to_sec(s, fmt, strict)
+                      for s in values.ravel().tolist()],
+                     np.float64).reshape(values.shape)
+
+    return _like(strings, x)
+
+
+def fmt_str_to_sec_array(strings, fmt: TimeFormat, strict: bool = True):
+    "same as `fmt_str_to_sec` for every element of `strings`"
+    if fmt in FLOAT_FMT_SCALES:
+        return number_str_to_sec_array(strings, fmt, strict)
+
+    if fmt is TimeFormat.DHMS:
+        return dhms_str_to_sec_array(strings, strict)
+    elif fmt is TimeFormat.Y_DOY_HMS:
+        return y_doy_hms_str_to_sec_array(strings, strict)
+    elif fmt is TimeFormat.YMDHMS:
+        return ymdhms_str_to_sec_array(strings, strict)
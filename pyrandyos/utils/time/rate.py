@@ -1,9 +1,11 @@
 from enum import Enum, auto
+from functools import lru_cache, partial
 
 from .base_convert import (
     eastern_to_utc, central_to_utc, mountain_to_utc, pacific_to_utc,
     utc_to_eastern, utc_to_central, utc_to_mountain, utc_to_pacific,
-    tai_to_tt, tt_to_et, tai_to_utc, utc_to_unix
+    tai_to_tt, tt_to_et, tai_to_utc, utc_to_unix,
+    tt_to_tai, et_to_tt, utc_to_tai, unix_to_utc, ET_TO_TT_ITERATIONS,
 )
 
 
@@ -48,23 +50,98 @@ US_DST = {
 }
 
 
-def tai_to_rate(tai: float, rate: BaseClockRate):
-    epoch = tai
-    if rate is BaseClockRate.TAI:
-        return epoch
+RATE_PARENTS = {
+    BaseClockRate.TT: (BaseClockRate.TAI, tai_to_tt, tt_to_tai),
+    BaseClockRate.T_EPH: (BaseClockRate.TT, tt_to_et, et_to_tt),
+    BaseClockRate.UTC: (BaseClockRate.TAI, tai_to_utc, utc_to_tai),
+    BaseClockRate.UNIX: (BaseClockRate.UTC, utc_to_unix, unix_to_utc),
+}
+RATE_PARENTS.update({rate: (BaseClockRate.UTC, from_utc, to_utc)
+                     for rate, (to_utc, from_utc) in US_DST.items()})
+"""
+The rate each rate is defined from, with the conversions from and to that
+parent rate.  TAI is the only rate without a parent.
+"""
+
+
+def _path_to_tai(rate: BaseClockRate):
+    path = [rate]
+    while path[-1] in RATE_PARENTS:
+        path.append(RATE_PARENTS[path[-1]][0])
+
+    return path
+
 
-    if rate in (BaseClockRate.T_EPH, BaseClockRate.TT):
-        epoch = tai_to_tt(epoch)
-        if rate is BaseClockRate.TT:
-            return epoch
-        return tt_to_et(epoch)
+def plan_rate_conversion(from_rate: BaseClockRate, to_rate: BaseClockRate):
+    """
+    Returns the conversions that take epochs from `from_rate` to `to_rate`,
+    going up from `from_rate` only as far as the nearest rate that both are
+    defined from (see `RATE_PARENTS`) and then back down to `to_rate`.  So
+    UTC to UNIX never goes through TAI, and no path looks up the leap seconds
+    more than once.
+    """
+    up = _path_to_tai(from_rate)
+    down = _path_to_tai(to_rate)
+    while len(up) > 1 and len(down) > 1 and up[-2] is down[-2]:
+        up.pop()
+        down.pop()
+
+    return (tuple(RATE_PARENTS[rate][2] for rate in up[:-1])
+            + tuple(RATE_PARENTS[rate][1] for rate in reversed(down[:-1])))
 
-    epoch = tai_to_utc(epoch)
-    if rate is BaseClockRate.UTC:
-        return epoch
 
-    if rate is BaseClockRate.UNIX:
-        return utc_to_unix(epoch)
+class RateConverter:
+    """
+    Converts epochs from one `BaseClockRate` to another by the conversions
+    from `plan_rate_conversion()`.  Floats are passed through the scalar
+    conversions in turn.  NumPy arrays and pandas `Series` go through a fused
+    version of the whole plan (see `rate_array`), which is only compiled the
+    first time it is needed so that scalar conversions never import NumPy.
+    """
+    def __init__(self, from_rate: BaseClockRate, to_rate: BaseClockRate,
+                 et_iterations: int = ET_TO_TT_ITERATIONS):
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.et_iterations = et_iterations
+        "iterations used to solve for TT in `et_to_tt`"
+        self.steps = plan_rate_conversion(from_rate, to_rate)
+        self._scalar_steps = tuple(
+            partial(et_to_tt, iterations=et_iterations) if step is et_to_tt
+            else step for step in self.steps
+        )
+        self._array_func = None
+
+    def __call__(self, t):
+        if type(t) in (float, int):
+            for step in self._scalar_steps:
+                t = step(t)
 
-    if rate in US_DST:
-        return US_DST[rate][1](epoch)
+            return t
+
+        func = self._array_func
+        if func is None:
+            from .rate_array import compile_rate_steps
+            func = self._array_func = compile_rate_steps(self.steps,
+                                                         self.et_iterations)
+
+        return func(t)
+
+
+@lru_cache(maxsize=None)
+def get_rate_converter(from_rate: BaseClockRate, to_rate: BaseClockRate,
+                       et_iterations: int = ET_TO_TT_ITERATIONS):
+    "returns the `RateConverter` between two rates, made once and then cached"
+    return RateConverter(from_rate, to_rate, et_iterations)
+
+
+def convert_rate(t: float, from_rate: BaseClockRate, to_rate: BaseClockRate,
+                 et_iterations: int = ET_TO_TT_ITERATIONS):
+    """
+    Converts the epoch(s) `t` (a float, NumPy array or pandas `Series`) from
+    `from_rate` to `to_rate`.
+    """
+    return get_rate_converter(from_rate, to_rate, et_iterations)(t)
+
+
+def tai_to_rate(tai: float, rate: BaseClockRate):
+    return get_rate_converter(BaseClockRate.TAI, rate)(tai)
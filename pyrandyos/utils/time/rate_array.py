@@ -0,0 +1,135 @@
+"""
+Fused array versions of the conversion plans made by
+`rate.plan_rate_conversion()`.  `compile_rate_steps()` turns a plan into one
+function that copies its input once and then does every step in place on
+that copy, one block of `RATE_BLOCK_SIZE` epochs at a time so that each block
+stays in cache for the whole plan.  No plan has more than one step that looks
+up the leap seconds, and the ET - TT series (`emb_kepler`) is evaluated into
+scratch blocks that are reused throughout rather than making new arrays for
+each operation.
+
+The US time zone conversions have no array versions, so those steps are done
+one element at a time with the scalar conversions.
+"""
+from collections.abc import Callable
+from functools import partial
+
+import numpy as np
+from pandas import Series
+
+from .leaps import get_leaps_at_tai, get_leaps_at_utc
+from .base_convert import (
+    MOYER_K, EMB_E, EMB_M0, EMB_N, TT_MINUS_TAI_SEC, UNIX_UTC_SEC,
+    tai_to_tt, tt_to_tai, tt_to_et, et_to_tt, tai_to_utc, utc_to_tai,
+    utc_to_unix, unix_to_utc, ET_TO_TT_ITERATIONS,
+)
+
+RATE_BLOCK_SIZE = 65536
+"number of epochs that each step of a plan is applied to at a time"
+
+
+def _emb_kepler(tt: np.ndarray, m: np.ndarray, out: np.ndarray):
+    "same as `emb_kepler`, using `m` as scratch and writing into `out`"
+    np.multiply(tt, EMB_N, out=m)
+    m += EMB_M0
+    np.sin(m, out=out)
+    out *= EMB_E
+    out += m
+    np.sin(out, out=out)
+    out *= MOYER_K
+    return out
+
+
+def _tai_to_tt(x: np.ndarray, scratch: list[np.ndarray]):
+    x += TT_MINUS_TAI_SEC
+
+
+def _tt_to_tai(x: np.ndarray, scratch: list[np.ndarray]):
+    x -= TT_MINUS_TAI_SEC
+
+
+def _tt_to_et(x: np.ndarray, scratch: list[np.ndarray]):
+    x += _emb_kepler(x, *scratch[:2])
+
+
+def _et_to_tt(x: np.ndarray, scratch: list[np.ndarray],
+              iterations: int = ET_TO_TT_ITERATIONS):
+    et, m, kepler = scratch[:3]
+    et[...] = x
+    for i in range(iterations):
+        np.subtract(et, _emb_kepler(x, m, kepler), out=x)
+
+
+def _tai_to_utc(x: np.ndarray, scratch: list[np.ndarray]):
+    x -= get_leaps_at_tai(x)
+
+
+def _utc_to_tai(x: np.ndarray, scratch: list[np.ndarray]):
+    x += get_leaps_at_utc(x)
+
+
+def _utc_to_unix(x: np.ndarray, scratch: list[np.ndarray]):
+    x -= UNIX_UTC_SEC
+
+
+def _unix_to_utc(x: np.ndarray, scratch: list[np.ndarray]):
+    x += UNIX_UTC_SEC
+
+
+ARRAY_RATE_STEPS = {
+    tai_to_tt: _tai_to_tt,
+    tt_to_tai: _tt_to_tai,
+    tt_to_et: _tt_to_et,
+    et_to_tt: _et_to_tt,
+    tai_to_utc: _tai_to_utc,
+    utc_to_tai: _utc_to_tai,
+    utc_to_unix: _utc_to_unix,
+    unix_to_utc: _unix_to_utc,
+}
+"""
+In-place versions of the scalar conversions used in `rate.RATE_PARENTS`.
+Each takes the array to convert and a list of scratch arrays like it, at
+least as many as `SCRATCH_NEEDED` gives for the scalar conversion.
+"""
+SCRATCH_NEEDED = {tt_to_et: 2, et_to_tt: 3}
+"number of scratch arrays needed by each of `ARRAY_RATE_STEPS` that needs any"
+
+
+def _elementwise(func: Callable):
+    def step(x: np.ndarray, scratch: list[np.ndarray]):
+        flat = x.reshape(-1)
+        flat[:] = [func(v) for v in flat.tolist()]
+
+    return step
+
+
+def compile_rate_steps(steps: tuple[Callable, ...],
+                       et_iterations: int = ET_TO_TT_ITERATIONS):
+    """
+    Returns a function that applies the scalar conversions `steps` (as made
+    by `rate.plan_rate_conversion()`) to a whole NumPy array or pandas
+    `Series` at once, returning a new float array (or `Series`).
+    """
+    funcs = [partial(_et_to_tt, iterations=et_iterations) if step is et_to_tt
+             else ARRAY_RATE_STEPS.get(step) or _elementwise(step)
+             for step in steps]
+    nscratch = max((SCRATCH_NEEDED.get(step, 0) for step in steps),
+                   default=0)
+
+    def convert(t):
+        x = np.array(t, np.float64)
+        flat = x.reshape(-1)
+        buffers = [np.empty(min(flat.size, RATE_BLOCK_SIZE))
+                   for i in range(nscratch)]
+        for start in range(0, flat.size, RATE_BLOCK_SIZE):
+            block = flat[start:start + RATE_BLOCK_SIZE]
+            scratch = [buffer[:block.size] for buffer in buffers]
+            for func in funcs:
+                func(block, scratch)
+
+        if isinstance(t, Series):
+            return Series(x, index=t.index, name=t.name)
+
+        return x[()] if not x.ndim else x
+
+    return convert
@@ -0,0 +1,236 @@
+"""
+Array versions of the time string formatting in `string`, for formatting many
+epochs at once.  The fields of every epoch are split out with whole-array
+arithmetic, the small fields are taken from tables of zero-padded strings,
+and the date part of each string is only formatted once per distinct day (or
+per day count, for `sec_to_dhms_str_array()`).
+
+Each function accepts NumPy arrays or pandas `Series` and returns a NumPy
+string array, or a `Series` of strings with the same index if given one.  The
+strings are the same as the scalar versions would make for each element.
+Any `sec_digits` other than None or a non-negative int, and any input that
+can't be represented exactly (non-finite or beyond 2**53 in the smallest
+unit), are handed to the scalar versions instead.
+"""
+from functools import lru_cache
+from collections.abc import Callable
+
+import numpy as np
+from pandas import Series
+
+from .string import (
+    format_number, sec_to_dhms_str, sec_to_ymdhms_str, sec_to_y_doy_hms_str,
+)
+from .fmt import TimeFormat, FLOAT_FMTS, sec_as_fmt
+from .julian import DAY2SEC
+from .gregorian_array import _split_formal, _days_to_year_doy, doy2md_array
+
+_MAX_EXACT = 2.0**53
+"largest magnitude at which every whole number is exactly representable"
+ZEROPAD_TABLE_MAX_DIGITS = 4
+"widest field that `_zeropad()` formats by table lookup rather than zfill"
+
+
+@lru_cache(maxsize=None)
+def get_zeropad_table(width: int):
+    "returns the zero-padded strings of 0 through 10**`width` - 1"
+    return np.array([f'{i:0{width}d}' for i in range(10**width)])
+
+
+def _zeropad(x: np.ndarray, width: int):
+    if (width <= ZEROPAD_TABLE_MAX_DIGITS and x.size
+            and x.min() >= 0 and x.max() < 10**width):
+        return get_zeropad_table(width)[x]
+
+    return np.char.zfill(x.astype(str), width)
+
+
+def _join(*parts):
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+
+    return out
+
+
+def _like(template, strings: np.ndarray):
+    if isinstance(template, Series):
+        return Series(strings, index=template.index, name=template.name,
+                      dtype=object)
+
+    return strings
+
+
+def _is_exact(x: np.ndarray, scalar: float):
+    "True if `x` scaled by `scalar` is finite and exactly representable"
+    return bool(np.isfinite(x).all()) and (
+        not x.size or float(np.abs(x).max())*scalar < _MAX_EXACT
+    )
+
+
+def _scalar_fallback(sec, func: Callable, *args):
+    values = np.asarray(sec, np.float64)
+    strings = np.array([func(x, *args) for x in values.ravel().tolist()],
+                       dtype=str)
+    return _like(sec, strings.reshape(values.shape))
+
+
+def _cached_prefixes(keys: np.ndarray, render: Callable):
+    """
+    Returns `render(unique_keys)` (a list of strings, one for each of the
+    sorted unique values of `keys`) gathered back onto `keys`.
+    """
+    if not keys.size:
+        return np.array(render(keys), dtype=str)
+
+    lo = int(keys.min())
+    span = int(keys.max()) - lo + 1
+    if span <= keys.size:
+        # a dense range of keys (e.g. consecutive days) needs no sorting
+        present = np.zeros(span, bool)
+        present[keys - lo] = True
+        unique = np.flatnonzero(present)
+        lookup = np.zeros(span, np.intp)
+        lookup[unique] = np.arange(unique.size)
+        inverse = lookup[keys - lo]
+        unique += lo
+
+    else:
+        unique, inverse = np.unique(keys, return_inverse=True)
+
+    return np.array(render(unique), dtype=str)[inverse.reshape(keys.shape)]
+
+
+def _hms_str(h: np.ndarray, m: np.ndarray, stmp: np.ndarray,
+             sec_digits: int):
+    # the seconds are whole numbers in units of the last digit, so they can
+    # be split into exact digits instead of formatting a float
+    scalar = pow(10, sec_digits)
+    stmp = stmp.astype(np.int64)
+    parts = [_zeropad(h, 2), ':', _zeropad(m, 2), ':',
+             _zeropad(stmp//scalar, 2)]
+    if sec_digits:
+        parts.extend(('.', _zeropad(stmp % scalar, sec_digits)))
+
+    return _join(*parts)
+
+
+def _sec_to_date_hms_str(sec, sec_digits: int, render: Callable):
+    values = np.asarray(sec, np.float64)
+    days, h, m, stmp = _split_formal(values, sec_digits)
+
+    def render_days(unique_days: np.ndarray):
+        return render(*_days_to_year_doy(unique_days))
+
+    return _like(sec, np.char.add(_cached_prefixes(days, render_days),
+                                  _hms_str(h, m, stmp, sec_digits)))
+
+
+def _render_ymd(year: np.ndarray, doy: np.ndarray):
+    month, day = doy2md_array(year, doy)
+    return [f'{y:04d}-{mo:02d}-{d:02d} ' for y, mo, d
+            in zip(year.tolist(), month.tolist(), day.tolist())]
+
+
+def _render_y_doy(year: np.ndarray, doy: np.ndarray):
+    return [f'{y:04d}:{d:03d}:' for y, d in zip(year.tolist(), doy.tolist())]
+
+
+def _can_split_seconds(sec, sec_digits: int | None):
+    """
+    True if the seconds of `sec` can be split into exact digits, which is
+    only done if they were rounded to `sec_digits` to begin with (with None,
+    the scalar versions only round the seconds when formatting them).
+    """
+    if not (isinstance(sec_digits, int) and sec_digits >= 0):
+        return False
+
+    return _is_exact(np.asarray(sec, np.float64), pow(10, sec_digits))
+
+
+def sec_to_ymdhms_str_array(sec, sec_digits: int = 0):
+    "same as `sec_to_ymdhms_str` for every element of `sec`"
+    if not _can_split_seconds(sec, sec_digits):
+        return _scalar_fallback(sec, sec_to_ymdhms_str, sec_digits)
+
+    return _sec_to_date_hms_str(sec, sec_digits, _render_ymd)
+
+
+def sec_to_y_doy_hms_str_array(sec, sec_digits: int = 0):
+    "same as `sec_to_y_doy_hms_str` for every element of `sec`"
+    if not _can_split_seconds(sec, sec_digits):
+        return _scalar_fallback(sec, sec_to_y_doy_hms_str, sec_digits)
+
+    return _sec_to_date_hms_str(sec, sec_digits, _render_y_doy)
+
+
+def sec_to_dhms_str_array(sec, sec_digits: int = 3):
+    "same as `sec_to_dhms_str` for every element of `sec`"
+    if not _can_split_seconds(sec, sec_digits):
+        return _scalar_fallback(sec, sec_to_dhms_str, sec_digits)
+
+    # the same steps as sec_to_dhms, on whole arrays
+    values = np.asarray(sec, np.float64)
+    negative = values < 0
+    x = np.where(negative, -values, values)
+    scalar = pow(10, sec_digits)
+    d, tmp = np.divmod(np.rint(x*scalar), DAY2SEC*scalar)
+    h, tmp = np.divmod(tmp, 3600*scalar)
+    m, stmp = np.divmod(tmp, 60*scalar)
+
+    # negative day counts are -(d + 1) so they can share the prefix cache
+    d = d.astype(np.int64)
+    keys = np.where(negative, -d - 1, d)
+
+    def render(unique_keys: np.ndarray):
+        return [f'-{-k - 1:02d}/' if k < 0 else f'{k:02d}/'
+                for k in unique_keys.tolist()]
+
+    return _like(sec, np.char.add(
+        _cached_prefixes(keys, render),
+        _hms_str(h.astype(np.int64), m.astype(np.int64), stmp, sec_digits)
+    ))
+
+
+def format_number_array(x, digits: int = None, zeropad: int = 0):
+    "same as `format_number` for every element of `x`"
+    values = np.asarray(x, np.float64)
+    if digits is None:
+        strings = np.array([str(v) for v in values.ravel().tolist()],
+                           dtype=str)
+        return _like(x, strings.reshape(values.shape))
+
+    if digits < 0 or not _is_exact(values, pow(10, digits)):
+        return _scalar_fallback(x, format_number, digits, zeropad)
+
+    # rounded to whole numbers of the last digit, then split into exact
+    # digits instead of formatting a float
+    scalar = pow(10, digits)
+    q = np.rint(values*scalar).astype(np.int64)
+    negative = q < 0
+    ipart, fpart = np.divmod(np.abs(q), scalar)
+    intstr = ipart.astype(str)
+    intstr = np.where(negative, np.char.add('-', intstr), intstr)
+    if zeropad:
+        # like str.zfill, the sign counts toward the width
+        intstr = np.char.zfill(intstr, zeropad)
+
+    if digits:
+        intstr = _join(intstr, '.', _zeropad(fpart, digits))
+
+    return _like(x, intstr)
+
+
+def sec_as_fmt_str_array(t, fmt: TimeFormat, digits: int = 0,
+                         zeropad: int = 0):
+    "same as `sec_as_fmt_str` for every element of `t`"
+    if fmt in FLOAT_FMTS:
+        return format_number_array(sec_as_fmt(t, fmt, digits), digits,
+                                   zeropad)
+
+    if fmt is TimeFormat.DHMS:
+        return sec_to_dhms_str_array(t, digits)
+    elif fmt is TimeFormat.Y_DOY_HMS:
+        return sec_to_y_doy_hms_str_array(t, digits)
+    elif fmt is TimeFormat.YMDHMS:
+        return sec_to_ymdhms_str_array(t, digits)
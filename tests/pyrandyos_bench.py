@@ -0,0 +1,516 @@
+import sys
+from os import environ
+from pathlib import Path
+from time import perf_counter
+from subprocess import run
+from tempfile import TemporaryDirectory
+from collections.abc import Callable
+
+HERE = Path(__file__).expanduser().resolve().parent
+REPOROOT = HERE.parent
+if __name__ == '__main__':
+    sys.path.append(str(REPOROOT))
+
+    # so we can get testing constants without importing pyrandyos
+    sys.path.insert(0, str(REPOROOT/'pyrandyos/_testing'))
+
+from _pyrandyos_testing import (  # noqa: E402
+    ENV_PYRANDYOS_UNITTEST_ACTIVE,
+)
+
+environ[ENV_PYRANDYOS_UNITTEST_ACTIVE] = '1'
+BENCHMARKS: dict[str, Callable] = dict()
+
+
+def benchmark(func: Callable):
+    BENCHMARKS[func.__name__.removeprefix('bench_')] = func
+    return func
+
+
+def report(name: str, count: int, elapsed: float, unit: str = 'calls'):
+    print(f'{name:<40} {count/elapsed:>14,.0f} {unit}/s '
+          f'({1e6*elapsed/count:.3f} us each)')
+
+
+def run_timed(name: str, func: Callable, count: int, unit: str = 'calls'):
+    start = perf_counter()
+    for _ in range(count):
+        func()
+    report(name, count, perf_counter() - start, unit)
+
+
+def at_stack_depth(depth: int, func: Callable):
+    if depth:
+        return at_stack_depth(depth - 1, func)
+    return func()
+
+
+@benchmark
+def bench_make_log_record(count: int = 20000):
+    from pyrandyos.logging import make_log_record, DEBUG
+
+    def make():
+        make_log_record(DEBUG, 'benchmark message')
+
+    for depth in (0, 50, 200):
+        at_stack_depth(depth, lambda: run_timed(
+            f'make_log_record (depth {depth})', make, count, 'records'
+        ))
+
+
+@benchmark
+def bench_gated_log_message(count: int = 200000):
+    from pyrandyos.logging import log_debuglow2, get_log_level_gate
+
+    print(f'(level gate is {get_log_level_gate()})')
+    run_timed('log_debuglow2 below level gate',
+              lambda: log_debuglow2('benchmark message'), count)
+
+
+@benchmark
+def bench_logger_lookup(count: int = 200000):
+    from logging import NullHandler, getLogger, DEBUG
+    from pyrandyos.logging import (
+        get_logger, get_bound_logger, log_debug,
+    )
+
+    run_timed('get_logger from call site', get_logger, count)
+    log = get_bound_logger(__name__)
+    handler = NullHandler(DEBUG)
+    getLogger().addHandler(handler)
+    try:
+        run_timed('log_debug (handled)', lambda: log_debug('message'),
+                  count//10)
+        run_timed('BoundLogger.debug (handled)', lambda: log.debug('message'),
+                  count//10)
+    finally:
+        getLogger().removeHandler(handler)
+
+
+def raise_chained(depth: int, chain: int):
+    if depth:
+        return raise_chained(depth - 1, chain)
+
+    try:
+        if chain > 1:
+            raise_chained(20, chain - 1)
+    except Exception as e:
+        raise ValueError(f'chained failure ü {chain}') from e
+
+    raise ValueError('innermost failure ü')
+
+
+@benchmark
+def bench_format_exc(count: int = 200):
+    from pyrandyos.utils.stack import format_exc
+
+    for depth, chain in ((10, 1), (50, 5), (200, 10)):
+        try:
+            raise_chained(depth, chain)
+        except ValueError as e:
+            exc = e
+
+        run_timed(f'format_exc (depth {depth}, chain {chain})',
+                  lambda: format_exc(exc), count, 'tracebacks')
+
+
+def passthrough_arg_handler(handler_args: tuple, handler_kwargs: dict,
+                            func: Callable, *func_args, **func_kwargs):
+    return func_args, func_kwargs
+
+
+def positional_only(a, b, /, c=3):
+    pass
+
+
+def keyword_only(*, a, b=2, c=3):
+    pass
+
+
+def var_args(*args, **kwargs):
+    pass
+
+
+def mixed(a, b=2, *args, c, d=4, **kwargs):
+    pass
+
+
+@benchmark
+def bench_signature_wrapper(count: int = 200000):
+    from pyrandyos.utils.signature_wrapper import (
+        generate_signature_aware_wrapper,
+    )
+
+    calls = (
+        (positional_only, (1, 2), {}),
+        (keyword_only, (), {'a': 1}),
+        (var_args, (1, 2), {'x': 3}),
+        (mixed, (1, 2, 5), {'c': 3, 'z': 6}),
+    )
+    for func, args, kwargs in calls:
+        wrapper = generate_signature_aware_wrapper(func,
+                                                   passthrough_arg_handler)
+        run_timed(f'wrapped {func.__name__}',
+                  lambda: wrapper(*args, **kwargs), count)
+
+
+@benchmark
+def bench_qt_callback(count: int = 100000):
+    try:
+        from pyrandyos.gui.callback import qt_callback
+    except ImportError as e:
+        print(f'qt_callback skipped: {e}')
+        return
+
+    def slot(value: int):
+        pass
+
+    # this is the rate at which a connected signal can be delivered to a slot
+    callback = qt_callback(slot)
+    run_timed('qt_callback dispatch', lambda: callback(1), count, 'signals')
+
+
+@benchmark
+def bench_casesafe_lookup(count: int = 100000):
+    from pyrandyos.utils.casesafe import (
+        casesafe_dict_get, make_case_insensitive,
+    )
+
+    data = {f'Key{i}': i for i in range(500)}
+    config = make_case_insensitive(data, True)
+    run_timed('casesafe_dict_get (plain dict, 500 keys)',
+              lambda: casesafe_dict_get(data, 'KEY250', None, True),
+              count//100)
+    run_timed('casesafe_dict_get (CaseInsensitiveDict)',
+              lambda: casesafe_dict_get(config, 'KEY250', None, True), count)
+
+
+@benchmark
+def bench_config_dict_get(count: int = 200000):
+    from pyrandyos.utils.cfgdict import config_dict_get, ConfigPathIndex
+
+    config = {'local': {'theme': 'dark'},
+              'app': {'gui': {'font': {'size': 9}}}}
+    index = ConfigPathIndex(config, False)
+    for key in ('local.theme', 'app.gui.font.size'):
+        run_timed(f'config_dict_get {key}',
+                  lambda: config_dict_get(config, key, None, False), count)
+        run_timed(f'ConfigPathIndex.get {key}',
+                  lambda: index.get(key, None), count)
+
+
+def build_chained_config(size: int):
+    # every key builds on the one before it and the shared base key, so
+    # expanding each key independently repeats the whole chain
+    config = {'key0': '/base'}
+    for i in range(1, size):
+        config[f'key{i}'] = f'${{key{i - 1}}}/dir{i}:$key0'
+    return config
+
+
+@benchmark
+def bench_config_expansion(count: int = 20):
+    from pyrandyos.config.expandutils import ConfigExpander
+
+    for size in (50, 200, 1000):
+        run_timed(f'ConfigExpander.expand_all ({size} keys)',
+                  lambda: ConfigExpander(build_chained_config(size)
+                                         ).expand_all(), count, 'configs')
+
+
+@benchmark
+def bench_expandvars(count: int = 50000):
+    from pyrandyos.utils.expandvars import expandvars
+    from pyrandyos.utils.paths import get_expanded_pathobj
+
+    config = {'base_path': '/opt/app', 'sub': {'dir': 'data'}}
+    path = '$base_path/${sub.dir}/$HOME/logs/$not_a_var/file.txt'
+    run_timed('expandvars (4 variables)',
+              lambda: expandvars(path, config, False), count)
+    run_timed('get_expanded_pathobj (4 variables)',
+              lambda: get_expanded_pathobj(path, config, False), count//10)
+
+
+@benchmark
+def bench_path_cache(count: int = 50000):
+    from pyrandyos.utils.paths import (
+        get_expanded_pathobj, invalidate_path_cache,
+    )
+
+    config = {'base_path': str(REPOROOT), 'sub': 'pyrandyos/utils'}
+    path = '$base_path/${sub}/paths.py'
+
+    def uncached():
+        invalidate_path_cache()
+        get_expanded_pathobj(path, config, False)
+
+    run_timed('get_expanded_pathobj (uncached)', uncached, count//10)
+    run_timed('get_expanded_pathobj (cached)',
+              lambda: get_expanded_pathobj(path, config, False), count)
+
+
+@benchmark
+def bench_config_layers(count: int = 50):
+    from copy import deepcopy
+    from pathlib import PurePosixPath
+    from pyrandyos.utils.cfglayers import ConfigLayers
+
+    defaults = {f'section{i}': {f'key{j}': PurePosixPath(f'/opt/{i}/{j}')
+                                for j in range(50)} for i in range(100)}
+    layers = ConfigLayers([('defaults', defaults)], False)
+    run_timed('deepcopy (5000 keys)', lambda: deepcopy(defaults), count,
+              'configs')
+    run_timed('ConfigLayers.merged (5000 keys)', layers.merged, count,
+              'configs')
+
+    before = layers.snapshot()
+    layers.set('defaults', 'section50.key25', 'changed')
+    run_timed('ConfigLayers.snapshot + diff (1 change)',
+              lambda: layers.snapshot().diff(before, 'defaults'), count*100)
+
+
+@benchmark
+def bench_config_snapshot(count: int = 200000):
+    from pyrandyos.utils.cfgsnapshot import ConfigSnapshot
+
+    config = {f'section{i}': {f'key{j}': j for j in range(50)}
+              for i in range(100)}
+    snapshot = ConfigSnapshot(config, 0, False)
+    run_timed('ConfigSnapshot.get section50.key25',
+              lambda: snapshot.get('section50.key25'), count)
+    run_timed('ConfigSnapshot.set (5000 keys)',
+              lambda: snapshot.set('section50.key25', 0), count//100,
+              'versions')
+    run_timed('ConfigSnapshot (freeze 5000 keys)',
+              lambda: ConfigSnapshot(config, 0, False), count//10000,
+              'versions')
+
+
+@benchmark
+def bench_config_reexpand(count: int = 200):
+    from pyrandyos.config.expandutils import (
+        ConfigExpander, ConfigDependencyGraph,
+    )
+
+    size = 1000
+    source = build_chained_config(size)
+    config = dict(source)
+    expander = ConfigExpander(config)
+    expander.expand_all()
+    graph = ConfigDependencyGraph()
+    graph.add(expander)
+    run_timed(f'ConfigExpander.expand_all ({size} keys)',
+              lambda: ConfigExpander(dict(source)).expand_all(), count//20,
+              'configs')
+    last = f'key{size - 1}'
+    run_timed(f'ConfigDependencyGraph.reexpand ({last})',
+              lambda: graph.reexpand(config, [last]), count)
+
+
+@benchmark
+def bench_shared_config(count: int = 200):
+    from pathlib import PurePosixPath
+    from pyrandyos.config.shared import SharedConfig
+
+    config = {f'section{i}': {f'key{j}': PurePosixPath(f'/opt/{i}/{j}')
+                              for j in range(50)} for i in range(100)}
+    with SharedConfig({'config': config}) as shared:
+        run_timed(f'SharedConfig.load ({shared.size/1e3:.0f} kB)',
+                  lambda: SharedConfig.load(shared.path), count, 'attaches')
+
+
+def build_jsonc(size: int):
+    # a commented config with a trailing comma at the end of every object
+    lines = ['{']
+    for i in range(size):
+        lines.append(f'  // settings for item {i}')
+        lines.append(f'  "item{i}": {{"path": "/opt/app/{i}", '
+                     f'"url": "http://host/{i}", /* inline */ "n": {i},}},')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+@benchmark
+def bench_jsonc(count: int = 5):
+    from pyrandyos.utils.json import load_jsonc, parse_jsonc
+
+    text = build_jsonc(50000)
+    mb = len(text)/1e6
+    run_timed(f'parse_jsonc ({mb:.1f} MB)', lambda: parse_jsonc(text), count,
+              'files')
+    with TemporaryDirectory() as tmp:
+        fn = Path(tmp)/'bench.jsonc'
+        fn.write_text(text)
+        run_timed(f'load_jsonc stream ({mb:.1f} MB)',
+                  lambda: load_jsonc(fn, stream=True), count, 'files')
+
+    charmap = (REPOROOT/'pyrandyos/gui/icons/assets/FluentUI/charmap'
+               / 'FluentSystemIcons-Regular.json')
+    run_timed(f'load_jsonc {charmap.name}', lambda: load_jsonc(charmap),
+              count*10, 'files')
+
+
+@benchmark
+def bench_leaps(count: int = 20):
+    import numpy as np
+    from pyrandyos.utils.time.leaps import get_leaps_at_utc, get_leaps_at_tai
+
+    size = 1000000
+    # a telemetry timeline spanning all of the leap seconds
+    utc = np.linspace(-1e9, 1e9, size)
+    run_timed(f'get_leaps_at_utc ({size:,} epochs)',
+              lambda: get_leaps_at_utc(utc), count, 'arrays')
+    run_timed(f'get_leaps_at_tai ({size:,} epochs)',
+              lambda: get_leaps_at_tai(utc), count, 'arrays')
+    run_timed('get_leaps_at_utc (scalar)', lambda: get_leaps_at_utc(5e8),
+              count*10000)
+
+
+@benchmark
+def bench_gregorian(count: int = 10):
+    import numpy as np
+    from pyrandyos.utils.time.gregorian import sec_to_ymdhms
+    from pyrandyos.utils.time.gregorian_array import (
+        sec_to_ymdhms_array, ymdhms_to_sec_array,
+    )
+
+    size = 1000000
+    formal = np.linspace(-1e9, 1e9, size)
+    ymdhms = sec_to_ymdhms_array(formal)
+    run_timed(f'sec_to_ymdhms_array ({size:,} epochs)',
+              lambda: sec_to_ymdhms_array(formal), count, 'arrays')
+    run_timed(f'ymdhms_to_sec_array ({size:,} epochs)',
+              lambda: ymdhms_to_sec_array(ymdhms), count, 'arrays')
+    run_timed('sec_to_ymdhms (scalar)', lambda: sec_to_ymdhms(5e8),
+              count*10000)
+
+
+@benchmark
+def bench_time_formatter(count: int = 3):
+    import numpy as np
+    from pyrandyos.utils.time.fmt import TimeFormatter, TimeFormat
+
+    size = 200000
+    # a month of telemetry
+    t = np.linspace(5e8, 5e8 + 30*86400, size)
+    for fmt, digits in ((TimeFormat.YMDHMS, 3), (TimeFormat.Y_DOY_HMS, 0),
+                        (TimeFormat.DHMS, 3), (TimeFormat.S, 3)):
+        formatter = TimeFormatter(fmt, digits)
+        run_timed(f'TimeFormatter.sec_as_fmt_str ({fmt.name})',
+                  lambda: formatter.sec_as_fmt_str(5e8), count*20000,
+                  'strings')
+        start = perf_counter()
+        for _ in range(count):
+            formatter.sec_as_fmt_str_array(t)
+        report(f'TimeFormatter.sec_as_fmt_str_array ({fmt.name})',
+               count*size, perf_counter() - start, 'strings')
+
+
+@benchmark
+def bench_time_parse(count: int = 3):
+    import numpy as np
+    from datetime import datetime
+    from pyrandyos.utils.time.fmt import TimeFormatter, TimeFormat
+    from pyrandyos.utils.time.gregorian import ymdhms_to_sec
+
+    def strptime_to_sec(s: str):
+        dt = datetime.strptime(s, '%Y-%m-%d %H:%M:%S.%f')
+        return ymdhms_to_sec(dt.year, dt.month, dt.day, dt.hour, dt.minute,
+                             dt.second + dt.microsecond*1e-6)
+
+    size = 200000
+    # a month of telemetry
+    t = np.linspace(5e8, 5e8 + 30*86400, size)
+    formatter = TimeFormatter(TimeFormat.YMDHMS, 3)
+    sample = formatter.sec_as_fmt_str(5e8)
+    run_timed('datetime.strptime + ymdhms_to_sec',
+              lambda: strptime_to_sec(sample), count*20000, 'strings')
+    for fmt, digits in ((TimeFormat.YMDHMS, 3), (TimeFormat.Y_DOY_HMS, 0),
+                        (TimeFormat.DHMS, 3)):
+        formatter = TimeFormatter(fmt, digits)
+        strings = formatter.sec_as_fmt_str_array(t).tolist()
+        # the same times without zero padding don't fit a fixed width
+        unpadded = [s.replace(':0', ':') for s in strings]
+        run_timed(f'TimeFormatter.fmt_str_to_sec ({fmt.name})',
+                  lambda: formatter.fmt_str_to_sec(strings[0]), count*20000,
+                  'strings')
+        for name, data, strict in (('fixed width', strings, True),
+                                   ('unpadded', unpadded, False)):
+            start = perf_counter()
+            for _ in range(count):
+                formatter.fmt_str_to_sec_array(data, strict)
+
+            report(f'TimeFormatter.fmt_str_to_sec_array ({fmt.name}, {name})',
+                   count*size, perf_counter() - start, 'strings')
+
+
+@benchmark
+def bench_rate_conversion(count: int = 3):
+    import numpy as np
+    from pyrandyos.utils.time.base_convert import (
+        utc_to_tai, tai_to_tt, MOYER_K, EMB_E, EMB_M0, EMB_N,
+    )
+    from pyrandyos.utils.time.rate import BaseClockRate, get_rate_converter
+
+    def chained_utc_to_et(utc: np.ndarray):
+        # utc_to_et step by step, with np.sin in place of math.sin
+        tt = tai_to_tt(utc_to_tai(utc))
+        m = EMB_M0 + EMB_N*tt
+        return tt + MOYER_K*np.sin(m + EMB_E*np.sin(m))
+
+    size = 1000000
+    utc = np.linspace(-3e8, 8e8, size)
+    converter = get_rate_converter(BaseClockRate.UTC, BaseClockRate.T_EPH)
+    run_timed('RateConverter (UTC -> T_EPH, scalar)',
+              lambda: converter(5e8), count*20000, 'epochs')
+    for name, func in (('chained arrays', chained_utc_to_et),
+                       ('RateConverter', converter)):
+        # the first array call compiles the converter
+        func(utc[:10])
+        start = perf_counter()
+        for _ in range(count):
+            func(utc)
+
+        report(f'{name} (UTC -> T_EPH)', count*size, perf_counter() - start,
+               'epochs')
+
+    inverse = get_rate_converter(BaseClockRate.T_EPH, BaseClockRate.UTC)
+    et = converter(utc)
+    inverse(et[:10])
+    start = perf_counter()
+    for _ in range(count):
+        inverse(et)
+
+    report('RateConverter (T_EPH -> UTC)', count*size,
+           perf_counter() - start, 'epochs')
+
+
+def time_import_in_subprocess(env: dict[str, str]):
+    code = ('from time import perf_counter; t = perf_counter(); '
+            'import pyrandyos; print(perf_counter() - t)')
+    result = run([sys.executable, '-c', code], cwd=REPOROOT, env=env,
+                 capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+@benchmark
+def bench_import(count: int = 10):
+    from pyrandyos.utils.signature_wrapper import ENV_PYRANDYOS_WRAPPER_CACHE
+
+    env = environ.copy()
+    env.pop(ENV_PYRANDYOS_WRAPPER_CACHE, None)
+    with TemporaryDirectory() as tmp:
+        cached_env = env | {ENV_PYRANDYOS_WRAPPER_CACHE: tmp}
+        # populate the disk cache before timing it
+        time_import_in_subprocess(cached_env)
+        for name, runenv in (('import pyrandyos', env),
+                             ('import pyrandyos (wrapper cache)', cached_env)):
+            elapsed = sum(time_import_in_subprocess(runenv)
+                          for _ in range(count))
+            report(name, count, elapsed, 'imports')
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or tuple(BENCHMARKS.keys())
+    for name in names:
+        BENCHMARKS[name]()
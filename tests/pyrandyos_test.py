@@ -20,6 +20,15 @@ ZERO = timedelta()
 HOUR = timedelta(hours=1)
 
 
+def _log_from_worker(i: int):
+    "run in a worker process by `test_worker_logging`"
+    from logging import getLogger
+    from pyrandyos.config import AppConfig
+
+    getLogger('pyrandyos_test.worker').warning('worker %d', i)
+    return AppConfig['a']
+
+
 @mock.patch.dict(environ, {ENV_PYRANDYOS_UNITTEST_ACTIVE: '1'})
 class TestPyRandyOS(TestCase):
     def test_import(self):
@@ -73,6 +82,901 @@ class TestPyRandyOS(TestCase):
         self.single_tz_test(cen_dst_end, -6)
         self.single_tz_test(cen_dst_post_end, -6)
 
+    def test_leaps(self):
+        import numpy as np
+        from pandas import Series
+        from pyrandyos.utils.time.leaps import (
+            get_leaps_at_utc, get_leaps_at_tai, LEAPS_TABLE,
+        )
+
+        first, last = LEAPS_TABLE[1], LEAPS_TABLE[-1]
+        self.assertEqual(get_leaps_at_utc(first - 1e-3), 9.0)
+        self.assertEqual(get_leaps_at_utc(first), 10.0)
+        self.assertEqual(get_leaps_at_utc(last - 1e-3), 36.0)
+        self.assertEqual(get_leaps_at_utc(last), 37.0)
+        self.assertEqual(get_leaps_at_tai(last + 36.5), 36.0)
+        self.assertEqual(get_leaps_at_tai(last + 37), 37.0)
+
+        utc = np.array([first - 1, first, last, np.nan, 1e12])
+        leaps = get_leaps_at_utc(utc)
+        np.testing.assert_array_equal(leaps, [9, 10, 37, np.nan, 37])
+        np.testing.assert_array_equal(get_leaps_at_tai(utc + leaps), leaps)
+        self.assertEqual(get_leaps_at_utc(np.float64(last)), 37.0)
+
+        series = get_leaps_at_utc(Series(utc[:3], index=[3, 4, 5]))
+        self.assertEqual(series.to_dict(), {3: 9.0, 4: 10.0, 5: 37.0})
+
+    def test_gregorian_array(self):
+        import numpy as np
+        from pandas import Series
+        from pyrandyos.utils.time.gregorian import (
+            sec_to_ymdhms, sec_to_y_doy_hms, ymdhms_to_sec,
+        )
+        from pyrandyos.utils.time.gregorian_array import (
+            sec_to_ymdhms_array, sec_to_y_doy_hms_array, ymdhms_to_sec_array,
+            day_of_year_array,
+        )
+
+        rng = np.random.default_rng(0)
+        formal = np.concatenate([rng.uniform(-7e10, 7e10, 500),
+                                 [-43200.0, 0.0, 5e8 - 0.0004, 5e8 - 0.0006]])
+        for digits in (None, 3):
+            ymdhms = sec_to_ymdhms_array(formal, digits)
+            y_doy_hms = sec_to_y_doy_hms_array(formal, digits)
+            for i, x in enumerate(formal.tolist()):
+                self.assertEqual(tuple(ymdhms[i].tolist()),
+                                 sec_to_ymdhms(x, digits))
+                self.assertEqual(tuple(y_doy_hms[i].tolist()),
+                                 sec_to_y_doy_hms(x, digits))
+
+        np.testing.assert_array_equal(
+            ymdhms_to_sec_array(ymdhms),
+            [ymdhms_to_sec(*x) for x in ymdhms.tolist()]
+        )
+        np.testing.assert_array_equal(
+            day_of_year_array(ymdhms['year'], ymdhms['month'], ymdhms['day']),
+            y_doy_hms['doy']
+        )
+
+        for bad in (np.nan, np.inf, -np.inf):
+            for digits in (None, 3):
+                self.assertRaises(ValueError, sec_to_ymdhms_array,
+                                  [0.0, bad], digits)
+
+        df = sec_to_ymdhms_array(Series([0.0, 86400.0], index=[7, 8]))
+        self.assertEqual(df.loc[8].tolist(), [2000, 1, 2, 12, 0, 0.0])
+        self.assertEqual(ymdhms_to_sec_array(df).to_dict(),
+                         {7: 0.0, 8: 86400.0})
+
+    def test_time_formatter_array(self):
+        import numpy as np
+        from pandas import Series
+        from pyrandyos.utils.time.fmt import TimeFormatter, TimeFormat
+
+        rng = np.random.default_rng(0)
+        t = np.concatenate([rng.uniform(-7e10, 7e10, 200),
+                            rng.uniform(-1e6, 1e6, 200),
+                            [0.0, -0.0, 86399.9996, -0.0004, 2.5, 1e15]])
+        for fmt in TimeFormat:
+            for digits in (None, 0, 3, -1):
+                formatter = TimeFormatter(fmt, digits, 2)
+                self.assertEqual(formatter.sec_as_fmt_str_array(t).tolist(),
+                                 [formatter.sec_as_fmt_str(x)
+                                  for x in t.tolist()], (fmt, digits))
+
+        formatter = TimeFormatter(TimeFormat.Y_DOY_HMS, 1)
+        strings = formatter.sec_as_fmt_str_array(Series([0.0, 1.25],
+                                                        index=[5, 6]))
+        self.assertEqual(strings.to_dict(), {5: '2000:001:12:00:00.0',
+                                             6: '2000:001:12:00:01.2'})
+
+    def test_time_parse(self):
+        import numpy as np
+        from pandas import Series
+        from pyrandyos.utils.time.fmt import (
+            TimeFormatter, TimeFormat, FLOAT_FMTS,
+        )
+
+        rng = np.random.default_rng(0)
+        # with the ones that round up into the next minute, hour and day
+        t = np.concatenate([rng.uniform(-3e9, 3e9, 200),
+                            rng.uniform(-1e6, 1e6, 200),
+                            [0.0, 2.5, 59.9996, 3599.6, -86399.9996]])
+        for fmt in TimeFormat:
+            for digits in (0, 3):
+                formatter = TimeFormatter(fmt, digits)
+                strings = formatter.sec_as_fmt_str_array(t).tolist()
+                expected = [formatter.fmt_str_to_sec(s) for s in strings]
+                np.testing.assert_array_equal(
+                    formatter.fmt_str_to_sec_array(strings), expected
+                )
+                if fmt not in FLOAT_FMTS:
+                    np.testing.assert_allclose(expected, t, rtol=0,
+                                               atol=0.5*10**-digits)
+
+        formatter = TimeFormatter(TimeFormat.YMDHMS)
+        self.assertEqual(formatter.fmt_str_to_sec('2000-01-01T12:00:01.5Z'),
+                         1.5)
+        self.assertEqual(formatter.fmt_str_to_sec(' 2000-1-2 ', False),
+                         43200.0)
+        with self.assertRaises(ValueError):
+            formatter.fmt_str_to_sec('2001-02-29 00:00:00')
+
+        lenient = formatter.fmt_str_to_sec_array(
+            Series(['2000-01-01 12:00:00', 'bad', '2000-1-1 12:00'],
+                   index=[4, 5, 6]), False
+        )
+        self.assertEqual(lenient.index.tolist(), [4, 5, 6])
+        np.testing.assert_array_equal(lenient, [0.0, np.nan, 0.0])
+        with self.assertRaises(ValueError):
+            formatter.fmt_str_to_sec_array(['2000-01-01 12:00:00', 'bad'])
+
+        formatter = TimeFormatter(TimeFormat.DHMS)
+        np.testing.assert_array_equal(
+            formatter.fmt_str_to_sec_array(['-01/00:00:01.5', '00/01:00:00']),
+            [-86401.5, 3600.0]
+        )
+
+        formatter = TimeFormatter(TimeFormat.S)
+        self.assertEqual(formatter.fmt_str_to_sec('-1.5e3'), -1500.0)
+        self.assertEqual(formatter.fmt_str_to_sec(' 1 ', False), 1.0)
+        for bad in (' nan ', 'inf', '1_0', ' 1'):
+            with self.assertRaises(ValueError):
+                formatter.fmt_str_to_sec(bad)
+            with self.assertRaises(ValueError):
+                formatter.fmt_str_to_sec_array(['1', bad])
+
+    def test_rate_conversion(self):
+        import numpy as np
+        from pandas import Series
+        from pyrandyos.utils.time.base_convert import (
+            utc_to_tai, tai_to_tt, tt_to_et, utc_to_unix,
+        )
+        from pyrandyos.utils.time.rate import (
+            BaseClockRate, get_rate_converter, plan_rate_conversion,
+            convert_rate, US_DST,
+        )
+
+        self.assertEqual(
+            plan_rate_conversion(BaseClockRate.UTC, BaseClockRate.T_EPH),
+            (utc_to_tai, tai_to_tt, tt_to_et)
+        )
+        self.assertEqual(
+            plan_rate_conversion(BaseClockRate.UTC, BaseClockRate.UNIX),
+            (utc_to_unix,)
+        )
+        self.assertIs(get_rate_converter(BaseClockRate.TT, BaseClockRate.UTC),
+                      get_rate_converter(BaseClockRate.TT, BaseClockRate.UTC))
+
+        # local times can be ambiguous, so they're only checked at noon
+        rates = [rate for rate in BaseClockRate if rate not in US_DST]
+        t = np.random.default_rng(0).uniform(-1e9, 1e9, 100)
+        noons = np.arange(-200, 200)*86400.0
+        for from_rate, to_rate, x in (
+            [(a, b, t) for a in rates for b in rates]
+            + [(BaseClockRate.US_CT, BaseClockRate.T_EPH, noons),
+               (BaseClockRate.UTC, BaseClockRate.US_PT, noons)]
+        ):
+            converter = get_rate_converter(from_rate, to_rate)
+            np.testing.assert_array_equal(
+                converter(x), [converter(v) for v in x.tolist()],
+                (from_rate, to_rate)
+            )
+
+        et = convert_rate(t, BaseClockRate.UTC, BaseClockRate.T_EPH)
+        np.testing.assert_allclose(
+            convert_rate(et, BaseClockRate.T_EPH, BaseClockRate.UTC), t,
+            rtol=0, atol=1e-6
+        )
+        tt = convert_rate(Series([0.0, np.nan], index=[4, 5]),
+                          BaseClockRate.TAI, BaseClockRate.TT)
+        self.assertEqual(tt.index.tolist(), [4, 5])
+        np.testing.assert_array_equal(tt, [32.184, np.nan])
+
+    def test_func_call_log_hot_swap(self):
+        from pyrandyos.logging import (
+            log_func_call, set_func_call_logging, get_func_call_logging,
+            get_log_level_gate, DEBUGLOW,
+        )
+        from pyrandyos.utils.signature_wrapper import (
+            is_signature_wrapper_passthrough,
+        )
+
+        @log_func_call
+        def func(a, b=2, *args, c=3, **kwargs):
+            return a, b, args, c, kwargs
+
+        enabled = get_func_call_logging()
+        try:
+            set_func_call_logging(False)
+            self.assertTrue(is_signature_wrapper_passthrough(func))
+            with self.assertNoLogs(level=DEBUGLOW):
+                self.assertEqual(func(1, 5, 6, d=7),
+                                 (1, 5, (6,), 3, {'d': 7}))
+
+            set_func_call_logging(True)
+            self.assertFalse(is_signature_wrapper_passthrough(func))
+            with self.assertLogs(level=DEBUGLOW) as cm:
+                self.assertEqual(func(1, c=4), (1, 2, (), 4, {}))
+
+            self.assertIn('Function call', cm.output[0])
+            self.assertEqual(get_log_level_gate(), DEBUGLOW)
+        finally:
+            set_func_call_logging(enabled)
+
+    def test_log_level_gate_follows_handlers(self):
+        from io import StringIO
+        from logging import StreamHandler, getLogger, DEBUG, INFO
+        from pyrandyos.logging import (
+            log_debug, get_log_level_gate, get_bound_logger,
+            update_log_level_gate,
+        )
+
+        root = getLogger()
+        level = root.level
+        stream = StringIO()
+        handler = StreamHandler(stream)
+        handler.setLevel(INFO)
+        root.addHandler(handler)
+        try:
+            root.setLevel(DEBUG)
+            # as pyrandyos's own logging setup does
+            update_log_level_gate()
+            log_debug('before')
+            self.assertGreater(get_log_level_gate(), DEBUG)
+
+            # lowering a handler level or adding a handler with plain stdlib
+            # calls is picked up the next time the gate rejects a call
+            handler.setLevel(DEBUG)
+            log_debug('lowered')
+            get_bound_logger(__name__).debug('bound')
+            self.assertEqual(get_log_level_gate(), DEBUG)
+
+            root.removeHandler(handler)
+            log_debug('removed')
+
+            added = StreamHandler(stream)
+            added.setLevel(DEBUG)
+            root.addHandler(added)
+            try:
+                log_debug('added')
+            finally:
+                root.removeHandler(added)
+        finally:
+            root.removeHandler(handler)
+            root.setLevel(level)
+
+        self.assertEqual(stream.getvalue().splitlines(),
+                         ['lowered', 'bound', 'added'])
+
+    def test_signature_wrapper_cache(self):
+        from tempfile import TemporaryDirectory
+        from pyrandyos.utils import signature_wrapper as sw
+
+        def handler(handler_args, handler_kwargs, func, *args, **kwargs):
+            return args, kwargs
+
+        def func(a, b=2, *, c):
+            return a, b, c
+
+        def other(a, b=5, *, c):
+            return c, b, a
+
+        wrapped = sw.generate_signature_aware_wrapper(func, handler)
+        self.assertEqual(wrapped(1, c=3), (1, 2, 3))
+        self.assertRaises(TypeError, wrapped, 1, 2, 3)
+
+        # same signature shape, so the compiled code is shared
+        wrapped_other = sw.generate_signature_aware_wrapper(other, handler)
+        self.assertIs(wrapped.__code__, wrapped_other.__code__)
+        self.assertEqual(wrapped_other(1, c=3), (3, 5, 1))
+
+        def posonly(a, /, *, b=2):
+            return a, b
+
+        wrapped_posonly = sw.generate_signature_aware_wrapper(posonly, handler)
+        self.assertEqual(wrapped_posonly(1, b=3), (1, 3))
+        self.assertRaises(TypeError, wrapped_posonly, a=1)
+
+        with TemporaryDirectory() as tmp:
+            with mock.patch.dict(environ,
+                                 {sw.ENV_PYRANDYOS_WRAPPER_CACHE: tmp}):
+                sw._WRAPPER_CODE_CACHE_DIRTY = True
+                sw.save_wrapper_code_cache()
+                cachefile = sw.get_wrapper_cache_path()
+                self.assertTrue(cachefile.exists())
+                with mock.patch.object(sw, '_WRAPPER_CODE_CACHE', None), \
+                        mock.patch.object(sw, '_WRAPPER_SHAPE_CACHE', {}), \
+                        mock.patch.object(sw, 'atexit_register'):
+                    cache = sw._load_wrapper_code_cache()
+                    src, code, _ = sw.get_wrapper_code(
+                        sw.get_signature_shape(sw.signature(func).parameters)
+                    )
+                    self.assertIs(cache[src], code)
+
+    def test_bound_logger(self):
+        from pyrandyos.logging import (
+            get_bound_logger, get_logger, DEBUG, _CODE_LOGGER_CACHE,
+        )
+
+        log = get_bound_logger(__name__)
+
+        def call_site():
+            log.debug('bound %s', 'message')
+            return get_logger()
+
+        with self.assertLogs(level=DEBUG) as cm:
+            # the second call is resolved from the logger cache
+            self.assertIs(call_site(), call_site())
+
+        record = cm.records[0]
+        self.assertEqual(record.name, __name__)
+        self.assertEqual(record.funcName, 'call_site')
+        self.assertEqual(record.getMessage(), 'bound message')
+        self.assertIs(call_site(), log.logger)
+
+        # the same code run with other globals gets its own module's logger,
+        # and code compiled on the fly can't grow the cache without bound
+        code = compile('log = get_logger()', '<generated>', 'exec')
+        for i in range(20):
+            namespace = {'__name__': f'pyrandyos_test.gen{i % 10}',
+                         'get_logger': get_logger}
+            with mock.patch('pyrandyos.logging._CODE_LOGGER_CACHE_SIZE', 8):
+                exec(code, namespace)
+                exec(compile('get_logger()', '<generated>', 'exec'),
+                     namespace)
+
+            self.assertEqual(namespace['log'].name, namespace['__name__'])
+
+        self.assertLessEqual(len(_CODE_LOGGER_CACHE), 8)
+
+    def test_case_insensitive_dict(self):
+        from pickle import dumps, loads
+        from pyrandyos.utils.casesafe import (
+            make_case_insensitive, casesafe_dict_get, CaseInsensitiveDict,
+        )
+        from pyrandyos.utils.cfgdict import config_dict_get, config_dict_set
+
+        config = make_case_insensitive({'Section': {'Key': 1}}, True)
+        self.assertEqual(config_dict_get(config, 'section.KEY', True), 1)
+        self.assertEqual(casesafe_dict_get(config, 'SECTION', None, True),
+                         {'Key': 1})
+
+        # writes through a different case keep the original spelling
+        config_dict_set(config, 'SECTION.key', 2, True)
+        config_dict_set(config, 'other.Value', 3, True)
+        self.assertEqual(config, {'Section': {'Key': 2},
+                                  'other': {'Value': 3}})
+        self.assertEqual(loads(dumps(config))['OTHER']['value'], 3)
+
+        # exact-case writes can't replace a key stored with another case
+        sub = CaseInsensitiveDict({'Sub': {'x': 1}})
+        self.assertRaises(KeyError, config_dict_set, sub, 'sub.x', 2, False)
+        self.assertEqual(sub, {'Sub': {'x': 1}})
+        config_dict_set(sub, 'Sub.x', 2, False)
+        config_dict_set(sub, 'new.x', 3, False)
+        self.assertEqual(sub, {'Sub': {'x': 2}, 'new': {'x': 3}})
+
+        del config['section']
+        self.assertNotIn('Section', config)
+        self.assertIsNone(config.actual_key('SECTION'))
+
+    def test_config_path_index(self):
+        from pyrandyos.utils.cfgdict import (
+            ConfigPathIndex, compile_config_key, config_dict_get,
+            config_dict_update,
+        )
+        from pyrandyos.config import AppConfig
+
+        config = {'local': {'theme': 'dark', 'recent': ['a', 'b']}}
+        self.assertIs(compile_config_key('local.theme'),
+                      compile_config_key('local.theme'))
+        self.assertEqual(config_dict_get(config, 'local.recent.1'), 'b')
+        self.assertIsNone(config_dict_get(config, 'local.recent.2', None))
+
+        index = ConfigPathIndex(config, False)
+        self.assertEqual(index['local.theme'], 'dark')
+        self.assertEqual(index.get('local.missing', 1), 1)
+        self.assertRaises(KeyError, index.get, 'local.missing')
+
+        # writes through the cfgdict functions keep the index coherent
+        config_dict_update(config, {'local.theme': 'light',
+                                    'local.missing': 2})
+        self.assertEqual(index['local.theme'], 'light')
+        self.assertEqual(index['local.missing'], 2)
+
+        # and so do direct changes, including replacing a whole section
+        config['local'] = {'theme': 'blue', 'recent': ['c']}
+        self.assertEqual(index['local.theme'], 'blue')
+        self.assertEqual(index.get('local.missing', 3), 3)
+        config['local']['recent'].append('d')
+        self.assertEqual(index['local.recent.-1'], 'd')
+
+        # writes to other configs leave the index alone
+        count = len(index)
+        config_dict_update({'local': {}}, {'local.theme': 'dark'})
+        self.assertEqual(len(index), count)
+
+        AppConfig.set_global_config({'x': {'y': 1}})
+        self.assertEqual(AppConfig['x.y'], 1)
+        AppConfig.get_global_config()['x'] = {'y': 5}
+        self.assertEqual(AppConfig['x.y'], 5)
+
+    def test_config_expander(self):
+        from pyrandyos.config.expandutils import (
+            ConfigExpander, ConfigExpansionCycleError,
+        )
+
+        config = {'root': '/data', 'sub': {'dir': '$root/sub'},
+                  'out': '${sub.dir}/$NOT_A_PYRANDYOS_VAR/$skip_expand',
+                  'both': '${sub.dir}:$out'}
+        expander = ConfigExpander(config, 'skip_expand')
+        expander.expand_all()
+        self.assertEqual(config['sub']['dir'], '/data/sub')
+        self.assertEqual(config['out'],
+                         '/data/sub/$NOT_A_PYRANDYOS_VAR/$skip_expand')
+        self.assertEqual(config['both'], f"/data/sub:{config['out']}")
+        self.assertEqual(expander.dependencies['both'], {'sub.dir', 'out'})
+        # names left unresolved are reported for every value they end up in
+        self.assertEqual(expander.unresolved,
+                         {'out': ['NOT_A_PYRANDYOS_VAR'],
+                          'both': ['NOT_A_PYRANDYOS_VAR']})
+
+        cycle = {'a': '$b', 'b': '${a}'}
+        with self.assertRaises(ConfigExpansionCycleError) as cm:
+            ConfigExpander(cycle).expand_all()
+
+        self.assertEqual(cm.exception.cycle, ['a', 'b', 'a'])
+
+    def test_expand_template(self):
+        from pyrandyos.utils.expandvars import (
+            compile_template, expandvars, expandvars_base, substitute_key,
+        )
+
+        source = '$root/${sub.dir}/$unknown/$root'
+        template = compile_template(source)
+        self.assertIs(template, compile_template(source))
+        self.assertEqual(template.names,
+                         ('root', 'sub.dir', 'unknown', 'root'))
+        self.assertEqual(template.literals, ('', '/', '/', '/', ''))
+        self.assertEqual(template.render({'root': '/r', 'sub.dir': 'd'}),
+                         '/r/d/$unknown//r')
+
+        config = {'root': '/r', 'sub': {'dir': 'd'}}
+        self.assertEqual(expandvars(source, config, False), '/r/d/$unknown//r')
+        self.assertEqual(substitute_key(source, 'root', 'x'),
+                         'x/${sub.dir}/$unknown/$root')
+
+        # callbacks that change the rest of the string are still honored
+        def callback(data: dict):
+            x = data['x']
+            data['x'] = x[:data['i']] + x[data['j']:].replace('$root', 'R')
+            data['i'] = 0
+
+        self.assertEqual(expandvars_base(source, callback), '///R')
+
+    def test_jsonc(self):
+        from tempfile import TemporaryDirectory
+        from pyrandyos.utils.json import (
+            load_jsonc, parse_jsonc, strip_jsonc, iter_strip_jsonc,
+        )
+
+        text = ('{\n'
+                '  // line comment\n'
+                '  "url": "http://example.com/*not a comment*/", // end\n'
+                '  "list": [1, 2, /* block, */ 3,\n'
+                '    /* multi\n'
+                '       line */\n'
+                '  ],\n'
+                '  "comma": "a,}", "esc": "q\\"//x",\n'
+                '}\n')
+        expected = {'url': 'http://example.com/*not a comment*/',
+                    'list': [1, 2, 3], 'comma': 'a,}', 'esc': 'q"//x'}
+        self.assertEqual(parse_jsonc(text), expected)
+
+        for size in (1, 2, 3, 7, 64):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual(''.join(iter_strip_jsonc(chunks)),
+                             strip_jsonc(text))
+
+        with TemporaryDirectory() as tmp:
+            fn = Path(tmp)/'test.jsonc'
+            fn.write_text(text)
+            self.assertEqual(load_jsonc(fn, stream=True), expected)
+
+    def test_config_cache(self):
+        from tempfile import TemporaryDirectory
+        from pyrandyos.config.cache import ConfigCache, get_inputs_digest
+        from pyrandyos.config.expandutils import ConfigExpander
+        from pyrandyos.utils.expandvars import record_var_lookups
+
+        with record_var_lookups() as names:
+            ConfigExpander({'a': '$PYRANDYOS_TEST_VAR/$b', 'b': 'x'}
+                           ).expand_all()
+
+        self.assertEqual(names, {'PYRANDYOS_TEST_VAR', 'b'})
+
+        digest = get_inputs_digest({'defaults': 1})
+        self.assertEqual(digest, get_inputs_digest({'defaults': 1}))
+        self.assertIsNone(get_inputs_digest(lambda: None))
+        with TemporaryDirectory() as tmp:
+            src = Path(tmp)/'config.jsonc'
+            src.write_text('{}')
+            cache = ConfigCache(Path(tmp)/'cache.pickle', digest)
+            self.assertIsNone(cache.load())
+            cache.save({'config': {'a': Path('x')}}, [src], names)
+            self.assertEqual(cache.load(), {'config': {'a': Path('x')}})
+            self.assertIsNone(ConfigCache(cache.cachefile, 'other').load())
+
+            with mock.patch.dict(environ, {'PYRANDYOS_TEST_VAR': '1'}):
+                self.assertIsNone(cache.load())
+
+            src.write_text('{ }')
+            self.assertIsNone(cache.load())
+
+    def test_config_layers(self):
+        from pyrandyos.utils.constants import NODEFAULT
+        from pyrandyos.utils.cfglayers import ConfigLayers
+
+        defaults = {'a': 1, 'sub': {'b': 2, 'c': [3, {'d': 4}]},
+                    'big': {'x': 1}}
+        layers = ConfigLayers([('defaults', defaults)], False)
+        layers.set_layer('overrides', {'sub.b': 5, 'e': 6})
+        config = layers.merged()
+        self.assertEqual(config, {'a': 1, 'sub': {'b': 5, 'c': [3, {'d': 4}]},
+                                  'big': {'x': 1}, 'e': 6})
+        config['sub']['c'][1]['d'] = 0
+        self.assertEqual(defaults['sub']['c'][1]['d'], 4)
+
+        before = layers.snapshot()
+        layers.set('defaults', 'sub.c.1.d', 7)
+        layers.set('defaults', 'f', 8)
+        layers.update('defaults', {'g': 9})
+        after = layers.layer('defaults')
+        self.assertIs(before.layer('defaults'), defaults)
+        self.assertEqual(defaults['sub']['c'][1]['d'], 4)
+        self.assertIs(after['big'], defaults['big'])
+        self.assertEqual(layers.diff(before, 'defaults'),
+                         {'sub.c': [3, {'d': 7}], 'f': 8, 'g': 9})
+        self.assertEqual(before.diff(layers, 'defaults'),
+                         {'sub.c': [3, {'d': 4}], 'f': NODEFAULT,
+                          'g': NODEFAULT})
+
+    def test_config_snapshot(self):
+        from threading import Thread
+        from pyrandyos.utils.cfgsnapshot import ConfigSnapshot
+
+        snapshot = ConfigSnapshot({'a': 0, 'b': 0, 'sub': {'l': [1, {}]}},
+                                  0, False)
+        self.assertEqual(snapshot['sub.l'], (1, {}))
+        with self.assertRaises(TypeError):
+            snapshot.config['sub']['x'] = 1
+
+        newer = snapshot.set('sub.l.1.x', 2)
+        self.assertEqual(newer['sub.l.1.x'], 2)
+        self.assertNotIn('sub.l.1.x', snapshot)
+        self.assertEqual(newer.version, 1)
+
+        # readers always see "a" and "b" changed together
+        latest = [snapshot]
+        mismatches = list()
+
+        def read():
+            for _ in range(2000):
+                s = latest[0]
+                if s['a'] != s['b']:
+                    mismatches.append(s.version)
+
+        readers = [Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+
+        for i in range(1, 500):
+            latest[0] = latest[0].set('a', i).set('b', i)
+
+        for t in readers:
+            t.join()
+
+        self.assertEqual(mismatches, [])
+        self.assertIs(latest[0].config['sub'], snapshot.config['sub'])
+
+    def test_config_reexpand(self):
+        from pyrandyos.config import AppConfig
+
+        AppConfig.init_parse_config({'base_path': '/base', 'log_dir': 'logs',
+                                     'data': '${sub}/data', 'sub': 'a',
+                                     'label': 'x-$data', 'other': '$sub'},
+                                    case_insensitive=False)
+        AppConfig.process_config(case_insensitive=False)
+        notified = list()
+
+        def on_change(keys: tuple[str, ...]):
+            notified.append(set(keys))
+
+        AppConfig.subscribe(on_change)
+        AppConfig.subscribe(notified.append, ['label'])
+        try:
+            AppConfig.set('sub', 'b', False)
+            self.assertEqual(notified, [{'sub', 'data', 'label', 'other'},
+                                        ('label',)])
+            self.assertEqual(AppConfig.get('label'), 'x-b/data')
+
+            notified.clear()
+            AppConfig.set('base_path', '/other', False)
+            self.assertEqual(AppConfig.get('log_dir'), Path('/other/logs'))
+            self.assertEqual(AppConfig.get_config_snapshot()['log_dir'],
+                             Path('/other/logs'))
+            self.assertEqual(notified, [{'base_path', 'base_path:abs',
+                                         'log_dir', 'tmp_dir'}])
+
+            # values set directly are kept as they are
+            AppConfig.set('data', 'literal', False)
+            AppConfig.set('sub', 'c', False)
+            self.assertEqual(AppConfig.get('label'), 'x-literal')
+            self.assertEqual(AppConfig.get('data'), 'literal')
+        finally:
+            AppConfig.unsubscribe(on_change)
+            AppConfig.unsubscribe(notified.append)
+
+    def test_shared_config(self):
+        from queue import Queue
+        from logging import Logger, Handler, makeLogRecord, WARNING
+        from logging.handlers import QueueHandler
+        from pyrandyos.config.shared import SharedConfig
+        from pyrandyos.utils.log import create_worker_log_listener
+
+        data = {'config': {'a': Path('/x'), 'sub': {'b': [1, 2]}}}
+        with SharedConfig(data) as shared:
+            path = shared.path
+            self.assertEqual(SharedConfig.load(shared.initargs[0]), data)
+
+        self.assertFalse(path.exists())
+
+        records = list()
+        handler = Handler(WARNING)
+        handler.emit = records.append
+        parent = Logger('pyrandyos_test.parent')
+        parent.addHandler(handler)
+        queue = Queue()
+        listener = create_worker_log_listener(queue, parent)
+        try:
+            worker = QueueHandler(queue)
+            for level in (10, 30):
+                worker.handle(makeLogRecord({'levelno': level, 'msg': 'm%d',
+                                             'args': (level,)}))
+        finally:
+            listener.stop()
+
+        self.assertEqual([r.getMessage() for r in records], ['m30'])
+
+    def test_worker_logging(self):
+        from multiprocessing import get_context
+        from concurrent.futures import ProcessPoolExecutor
+        from logging import getLogger, Handler, WARNING
+        from pyrandyos.app import PyRandyOSApp
+
+        records = list()
+        handler = Handler(WARNING)
+        handler.emit = records.append
+        root = getLogger()
+        root.addHandler(handler)
+        ctx = get_context('spawn')
+        PyRandyOSApp.set_global_config({'a': 1})
+        try:
+            with PyRandyOSApp.share_config(mp_context=ctx) as shared, \
+                    ProcessPoolExecutor(1, ctx, PyRandyOSApp.init_worker,
+                                        shared.initargs) as pool:
+                self.assertEqual(list(pool.map(_log_from_worker, range(2))),
+                                 [1, 1])
+        finally:
+            root.removeHandler(handler)
+
+        self.assertEqual([(r.name, r.getMessage()) for r in records],
+                         [('pyrandyos_test.worker', f'worker {i}')
+                          for i in range(2)])
+
+    def test_path_cache(self):
+        from os import symlink
+        from tempfile import TemporaryDirectory
+        from pyrandyos.utils.paths import (
+            get_expanded_pathobj, resolve_pathobj, invalidate_path_cache,
+        )
+
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            (root/'a').mkdir()
+            (root/'b').mkdir()
+            link = root/'link'
+            symlink(root/'a', link)
+            self.assertEqual(get_expanded_pathobj('$d/x', {'d': link}, False),
+                             root/'a/x')
+            self.assertEqual(get_expanded_pathobj('$d/x', {'d': root/'b'},
+                                                  False), root/'b/x')
+            self.assertEqual(get_expanded_pathobj('$d/x', {'d': 'rel'}, False,
+                                                  resolve=False),
+                             Path('rel/x'))
+
+            link.unlink()
+            symlink(root/'b', link)
+            invalidate_path_cache()
+            self.assertEqual(resolve_pathobj(link/'y'), root/'b/y')
+            self.assertEqual(resolve_pathobj(link), root/'b')
+            self.assertEqual(resolve_pathobj(link/'y/..'), root/'b')
+
+    def test_async_log_handler(self):
+        from tempfile import TemporaryDirectory
+        from threading import Thread, Event
+        from time import sleep
+        from logging import (
+            getLogger, Formatter, INFO, Handler, LogRecord, makeLogRecord,
+        )
+        from pyrandyos.utils.log import (
+            AsyncLogHandler, create_file_log_handler,
+        )
+
+        with TemporaryDirectory() as tmp:
+            logfile = Path(tmp)/'async.log'
+            filelog = create_file_log_handler(logfile, INFO, Formatter())
+            handler = AsyncLogHandler([filelog], maxsize=8,
+                                      policy='drop_below_level')
+            log = getLogger('pyrandyos_test.async')
+            log.propagate = False
+            log.addHandler(handler)
+            try:
+                for i in range(100):
+                    log.warning('message %d', i)
+
+                handler.flush()
+                lines = logfile.read_text().splitlines()
+                self.assertEqual(lines, [f'message {i}' for i in range(100)])
+            finally:
+                log.removeHandler(handler)
+                handler.close()
+
+        # the writer survives a failing handler, closing never waits for room
+        # in the queue, and nothing emitted after closing is queued
+        started, go = Event(), Event()
+        written = list()
+
+        def emit(record: LogRecord):
+            if record.msg == 'fail':
+                raise RuntimeError(record.msg)
+
+            started.set()
+            go.wait()
+            written.append(record.getMessage())
+
+        blocking = Handler()
+        blocking.emit = emit
+        for policy in ('block', 'drop_oldest'):
+            started.clear()
+            go.clear()
+            written.clear()
+            handler = AsyncLogHandler([blocking], maxsize=2, policy=policy)
+            with mock.patch('logging.raiseExceptions', False):
+                handler.handle(makeLogRecord({'msg': 'fail', 'levelno': INFO}))
+                handler.flush()
+
+            record = makeLogRecord({'msg': 'm%d', 'args': (0,),
+                                    'levelno': INFO})
+            handler.handle(record)
+            self.assertEqual(record.args, (0,))
+            started.wait()
+            for i in range(1, 3):
+                handler.handle(makeLogRecord({'msg': f'm{i}',
+                                              'levelno': INFO}))
+
+            closer = Thread(target=handler.close)
+            closer.start()
+            while not handler._closed:
+                sleep(0.001)
+
+            handler.handle(makeLogRecord({'msg': 'm3', 'levelno': INFO}))
+            go.set()
+            closer.join()
+            self.assertEqual(written, ['m0', 'm1', 'm2'])
+            self.assertEqual(handler.dropped, 1)
+
+    def test_async_logging_exception(self):
+        from tempfile import TemporaryDirectory
+        from logging import getLogger
+        from pyrandyos.utils.log import setup_logging, flush_async_logging
+
+        root = getLogger()
+        saved = root.handlers[:], root.level
+        with TemporaryDirectory() as tmp:
+            logfile = Path(tmp)/'async.log'
+            setup_logging(logfile, cli=False, async_log=True)
+            try:
+                try:
+                    raise ValueError('boom')
+                except ValueError:
+                    # a plain stdlib record, with exc_info but no exc_text
+                    getLogger('pyrandyos_test.async_exc').exception(
+                        'failed', stack_info=True)
+
+                flush_async_logging()
+                text = logfile.read_text()
+            finally:
+                for h in root.handlers[:]:
+                    root.removeHandler(h)
+                    h.close()
+
+                for h in saved[0]:
+                    root.addHandler(h)
+
+                root.setLevel(saved[1])
+
+        self.assertIn('failed\nTraceback (most recent call last):', text)
+        self.assertIn("raise ValueError('boom')", text)
+        self.assertIn('ValueError: boom\nStack (most recent call last):',
+                      text)
+        self.assertIn('test_async_logging_exception', text)
+
+    def test_traceback_position_caches(self):
+        from pyrandyos.utils.stack import (
+            byte_offset_to_character_offset, format_exc,
+        )
+
+        for s in ('x = 1', 'é = "€😀"', ''):
+            utf8 = s.encode('utf-8')
+            for offset in range(len(utf8) + 3):
+                expected = len(utf8[:offset].decode('utf-8', errors='replace'))
+                self.assertEqual(byte_offset_to_character_offset(s, offset),
+                                 expected)
+
+        def fail():
+            return {'é': [][0]}
+
+        try:
+            fail()
+        except IndexError as e:
+            exc = e
+
+        # the second pass is served from the caches and must not differ
+        first, second = [format_exc(exc) for _ in range(2)]
+        self.assertIn("{'é': [][0]}", first)
+        self.assertEqual(first, second)
+
+    def test_find_caller_fast_path(self):
+        from pyrandyos.utils.stack import (
+            log_find_caller, filter_stack, is_internal_code,
+        )
+
+        # equal code objects from different files get their own verdicts
+        frozen = compile('x = 1', '<frozen fake>', 'exec')
+        app = compile('x = 1', '/home/user/app.py', 'exec')
+        self.assertTrue(is_internal_code(frozen))
+        self.assertFalse(is_internal_code(app))
+        self.assertTrue(is_internal_code(frozen))
+
+        def probe(stacklevel):
+            __traceback_hide__ = True  # noqa: F841
+            fast = log_find_caller(stacklevel=stacklevel)
+            fs = filter_stack()[-stacklevel]
+            return fast, (fs.filename, fs.lineno, fs.name, None)
+
+        def hidden_inner(stacklevel):
+            __traceback_hide__ = True  # noqa: F841
+            return probe(stacklevel)
+
+        def visible_inner(stacklevel):
+            return hidden_inner(stacklevel)
+
+        def hidden_outer(stacklevel):
+            __traceback_hide__ = True  # noqa: F841
+            return visible_inner(stacklevel)
+
+        def visible_outer(stacklevel):
+            return hidden_outer(stacklevel)
+
+        names = ['visible_inner', 'visible_outer',
+                 'test_find_caller_fast_path']
+        for stacklevel, name in enumerate(names, 1):
+            fast, slow = visible_outer(stacklevel)
+            self.assertEqual(fast, slow)
+            self.assertEqual(fast[2], name)
+
 
 if __name__ == '__main__':
     ttr = TextTestRunner(stream=sys.stdout,